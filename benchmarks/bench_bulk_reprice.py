@@ -0,0 +1,117 @@
+"""
+Benchmark bulk repricing with pricing.repricing.
+
+Loads synthetic products and prices into a scratch SQLite database, then
+lowers one brand's prices by 10% to the nearest x.99 two ways: loading
+each Price and saving it as the update_selling_price endpoint does
+("before"), and reprice(), which runs one UPDATE. A dry-run preview of the
+same change is timed as well.
+
+    python benchmarks/bench_bulk_reprice.py --products 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from decimal import ROUND_FLOOR, Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+BRANDS = ['Brand A', 'Brand B']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=200_000, help='Products to load (default: 200,000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count):
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from inventory.models import Product
+    from pricing.models import Price
+
+    rng = random.Random(42)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    products, prices = [], []
+    for i in range(count):
+        sku = f'SKU-{i:07d}'
+        selling_price = rng.lognormvariate(6.5, 1)
+        products.append((sku, f'FSN-{i:07d}', BRANDS[i % len(BRANDS)], now, now))
+        prices.append((sku, f'{selling_price * 1.2:.2f}', f'{selling_price:.2f}', now))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f"tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', %s, 'Category', '5000.00', 'HSN', '18.00', 1, %s, %s)",
+            products
+        )
+        cursor.executemany(
+            f'INSERT INTO {Price._meta.db_table} (product_id, listing_price, selling_price, discount_percentage, '
+            f"cost_price, commission_percentage, shipping_fee, last_updated) "
+            f"VALUES (%s, %s, %s, '0', '0', '0', '0', %s)",
+            prices
+        )
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-reprice-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import transaction
+    from pricing.models import Price
+    from pricing.repricing import discount_percentage, preview, price_queryset, reprice
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    load(args.products)
+    print(f'loaded {args.products:,} prices in {time.perf_counter() - started:.1f} s')
+
+    print(f'\n=== before: Price.save() per row, {BRANDS[0]} -10% to x.99 ===')
+    started = time.perf_counter()
+    changed = 0
+    with transaction.atomic():
+        for price in Price.objects.filter(product__brand=BRANDS[0]):
+            new_price = (price.selling_price * Decimal('0.9') - Decimal('0.99')).quantize(
+                Decimal('1'), rounding=ROUND_FLOOR
+            ) + Decimal('0.99')
+            new_price = min(max(new_price, Decimal('0.00')), price.listing_price)
+            if new_price == price.selling_price:
+                continue
+            price.selling_price = new_price
+            price.discount_percentage = discount_percentage(price.listing_price, new_price)
+            price.save()
+            changed += 1
+    print(f'{changed:,} prices changed in {time.perf_counter() - started:.1f} s')
+
+    adjustment = {'percent': Decimal('-10'), 'price_point': Decimal('0.99')}
+    queryset = price_queryset(brand=[BRANDS[1]])
+
+    print(f'\n=== preview(), {BRANDS[1]} ===')
+    started = time.perf_counter()
+    previewed = sum(1 for _ in preview(queryset, **adjustment))
+    print(f'{previewed:,} rows previewed in {time.perf_counter() - started:.1f} s')
+
+    print(f'\n=== after: reprice(), {BRANDS[1]} ===')
+    started = time.perf_counter()
+    updated = reprice(queryset, **adjustment)
+    print(f'{updated:,} prices changed in {time.perf_counter() - started:.1f} s')
+    assert updated == previewed
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark applying whole-catalog stock snapshots with inventory.bulk.
+
+Loads synthetic products with inventory and one listing each into a
+scratch SQLite database, then applies two full snapshots in requests of --per-call SKUs: one where
+only --changed of the rows differ (a typical 15 minute sync) and one where
+every row differs. Rows that run out of (or back into) stock flip their
+listings along the way.
+
+    python benchmarks/bench_bulk_stock.py --skus 200000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--skus', type=int, default=200_000, help='Products with inventory (default: 200,000)')
+    parser.add_argument('--per-call', type=int, default=10_000, help='SKUs per bulk call (default: 10,000)')
+    parser.add_argument('--changed', type=float, default=0.1,
+                        help='Share of rows changed by the typical snapshot (default: 0.1)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count):
+    from django.db import connection, transaction
+    from inventory.models import Inventory, Listing, Product
+
+    now = '2026-01-01 00:00:00'
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f'tax_percentage, is_active, created_at, updated_at) '
+            f"VALUES (%s, %s, 'Product', 'Brand', 'Category', '999.00', 'HSN', '18.00', 1, %s, %s)",
+            [(f'SKU-{i:07d}', f'FSN-{i:07d}', now, now) for i in range(count)]
+        )
+        cursor.executemany(
+            f'INSERT INTO {Inventory._meta.db_table} (product_id, available_quantity, reserved_quantity, '
+            f'damaged_quantity, procurement_sla, out_of_stock_threshold, last_updated) '
+            f'VALUES (%s, 10, 0, 0, 1, 0, %s)',
+            [(f'SKU-{i:07d}', now) for i in range(count)]
+        )
+        cursor.executemany(
+            f'INSERT INTO {Listing._meta.db_table} (product_id, listing_id, marketplace, listing_status, '
+            f"fulfillment_type, shipping_charges, is_cod_available, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Flipkart', 'ACTIVE', 'FBF', '0.00', 1, %s, %s)",
+            [(f'SKU-{i:07d}', f'LIST-{i:07d}', now, now) for i in range(count)]
+        )
+
+
+def apply(label, snapshot, per_call):
+    from inventory.bulk import bulk_update_stock
+
+    items = list(snapshot.items())
+    totals = {'updated': 0, 'unchanged': 0, 'not_found': 0, 'out_of_stock': 0, 'back_in_stock': 0}
+    started = time.perf_counter()
+    for start in range(0, len(items), per_call):
+        result = bulk_update_stock(dict(items[start:start + per_call]))
+        totals['updated'] += result['updated']
+        totals['unchanged'] += result['unchanged']
+        totals['not_found'] += len(result['not_found'])
+        totals['out_of_stock'] += result['out_of_stock']
+        totals['back_in_stock'] += result['back_in_stock']
+    elapsed = time.perf_counter() - started
+    print(f'{label}: {len(items):,} SKUs in {elapsed:.2f} s ({len(items) / elapsed:,.0f} SKUs/s) - '
+          f"updated {totals['updated']:,}, unchanged {totals['unchanged']:,}, not found {totals['not_found']:,}, "
+          f"out of stock {totals['out_of_stock']:,}, back in stock {totals['back_in_stock']:,}")
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-bulk-stock-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    load(args.skus)
+
+    rng = random.Random(42)
+    typical = {
+        f'SKU-{i:07d}': rng.randrange(100) if rng.random() < args.changed else 10
+        for i in range(args.skus)
+    }
+    apply(f'snapshot, ~{args.changed:.0%} changed', typical, args.per_call)
+    everything = {f'SKU-{i:07d}': 100 + rng.randrange(100) for i in range(args.skus)}
+    apply('snapshot, every row changed', everything, args.per_call)
+
+
+if __name__ == '__main__':
+    main()
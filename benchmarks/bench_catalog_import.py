@@ -0,0 +1,111 @@
+"""
+Benchmark catalog imports with the import_catalog management command.
+
+Writes a synthetic NDJSON catalog, times creating products one at a time
+with get_or_create the way populate_sample_data does ("before", on a
+sample), then imports the whole file with import_catalog twice: once into
+an empty catalog and once more over it, which updates every product.
+Peak memory is printed after each run to show that it does not grow with
+the file.
+
+    python benchmarks/bench_catalog_import.py --products 500000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=500_000, help='Products in the catalog file (default: 500,000)')
+    parser.add_argument('--sample', type=int, default=2000, help='Products created one by one (default: 2,000)')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='Records per transaction (default: 1,000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def record(i, rng):
+    mrp = round(rng.lognormvariate(7, 1.2), 2)
+    return {
+        'sku': f'SKU-{i:07d}', 'fsn': f'FSN-{i:07d}', 'product_name': f'Product {i}',
+        'brand': f'Brand {rng.randrange(200)}', 'category': f'Category {rng.randrange(30)}',
+        'mrp': f'{mrp:.2f}', 'hsn_code': 'HSN', 'tax_percentage': '18.00',
+        'available_quantity': rng.randrange(100), 'procurement_sla': 2,
+        'listing_price': f'{mrp:.2f}', 'selling_price': f'{mrp * 0.9:.2f}',
+        'cost_price': f'{mrp * 0.5:.2f}', 'commission_percentage': '10.00',
+    }
+
+
+def write_catalog(path, count):
+    rng = random.Random(42)
+    with open(path, 'w') as file:
+        for i in range(count):
+            file.write(json.dumps(record(i, rng)) + '\n')
+
+
+def peak_memory_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    args = parse_args()
+    directory = tempfile.mkdtemp(prefix='bench-catalog-')
+    db_path = args.db or os.path.join(directory, 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from inventory.models import Inventory, Product
+    from pricing.models import Price
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    catalog = os.path.join(directory, 'catalog.ndjson')
+    write_catalog(catalog, args.products)
+    print(f'catalog: {args.products:,} products, {os.path.getsize(catalog) / 2**20:.0f} MiB')
+
+    rng = random.Random(7)
+    started = time.perf_counter()
+    for i in range(args.sample):
+        data = record(10_000_000 + i, rng)
+        product, _ = Product.objects.get_or_create(sku=data['sku'], defaults={
+            field: data[field] for field in ('fsn', 'product_name', 'brand', 'category', 'mrp', 'hsn_code',
+                                             'tax_percentage')
+        })
+        Inventory.objects.get_or_create(product=product, defaults={
+            'available_quantity': data['available_quantity'], 'procurement_sla': data['procurement_sla'],
+        })
+        Price.objects.get_or_create(product=product, defaults={
+            field: data[field] for field in ('listing_price', 'selling_price', 'cost_price', 'commission_percentage')
+        })
+    elapsed = time.perf_counter() - started
+    print('\n=== before: get_or_create per row ===')
+    print(f'{args.sample:,} products in {elapsed:.2f} s ({args.sample / elapsed:,.0f}/s)')
+
+    for label in ('after: import_catalog into an empty catalog', 'after: import_catalog updating every product'):
+        started = time.perf_counter()
+        out = StringIO()
+        call_command('import_catalog', catalog, '--chunk-size', str(args.chunk_size), stdout=out)
+        elapsed = time.perf_counter() - started
+        print(f'\n=== {label} ===')
+        print(out.getvalue().strip().splitlines()[-1])
+        print(f'{args.products:,} products in {elapsed:.1f} s ({args.products / elapsed:,.0f}/s), '
+              f'peak memory {peak_memory_mb():.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
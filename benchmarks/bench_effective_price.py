@@ -0,0 +1,159 @@
+"""
+Benchmark resolving effective prices with pricing.effective.
+
+Loads synthetic products with prices, pricing rules and special prices
+(current, expired and upcoming) into a scratch SQLite database, then
+resolves --batch SKUs three ways: a Price, SpecialPrice and PricingRule
+query per SKU as the storefront feed did ("before"), effective_prices()
+with the window index loaded, and the whole POST /api/prices/effective/
+request including validation and rendering.
+
+    python benchmarks/bench_effective_price.py --products 200000 --batch 10000
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=200_000, help='Products to load (default: 200,000)')
+    parser.add_argument('--batch', type=int, default=10_000, help='SKUs per resolve (default: 10,000)')
+    parser.add_argument('--repeat', type=int, default=10, help='Timed runs (default: 10)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count):
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from inventory.models import Product
+    from pricing.models import Price, PricingRule, SpecialPrice
+
+    rng = random.Random(42)
+    now = timezone.now()
+    products, prices, rules, specials = [], [], [], []
+    for i in range(count):
+        sku = f'SKU-{i:07d}'
+        products.append((sku, f'FSN-{i:07d}', now, now))
+        prices.append((sku, f'{rng.uniform(100, 5000):.2f}', now))
+        # A third of the SKUs have rules, a fifth promotions, some expired or upcoming
+        for rows, share in ((rules, 0.33), (specials, 0.2)):
+            while rng.random() < share:
+                start = now + timedelta(days=rng.randint(-60, 10))
+                rows.append((sku, start, start + timedelta(days=rng.randint(1, 30))))
+                share /= 2
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f"tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', 'Brand', 'Category', '5000.00', 'HSN', '18.00', 1, %s, %s)",
+            products
+        )
+        cursor.executemany(
+            f'INSERT INTO {Price._meta.db_table} (product_id, listing_price, selling_price, discount_percentage, '
+            f"cost_price, commission_percentage, shipping_fee, last_updated) "
+            f"VALUES (%s, '5000.00', %s, '0', '50.00', '10.00', '0', %s)",
+            prices
+        )
+        cursor.executemany(
+            f'INSERT INTO {PricingRule._meta.db_table} (product_id, rule_name, rule_type, value, percentage, '
+            f"start_date, end_date, is_active, created_at, updated_at) "
+            f"VALUES (%s, 'Rule', 'DISCOUNT', '0', '5.00', %s, %s, 1, %s, %s)",
+            [(sku, start, end, now, now) for sku, start, end in rules]
+        )
+        cursor.executemany(
+            f'INSERT INTO {SpecialPrice._meta.db_table} (product_id, special_price, start_date, end_date, '
+            f"promotion_name, is_active, created_at) VALUES (%s, '99.00', %s, %s, 'Sale', 1, %s)",
+            [(sku, start, end, now) for sku, start, end in specials]
+        )
+    return len(rules), len(specials)
+
+
+def naive_resolve(skus, at):
+    """Three queries per SKU, as the storefront feed resolved prices"""
+    from pricing.effective import apply_rule
+    from pricing.models import Price, PricingRule, SpecialPrice
+
+    resolved = {}
+    for sku in skus:
+        price = Price.objects.get(product_id=sku)
+        special = SpecialPrice.objects.filter(
+            product_id=sku, is_active=True, start_date__lte=at, end_date__gt=at
+        ).order_by('special_price').first()
+        if special is not None:
+            resolved[sku] = special.special_price
+            continue
+        rule = PricingRule.objects.filter(
+            product_id=sku, is_active=True, start_date__lte=at, end_date__gt=at
+        ).order_by('-created_at', '-pk').first()
+        resolved[sku] = (
+            apply_rule(price.selling_price, rule.rule_type, rule.value, rule.percentage) if rule
+            else price.selling_price
+        )
+    return resolved
+
+
+def timed(label, function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'{label}: median {statistics.median(timings):,.1f} ms, max {max(timings):,.1f} ms')
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-effective-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.core.management import call_command
+    from django.test import Client
+    from django.utils import timezone
+    from pricing.effective import effective_prices, get_index
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    rules, specials = load(args.products)
+    print(f'loaded {args.products:,} products, {rules:,} rules and {specials:,} special prices '
+          f'in {time.perf_counter() - started:.1f} s')
+
+    at = timezone.now()
+    skus = [f'SKU-{i:07d}' for i in random.Random(7).sample(range(args.products), args.batch)]
+    started = time.perf_counter()
+    get_index().lookup([], at)
+    print(f'loaded the window index in {(time.perf_counter() - started) * 1000:,.0f} ms')
+
+    print(f'\n=== {args.batch:,} SKUs ===')
+    expected = naive_resolve(skus, at)
+    prices, _ = effective_prices(skus, at)
+    assert expected == {row['sku']: row['effective_price'] for row in prices}
+    timed('before: three queries per SKU', lambda: naive_resolve(skus, at), 1)
+    timed('after: effective_prices()', lambda: effective_prices(skus, at), args.repeat)
+    client = Client()
+    body = json.dumps({'skus': skus, 'at': at.isoformat()})
+    timed('after: POST /pricing/api/prices/effective/', lambda: client.post(
+        '/pricing/api/prices/effective/', body, content_type='application/json'
+    ), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Benchmark the list filters on orders, order items, shipments and returns
+with and without the composite indexes declared in the models' Meta.indexes.
+
+Loads synthetic rows into a scratch SQLite database, then prints the
+query plan and median latency of each filter query, first with the
+filter indexes dropped ("before") and then with them in place ("after").
+
+    python benchmarks/bench_filter_indexes.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+COURIERS = ['Ekart', 'Delhivery', 'BlueDart', 'DTDC', 'XpressBees', 'Shadowfax', 'Ecom Express', 'India Post']
+START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Orders to generate (default: 1,000,000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default: 5)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def timestamp(rng):
+    return (START + timedelta(seconds=rng.randrange(SPAN_SECONDS))).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def load(rows, rng):
+    from django.db import connection, transaction
+    from orders.models import Order, OrderItem
+    from returns.models import Return
+    from shipments.models import Shipment
+
+    order_statuses = [choice for choice, _ in Order.STATUS_CHOICES]
+    shipment_statuses = [choice for choice, _ in Shipment.SHIPMENT_STATUS_CHOICES]
+    return_statuses = [choice for choice, _ in Return.RETURN_STATUS_CHOICES]
+    return_reasons = [choice for choice, _ in Return.RETURN_REASON_CHOICES]
+    now = '2026-01-01 00:00:00'
+    batch = 50_000
+
+    def insert(model, columns, generate, count):
+        table = model._meta.db_table
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        with connection.cursor() as cursor:
+            for start in range(0, count, batch):
+                cursor.executemany(sql, [generate(i) for i in range(start, min(start + batch, count))])
+
+    with transaction.atomic():
+        insert(Order, [
+            'order_id', 'order_date', 'status', 'customer_name', 'shipping_address',
+            'total_amount', 'payment_method', 'created_at', 'updated_at',
+        ], lambda i: (
+            f'ORD-{i:08d}', timestamp(rng), rng.choice(order_statuses), f'Customer {i}',
+            f'{i} Main Road', '999.00', 'COD', now, now,
+        ), rows)
+        insert(OrderItem, [
+            'order_id', 'sku', 'product_name', 'quantity', 'unit_price', 'total_price',
+        ], lambda i: (
+            f'ORD-{i:08d}', f'SKU-{rng.randrange(50_000):05d}', 'Product', 1, '999.00', '999.00',
+        ), rows)
+        insert(Shipment, [
+            'shipment_id', 'order_id', 'tracking_number', 'courier_partner', 'shipment_date',
+            'expected_delivery_date', 'status', 'pickup_address', 'delivery_address', 'weight',
+            'dimensions', 'shipping_charges', 'created_at', 'updated_at',
+        ], lambda i: (
+            f'SHIP-{i:08d}', f'ORD-{i:08d}', f'TRK-{i:08d}', rng.choice(COURIERS), timestamp(rng),
+            now, rng.choice(shipment_statuses), 'Warehouse', 'Customer', '1.00', '10x10x10',
+            '50.00', now, now,
+        ), rows)
+        # Every order has exactly one item, with id = order number + 1
+        insert(Return, [
+            'return_id', 'order_id', 'order_item_id', 'return_date', 'return_reason', 'status',
+            'refund_amount', 'pickup_address', 'created_at', 'updated_at',
+        ], lambda i: (
+            f'RET-{i:08d}', f'ORD-{i * 5:08d}', i * 5 + 1, timestamp(rng),
+            rng.choice(return_reasons), rng.choice(return_statuses), '999.00', 'Customer', now, now,
+        ), rows // 5)
+
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def queries():
+    from orders.models import Order, OrderItem
+    from returns.models import Return
+    from shipments.models import Shipment
+
+    since = START + timedelta(days=300)
+    until = since + timedelta(days=30)
+    return [
+        ('orders ?status=', Order.objects.filter(status='SHIPPED').order_by('-order_date', '-order_id')[:50]),
+        ('orders ?status=&order_date range', Order.objects.filter(
+            status='PACKED', order_date__gte=since, order_date__lt=until
+        ).order_by('-order_date', '-order_id')[:50]),
+        ('order items ?sku=', OrderItem.objects.filter(sku='SKU-04242')),
+        ('shipments ?status=', Shipment.objects.filter(status='IN_TRANSIT')[:50]),
+        ('shipments ?courier_partner=&shipment_date range', Shipment.objects.filter(
+            courier_partner='Delhivery', shipment_date__gte=since, shipment_date__lt=until
+        )[:50]),
+        ('returns ?status=', Return.objects.filter(status='APPROVED')[:50]),
+        ('returns ?return_reason=', Return.objects.filter(return_reason='DAMAGED')[:50]),
+    ]
+
+
+def filter_indexes():
+    from orders.models import Order, OrderItem
+    from returns.models import Return
+    from shipments.models import Shipment
+
+    return [(model, index) for model in (Order, OrderItem, Shipment, Return) for index in model._meta.indexes]
+
+
+def run(label, repeat):
+    print(f'\n=== {label} ===')
+    results = {}
+    for name, queryset in queries():
+        plan = queryset.explain()
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            list(queryset._chain())
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = statistics.median(timings)
+        print(f'\n{name}: {results[name]:.2f} ms')
+        for line in plan.splitlines():
+            print(f'    {line}')
+    return results
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-filters-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db import connection
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    load(args.rows, random.Random(42))
+    print(f'Loaded {args.rows:,} orders, items and shipments and {args.rows // 5:,} returns '
+          f'in {time.perf_counter() - started:.1f} s')
+
+    indexes = filter_indexes()
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+    before = run('before: no filter indexes', args.repeat)
+
+    with connection.schema_editor() as editor:
+        for model, index in indexes:
+            editor.add_index(model, index)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    after = run('after: Meta.indexes in place', args.repeat)
+
+    print('\n=== summary (median ms) ===')
+    width = max(len(name) for name in before)
+    print(f"{'query':<{width}}  {'before':>10}  {'after':>10}  {'speedup':>8}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f'{name:<{width}}  {before[name]:>10.2f}  {after[name]:>10.2f}  {speedup:>7.0f}x')
+
+
+if __name__ == '__main__':
+    main()
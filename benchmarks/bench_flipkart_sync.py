@@ -0,0 +1,96 @@
+"""
+Benchmark pushing stock levels to the Flipkart stub server.
+
+Starts flipkart_seller_center.flipkart_stub with some latency, a failure
+rate and a server-side rate limit, then pushes --skus stock levels twice:
+one requests.post per SKU on a fresh connection with no retries
+("before"), and through FlipkartClient with pooled connections, batches of
+10, a token bucket just under the server's limit and retries with backoff
+("after"). Prints throughput, connections opened, and how many updates
+reached the stub.
+
+    python benchmarks/bench_flipkart_sync.py --skus 5000 --latency 0.02 --failure-rate 0.02
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--skus', type=int, default=5000, help='Stock levels to push (default: 5,000)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub latency in seconds (default: 0.02)')
+    parser.add_argument('--failure-rate', type=float, default=0.02, help='Share of 503 answers (default: 0.02)')
+    parser.add_argument('--rate-limit', type=float, default=200, help='Stub requests per second (default: 200)')
+    parser.add_argument('--workers', type=int, default=8, help='Client workers (default: 8)')
+    return parser.parse_args()
+
+
+def updates(count):
+    return [{'sku': f'SKU-{i:06d}', 'fsn': f'FSN-{i:06d}', 'quantity': i % 100} for i in range(count)]
+
+
+def naive_push(url, items):
+    """One request per SKU, a new connection and token lookup each time, no retries"""
+    import requests
+    from flipkart_seller_center.flipkart import INVENTORY_PATH, TOKEN_PATH
+
+    token = requests.get(f'{url}{TOKEN_PATH}', auth=('stub-key', 'stub-secret'), timeout=10).json()['access_token']
+    succeeded = 0
+    for item in items:
+        response = requests.post(f'{url}{INVENTORY_PATH}', headers={'Authorization': f'Bearer {token}'}, json={
+            item['sku']: {'product_id': item['fsn'], 'locations': [{'id': 'LOC1', 'inventory': item['quantity']}]}
+        }, timeout=10)
+        succeeded += response.status_code == 200
+    return succeeded
+
+
+def main():
+    args = parse_args()
+    settings.DEBUG = False
+    django.setup()
+
+    from flipkart_seller_center.flipkart import FlipkartClient
+    from flipkart_seller_center.flipkart_stub import StubServer
+
+    items = updates(args.skus)
+    stub_options = {'latency': args.latency, 'failure_rate': args.failure_rate,
+                    'rate_limit': args.rate_limit, 'seed': 42}
+
+    with StubServer(**stub_options) as stub:
+        started = time.perf_counter()
+        succeeded = naive_push(stub.url, items)
+        elapsed = time.perf_counter() - started
+        print('=== before: one request per SKU, new connection each, no retries ===')
+        print(f'{args.skus:,} SKUs in {elapsed:.1f} s ({args.skus / elapsed:,.0f} SKUs/s)')
+        print(f"{succeeded:,} updated, {stub.stats['throttled']:,} throttled, {stub.stats['failed']:,} failed, "
+              f'{len(stub.connections):,} connections')
+
+    with StubServer(**stub_options) as stub:
+        client = FlipkartClient({
+            'BASE_URL': stub.url, 'API_KEY': 'stub-key', 'API_SECRET': 'stub-secret', 'TIMEOUT': 10,
+            'RATE_LIMIT': args.rate_limit * 0.95, 'BURST': max(1, int(args.rate_limit // 10)),
+            'WORKERS': args.workers, 'POOL_SIZE': args.workers, 'BACKOFF': 0.05, 'LOCATION_ID': 'LOC1',
+        })
+        started = time.perf_counter()
+        summary = client.push_inventory(items)
+        elapsed = time.perf_counter() - started
+        client.close()
+        print('\n=== after: FlipkartClient (pooled, batched, rate-limited, retried) ===')
+        print(f'{args.skus:,} SKUs in {elapsed:.1f} s ({args.skus / elapsed:,.0f} SKUs/s)')
+        print(f"{summary['succeeded']:,} updated in {summary['batches']:,} batches, "
+              f"{client.counters['retries']:,} retries, {stub.stats['throttled']:,} throttled, "
+              f'{len(stub.connections):,} connections')
+        print(f"stub holds {len(stub.inventory):,} of {args.skus:,} SKUs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark catalog-wide margin computation with pricing.margins.
+
+Loads synthetic products and prices into a scratch SQLite database, then
+computes every SKU's margin two ways: serializing all Price rows with
+PriceSerializer to read profit_margin ("before"), and margin_report(),
+which reads cast columns in chunks and computes with NumPy arrays.
+
+    python benchmarks/bench_margin_report.py --products 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=1_000_000, help='Products to load (default: 1,000,000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count):
+    from django.db import connection, transaction
+    from django.utils import timezone
+    from inventory.models import Product
+    from pricing.models import Price
+
+    rng = random.Random(42)
+    now = timezone.now()
+    products, prices = [], []
+    for i in range(count):
+        sku = f'SKU-{i:07d}'
+        selling_price = rng.lognormvariate(6.5, 1)
+        products.append((sku, f'FSN-{i:07d}', now, now))
+        prices.append((
+            sku, f'{selling_price * 1.2:.2f}', f'{selling_price:.2f}',
+            f'{selling_price * rng.uniform(0.4, 1.0):.2f}', f'{rng.choice([5, 8, 12, 15]):.2f}',
+            f'{rng.choice([0, 40, 70]):.2f}', now,
+        ))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f"tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', 'Brand', 'Category', '5000.00', 'HSN', '18.00', 1, %s, %s)",
+            products
+        )
+        cursor.executemany(
+            f'INSERT INTO {Price._meta.db_table} (product_id, listing_price, selling_price, discount_percentage, '
+            f"cost_price, commission_percentage, shipping_fee, last_updated) "
+            f"VALUES (%s, %s, %s, '0', %s, %s, %s, %s)",
+            prices
+        )
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-margins-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from pricing.margins import margin_report
+    from pricing.models import Price
+    from pricing.serializers import PriceSerializer
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    load(args.products)
+    print(f'loaded {args.products:,} prices in {time.perf_counter() - started:.1f} s')
+
+    print('\n=== before: PriceSerializer(many=True), profit_margin per row ===')
+    started = time.perf_counter()
+    margins = [row['profit_margin'] for row in PriceSerializer(Price.objects.all(), many=True).data]
+    loss_making = sum(margin < 0 for margin in margins)
+    print(f'{len(margins):,} margins, {loss_making:,} loss-making in {time.perf_counter() - started:.1f} s')
+
+    print('\n=== after: margin_report() ===')
+    started = time.perf_counter()
+    report = margin_report()
+    print(f"{report['products']:,} margins, {report['loss_making']:,} loss-making "
+          f'in {time.perf_counter() - started:.1f} s')
+    print(f"worst: {report['worst'][0]['sku']} at {report['worst'][0]['margin']}")
+    assert report['loss_making'] == loss_making
+
+
+if __name__ == '__main__':
+    main()
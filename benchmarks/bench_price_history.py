@@ -0,0 +1,164 @@
+"""
+Benchmark the price history in pricing.history.
+
+Loads synthetic prices and a long price history into a scratch SQLite
+database, then times the write path with and without history recording:
+Price.save() calls that change the selling price, one and 50 per
+transaction, with the history signal handlers disconnected ("before") and
+connected ("after"), and repricing a brand with reprice(). Lookups are
+timed last: price_at() for random SKUs and times, and price_changes() over
+a month.
+
+    python benchmarks/bench_price_history.py --products 20000 --changes 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=20_000, help='Products to load (default: 20,000)')
+    parser.add_argument('--changes', type=int, default=100, help='History rows per product (default: 100)')
+    parser.add_argument('--saves', type=int, default=2000, help='Single saves to time (default: 2,000)')
+    parser.add_argument('--lookups', type=int, default=2000, help='Lookups to time (default: 2,000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count, changes, now):
+    from django.db import connection, transaction
+    from inventory.models import Product
+    from pricing.models import Price, PriceHistory
+
+    rng = random.Random(42)
+    adapt = connection.ops.adapt_datetimefield_value
+    stamp = adapt(now)
+    products, prices, history = [], [], []
+    for i in range(count):
+        sku = f'SKU-{i:07d}'
+        selling_price = rng.lognormvariate(6.5, 1)
+        products.append((sku, f'FSN-{i:07d}', f'Brand {i % 10}', stamp, stamp))
+        prices.append((sku, f'{selling_price * 1.2:.2f}', f'{selling_price:.2f}', stamp))
+        # A year of changes, oldest first
+        for j in range(changes):
+            history.append((
+                sku, f'{selling_price * 1.2:.2f}', f'{selling_price * rng.uniform(0.8, 1.0):.2f}',
+                adapt(now - timedelta(days=365) * (changes - j) / changes),
+            ))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f"tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', %s, 'Category', '5000.00', 'HSN', '18.00', 1, %s, %s)",
+            products
+        )
+        cursor.executemany(
+            f'INSERT INTO {Price._meta.db_table} (product_id, listing_price, selling_price, discount_percentage, '
+            f"cost_price, commission_percentage, shipping_fee, last_updated) "
+            f"VALUES (%s, %s, %s, '0', '0', '0', '0', %s)",
+            prices
+        )
+        cursor.executemany(
+            f'INSERT INTO {PriceHistory._meta.db_table} (sku, source, listing_price, selling_price, valid_from) '
+            f"VALUES (%s, 'PRICE', %s, %s, %s)",
+            history
+        )
+
+
+def time_saves(prices, per_transaction):
+    from django.db import transaction
+
+    started = time.perf_counter()
+    for start in range(0, len(prices), per_transaction):
+        with transaction.atomic():
+            for price in prices[start:start + per_transaction]:
+                price.selling_price -= Decimal('1.00')
+                price.save()
+    return time.perf_counter() - started
+
+
+def report_saves(prices, per_transaction):
+    elapsed = time_saves(prices, per_transaction)
+    print(f'{len(prices):,} saves, {per_transaction} per transaction, in {elapsed:.2f} s, '
+          f'{elapsed * 1e6 / len(prices):.0f} us per save')
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-history-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from django.db.models.signals import post_save
+    from django.utils import timezone
+    from pricing import signals
+    from pricing.history import price_at, price_changes
+    from pricing.models import Price, PriceHistory
+    from pricing.repricing import price_queryset, reprice
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    now = timezone.now()
+    started = time.perf_counter()
+    load(args.products, args.changes, now)
+    print(f'loaded {args.products:,} prices and {args.products * args.changes:,} history rows '
+          f'in {time.perf_counter() - started:.1f} s')
+
+    rng = random.Random(7)
+    sample = rng.sample(range(args.products), 2 * args.saves)
+    skus = [f'SKU-{i:07d}' for i in sample]
+    before = list(Price.objects.filter(product_id__in=skus[:args.saves]))
+    after = list(Price.objects.filter(product_id__in=skus[args.saves:]))
+
+    print('\n=== before: Price.save() without history ===')
+    post_save.disconnect(signals.record_saved_price, sender=Price)
+    for per_transaction in (1, 50):
+        report_saves(before, per_transaction)
+    post_save.connect(signals.record_saved_price, sender=Price)
+
+    print('\n=== after: Price.save() with history ===')
+    rows = PriceHistory.objects.count()
+    for per_transaction in (1, 50):
+        report_saves(after, per_transaction)
+    print(f'{PriceHistory.objects.count() - rows:,} history rows')
+
+    print('\n=== reprice(), one brand -5% ===')
+    started = time.perf_counter()
+    updated = reprice(price_queryset(brand=['Brand 1']), percent=Decimal('-5'))
+    print(f'{updated:,} prices changed and recorded in {time.perf_counter() - started:.2f} s')
+
+    print('\n=== price_at() ===')
+    started = time.perf_counter()
+    for _ in range(args.lookups):
+        price_at(f'SKU-{rng.randrange(args.products):07d}', now - timedelta(days=rng.uniform(0, 365)))
+    elapsed = time.perf_counter() - started
+    print(f'{args.lookups:,} lookups in {elapsed:.2f} s, {elapsed * 1e3 / args.lookups:.2f} ms per lookup')
+
+    print('\n=== price_changes(), 30 days ===')
+    started = time.perf_counter()
+    total = 0
+    for _ in range(args.lookups):
+        start = now - timedelta(days=rng.uniform(30, 365))
+        total += len(price_changes(f'SKU-{rng.randrange(args.products):07d}', start, start + timedelta(days=30)))
+    elapsed = time.perf_counter() - started
+    print(f'{args.lookups:,} ranges ({total / args.lookups:.1f} rows each) in {elapsed:.2f} s, '
+          f'{elapsed * 1e3 / args.lookups:.2f} ms per range')
+
+
+if __name__ == '__main__':
+    main()
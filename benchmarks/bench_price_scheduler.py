@@ -0,0 +1,114 @@
+"""
+Benchmark promotion expiry with pricing.schedule.
+
+Loads synthetic special prices with windows spread over --days into a
+scratch SQLite database, then compares a minute of work two ways: the
+table-scanning UPDATE a cron job would run every minute ("before"), and
+PriceScheduler ticks, both idle (nothing due, no changes) and at a window
+end.
+
+    python benchmarks/bench_price_scheduler.py --promotions 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--promotions', type=int, default=500_000, help='Special prices to load (default: 500,000)')
+    parser.add_argument('--days', type=int, default=60, help='Days the windows are spread over (default: 60)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count, days, now):
+    from django.db import connection, transaction
+    from inventory.models import Product
+    from pricing.models import SpecialPrice
+
+    # Stored as Django writes them, so boundaries compare equal
+    adapt = connection.ops.adapt_datetimefield_value
+    rng = random.Random(42)
+    products = max(1, count // 5)
+    rows = []
+    for i in range(count):
+        # Windows start on the minute, as promotions are scheduled
+        start = now + timedelta(minutes=rng.randint(-days * 720, days * 720))
+        end = start + timedelta(hours=rng.choice([1, 6, 24, 72]))
+        rows.append((f'SKU-{i % products:07d}', adapt(start), adapt(end), int(rng.random() < 0.5), adapt(now)))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, mrp, hsn_code, '
+            f"tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', 'Brand', 'Category', '5000.00', 'HSN', '18.00', 1, %s, %s)",
+            [(f'SKU-{i:07d}', f'FSN-{i:07d}', adapt(now), adapt(now)) for i in range(products)]
+        )
+        cursor.executemany(
+            f'INSERT INTO {SpecialPrice._meta.db_table} (product_id, special_price, start_date, end_date, '
+            f"promotion_name, is_active, created_at) VALUES (%s, '99.00', %s, %s, 'Sale', %s, %s)",
+            rows
+        )
+
+
+def timed(label, function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'{label}: median {statistics.median(timings):,.2f} ms, max {max(timings):,.2f} ms')
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-scheduler-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+    from django.utils import timezone
+    from pricing.models import SpecialPrice
+    from pricing.schedule import PriceScheduler
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    now = timezone.now().replace(second=0, microsecond=0)
+    started = time.perf_counter()
+    load(args.promotions, args.days, now)
+    print(f'loaded {args.promotions:,} special prices in {time.perf_counter() - started:.1f} s')
+
+    def scan(at):
+        SpecialPrice.objects.filter(is_active=True, end_date__lte=at).update(is_active=False)
+
+    print('\n=== before: scan for expired rows every minute ===')
+    minutes = iter(range(1, 10_000))
+    timed('per minute', lambda: scan(now + timedelta(minutes=next(minutes))), 5)
+
+    print('\n=== after: PriceScheduler ===')
+    scheduler = PriceScheduler()
+    started = time.perf_counter()
+    counts = scheduler.start(now)
+    print(f'start (load and catch up): {time.perf_counter() - started:.1f} s, '
+          f"{scheduler.pending():,} window ends, {counts['deactivated']:,} expired switched off")
+    timed('idle tick', lambda: scheduler.tick(now + timedelta(seconds=30)), 50)
+    minutes = iter(range(1, 10_000))
+    timed('tick at a minute boundary', lambda: scheduler.tick(now + timedelta(minutes=next(minutes))), 20)
+    print(f"flipped {scheduler.counters['deactivated']:,} off over 20 minutes")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark catalog facet counts with inventory.facets.
+
+Loads synthetic products into a scratch SQLite database, builds the facet
+count table, then times facet requests three ways: grouping the products
+table directly ("before"), grouping the facet count table, and answering
+from the cache.
+
+    python benchmarks/bench_product_facets.py --products 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+CATEGORIES = 30
+BRANDS_PER_CATEGORY = 20
+SUBCATEGORIES_PER_CATEGORY = 8
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=1_000_000, help='Products to load (default: 1,000,000)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per request (default: 20)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def load(count):
+    from django.db import connection, transaction
+    from inventory.models import Product
+
+    rng = random.Random(42)
+    now = '2026-01-01 00:00:00'
+    rows = []
+    for i in range(count):
+        category = rng.randrange(CATEGORIES)
+        subcategory = rng.randrange(SUBCATEGORIES_PER_CATEGORY + 1)
+        rows.append((
+            f'SKU-{i:07d}', f'FSN-{i:07d}',
+            f'Brand {category}-{rng.randrange(BRANDS_PER_CATEGORY)}', f'Category {category}',
+            f'Subcategory {category}-{subcategory}' if subcategory else None,
+            f'{rng.lognormvariate(7, 1.2):.2f}', int(rng.random() < 0.9), now, now,
+        ))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {Product._meta.db_table} (sku, fsn, product_name, brand, category, subcategory, mrp, '
+            f"hsn_code, tax_percentage, is_active, created_at, updated_at) "
+            f"VALUES (%s, %s, 'Product', %s, %s, %s, %s, 'HSN', '18.00', %s, %s, %s)",
+            rows
+        )
+
+
+def timed(label, function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'{label}: median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms')
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-facets-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    settings.DEBUG = False
+    django.setup()
+
+    from decimal import Decimal
+    from django.core.management import call_command
+    from inventory import facets
+    from inventory.models import Product, ProductFacetCount
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    started = time.perf_counter()
+    load(args.products)
+    print(f'loaded {args.products:,} products in {time.perf_counter() - started:.1f} s')
+    started = time.perf_counter()
+    facets.rebuild()
+    print(f'rebuilt {ProductFacetCount.objects.count():,} facet count rows in '
+          f'{time.perf_counter() - started:.1f} s')
+
+    requests = {
+        'no filters': {},
+        'one category': {'category': 'Category 3'},
+        'category, brands, active, MRP band': {
+            'category': 'Category 3', 'brand__in': ['Brand 3-1', 'Brand 3-2'],
+            'is_active': True, 'mrp__gte': Decimal('1000.00'), 'mrp__lt': Decimal('5000.00'),
+        },
+    }
+    for name, filters in requests.items():
+        print(f'\n=== {name} ===')
+        counted = facets._count(filters)
+        print(f"{counted['total']:,} products, {len(counted['facets']['brand'])} brands")
+        timed('before: group products', lambda: facets._count({**filters, 'mrp__gte': Decimal('0.01')}), 3)
+        timed('after: group facet counts', lambda: facets._count(filters), args.repeat)
+        timed('after: cached', lambda: facets.facet_counts(filters), args.repeat)
+    assert Product.objects.count() == sum(ProductFacetCount.objects.values_list('product_count', flat=True))
+
+
+if __name__ == '__main__':
+    main()
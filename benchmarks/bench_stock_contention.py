@@ -0,0 +1,146 @@
+"""
+Benchmark concurrent stock reservations on a single hot SKU.
+
+Worker threads reserve one unit at a time until the stock runs out, first
+with a naive read-modify-write of the inventory row ("before") and then
+with the guarded UPDATE in inventory.stock.reserve ("after"). For each run
+it prints throughput and checks the final row against the number of
+reservations that reported success: every successful reservation must be
+reflected exactly once and nothing may be oversold.
+
+    python benchmarks/bench_stock_contention.py --threads 32 --stock 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+SKU = 'HOT-SKU'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32, help='Concurrent workers (default: 32)')
+    parser.add_argument('--stock', type=int, default=5000, help='Units available on the hot SKU (default: 5000)')
+    parser.add_argument('--extra', type=int, default=1000,
+                        help='Reservation attempts beyond the stock, to exercise the guard (default: 1000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def reset(stock):
+    from inventory.models import Inventory, Product
+
+    Product.objects.get_or_create(sku=SKU, defaults={
+        'fsn': SKU, 'product_name': 'Hot product', 'brand': 'Brand', 'category': 'Category',
+        'mrp': '999.00', 'hsn_code': 'HSN', 'tax_percentage': '18.00',
+    })
+    Inventory.objects.update_or_create(product_id=SKU, defaults={
+        'available_quantity': stock, 'reserved_quantity': 0, 'procurement_sla': 1,
+    })
+
+
+def naive_reserve():
+    """The old update_stock pattern: read, check and write back absolute values"""
+    from inventory.models import Inventory
+
+    inventory = Inventory.objects.get(product_id=SKU)
+    if inventory.available_quantity < 1:
+        return False
+    inventory.available_quantity -= 1
+    inventory.reserved_quantity += 1
+    inventory.save(update_fields=['available_quantity', 'reserved_quantity', 'last_updated'])
+    return True
+
+
+def guarded_reserve():
+    from inventory import stock
+
+    try:
+        stock.reserve(1, product_id=SKU)
+    except stock.InsufficientStock:
+        return False
+    return True
+
+
+def run(label, reserve, args):
+    from django.db import OperationalError, connection
+    from inventory.models import Inventory
+
+    reset(args.stock)
+    attempts = args.stock + args.extra
+    counters = {'success': 0, 'rejected': 0, 'errors': 0}
+    lock = threading.Lock()
+    remaining = [attempts]
+
+    def worker():
+        local = {'success': 0, 'rejected': 0, 'errors': 0}
+        try:
+            while True:
+                with lock:
+                    if not remaining[0]:
+                        break
+                    remaining[0] -= 1
+                try:
+                    local['success' if reserve() else 'rejected'] += 1
+                except OperationalError:
+                    local['errors'] += 1
+        finally:
+            connection.close()
+            with lock:
+                for name, value in local.items():
+                    counters[name] += value
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    inventory = Inventory.objects.get(product_id=SKU)
+    lost = counters['success'] - inventory.reserved_quantity
+    oversold = max(counters['success'] - args.stock, 0)
+    consistent = (
+        lost == 0 and oversold == 0
+        and inventory.available_quantity + inventory.reserved_quantity == args.stock
+    )
+    print(f'\n=== {label} ===')
+    print(f'attempts {attempts:,} in {elapsed:.2f} s ({attempts / elapsed:,.0f}/s) on {args.threads} threads')
+    print(f"reported success {counters['success']:,}, rejected {counters['rejected']:,}, "
+          f"database errors {counters['errors']:,}")
+    print(f'final row: available {inventory.available_quantity:,}, reserved {inventory.reserved_quantity:,}')
+    print(f'lost updates {lost:,}, oversold {oversold:,} -> {"OK" if consistent else "INCONSISTENT"}')
+    return consistent
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-stock-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    # Let writers queue on SQLite's lock instead of failing after 5 seconds
+    settings.DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 60
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    run('before: read-modify-write', naive_reserve, args)
+    consistent = run('after: guarded UPDATE (inventory.stock.reserve)', guarded_reserve, args)
+    sys.exit(0 if consistent else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark concurrent restocks of a single hot SKU through the stock ledger.
+
+Worker threads report one unit at a time, first with the guarded UPDATE in
+inventory.stock.adjust ("before"), which writes the inventory row and logs
+an entry, and then with inventory.ledger.record ("after"), which only
+inserts a pending entry. The pending entries are then folded in with
+inventory.ledger.compact, and the final row is checked against the number
+of successful reports. SQLite locks the whole database for every write, so
+both runs serialize there; pending entries pay off on databases with row
+locks, where they no longer queue on the hot inventory row.
+
+    python benchmarks/bench_stock_ledger.py --threads 32 --writes 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'flipkart_seller_center.settings')
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+SKU = 'HOT-SKU'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=32, help='Concurrent workers (default: 32)')
+    parser.add_argument('--writes', type=int, default=5000, help='Restocks of one unit per run (default: 5000)')
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary file)')
+    return parser.parse_args()
+
+
+def reset():
+    from inventory.models import Inventory, Product, StockLedgerEntry
+
+    Product.objects.get_or_create(sku=SKU, defaults={
+        'fsn': SKU, 'product_name': 'Hot product', 'brand': 'Brand', 'category': 'Category',
+        'mrp': '999.00', 'hsn_code': 'HSN', 'tax_percentage': '18.00',
+    })
+    Inventory.objects.update_or_create(product_id=SKU, defaults={
+        'available_quantity': 0, 'reserved_quantity': 0, 'procurement_sla': 1,
+    })
+    StockLedgerEntry.objects.all().delete()
+
+
+def adjust():
+    from inventory import stock
+
+    stock.adjust(1, reference_id='BENCH', product_id=SKU)
+
+
+def record():
+    from inventory import ledger
+
+    ledger.record([{'sku': SKU, 'reason': 'RESTOCK', 'reference_id': 'BENCH', 'available_delta': 1}])
+
+
+def run(label, write, args):
+    from django.db import OperationalError, connection
+    from inventory import ledger
+    from inventory.models import Inventory
+
+    reset()
+    counters = {'success': 0, 'errors': 0}
+    lock = threading.Lock()
+    remaining = [args.writes]
+
+    def worker():
+        local = {'success': 0, 'errors': 0}
+        try:
+            while True:
+                with lock:
+                    if not remaining[0]:
+                        break
+                    remaining[0] -= 1
+                try:
+                    write()
+                    local['success'] += 1
+                except OperationalError:
+                    local['errors'] += 1
+        finally:
+            connection.close()
+            with lock:
+                for name, value in local.items():
+                    counters[name] += value
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pending = ledger.pending_count()
+    compact_started = time.perf_counter()
+    ledger.compact()
+    compacted = time.perf_counter() - compact_started
+
+    inventory = Inventory.objects.get(product_id=SKU)
+    consistent = inventory.available_quantity == counters['success']
+    print(f'\n=== {label} ===')
+    print(f'writes {args.writes:,} in {elapsed:.2f} s ({args.writes / elapsed:,.0f}/s) on {args.threads} threads')
+    print(f"reported success {counters['success']:,}, database errors {counters['errors']:,}")
+    print(f'compacted {pending:,} pending entries in {compacted * 1000:.1f} ms')
+    print(f'final row: available {inventory.available_quantity:,} -> {"OK" if consistent else "INCONSISTENT"}')
+    return consistent
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='bench-ledger-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = db_path
+    # Let writers queue on SQLite's lock instead of failing after 5 seconds
+    settings.DATABASES['default'].setdefault('OPTIONS', {})['timeout'] = 60
+    settings.DEBUG = False
+    django.setup()
+
+    from django.core.management import call_command
+
+    print(f'Database: {db_path}')
+    call_command('migrate', verbosity=0)
+    before = run('before: guarded UPDATE per restock (inventory.stock.adjust)', adjust, args)
+    after = run('after: pending ledger entries (inventory.ledger.record)', record, args)
+    sys.exit(0 if before and after else 1)
+
+
+if __name__ == '__main__':
+    main()
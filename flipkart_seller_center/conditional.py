@@ -0,0 +1,89 @@
+"""
+Conditional GET (ETag / Last-Modified) for detail endpoints.
+
+Validators are read with one aggregate query over the object's own row and
+the related rows its representation includes, so a poll for an unchanged
+resource is answered with 304 Not Modified without fetching or serializing
+the object.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag and Last-Modified validators to ``retrieve`` and to any detail
+    action listed in ``conditional_validators``.
+
+    ``conditional_validators`` maps an action name to the timestamp lookups
+    its response depends on, such as ``'updated_at'`` or
+    ``'tracking_events__created_at'``. Lookups that span a relation also
+    count the related rows, so deleting one changes the ETag. Custom actions
+    call ``check_not_modified`` before doing any work.
+    """
+    conditional_validators = {'retrieve': ['updated_at']}
+
+    def retrieve(self, request, *args, **kwargs):
+        not_modified = self.check_not_modified(request)
+        if not_modified is not None:
+            return not_modified
+        return super().retrieve(request, *args, **kwargs)
+
+    def check_not_modified(self, request):
+        """Return a 304 response when the client's copy is current, otherwise None"""
+        self.response_validators = None
+        lookups = self.conditional_validators.get(self.action)
+        if not lookups or request.method not in SAFE_METHODS:
+            return None
+        self.response_validators = self.get_validators(lookups)
+        if self.response_validators is None:
+            # Missing object: let the handler return its usual 404
+            return None
+        etag, last_modified = self.response_validators
+        return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+    def get_validators(self, lookups):
+        """(ETag, Last-Modified timestamp) of the requested object, or None when it does not exist"""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        aggregates = {}
+        for index, lookup in enumerate(lookups):
+            aggregates[f'modified_{index}'] = Max(lookup)
+            relation, _, _ = lookup.rpartition('__')
+            if relation:
+                aggregates[f'count_{index}'] = Count(f'{relation}__pk', distinct=True)
+        values = queryset.order_by().aggregate(**aggregates)
+        if values['modified_0'] is None:
+            return None
+
+        timestamps = [value for name, value in values.items() if name.startswith('modified_') and value]
+        last_modified = int(max(timestamps).timestamp())
+        signature = '|'.join(
+            [self.action, str(self.kwargs[lookup_url_kwarg]), request_format(self.request)]
+            + [f'{name}={value.isoformat() if hasattr(value, "isoformat") else value}'
+               for name, value in sorted(values.items())]
+        )
+        etag = quote_etag(hashlib.blake2b(signature.encode('utf-8'), digest_size=16).hexdigest())
+        return etag, last_modified
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        validators = getattr(self, 'response_validators', None)
+        if validators is not None and response.status_code == 200:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+def request_format(request):
+    """Renderer chosen for the request, so JSON and browsable API responses get different ETags"""
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer.format if renderer is not None else ''
@@ -0,0 +1,291 @@
+"""
+Client for pushing inventory and prices to the Flipkart Marketplace API.
+
+``FlipkartClient`` is built from ``FLIPKART_API_CONFIG`` and is safe to
+share between threads:
+
+- one ``requests.Session`` with a connection pool of ``POOL_SIZE``, so
+  batches reuse TCP and TLS connections instead of opening one per call;
+- the OAuth access token is cached in the Django cache named by
+  ``CACHE_ALIAS`` until shortly before it expires, and fetched again once
+  on a 401;
+- listing updates are sent ``BATCH_SIZE`` SKUs per request (the
+  marketplace accepts at most 10), from ``WORKERS`` threads;
+- every request first takes a token from a ``TokenBucket`` of
+  ``RATE_LIMIT`` requests per second, so the workers together never exceed
+  the seller's quota;
+- 429 and 5xx responses and connection errors are retried up to
+  ``MAX_RETRIES`` times with exponential backoff and jitter, honouring
+  ``Retry-After``.
+
+``flipkart_seller_center.flipkart_stub`` serves the same endpoints locally
+for tests and benchmarks.
+"""
+import hashlib
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.cache import caches
+from requests.adapters import HTTPAdapter
+
+DEFAULTS = {
+    'BASE_URL': 'https://api.flipkart.net/sellers',
+    'API_KEY': '',
+    'API_SECRET': '',
+    'TIMEOUT': 30,
+    'CACHE_ALIAS': 'default',
+    'RATE_LIMIT': 10,
+    'BURST': 10,
+    'BATCH_SIZE': 10,
+    'WORKERS': 4,
+    'POOL_SIZE': 10,
+    'MAX_RETRIES': 5,
+    'BACKOFF': 0.5,
+    'MAX_BACKOFF': 30,
+    'LOCATION_ID': '',
+}
+
+TOKEN_PATH = '/oauth-service/oauth/token'
+INVENTORY_PATH = '/listings/v3/update/inventory'
+PRICE_PATH = '/listings/v3/update/price'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Seconds before the token's expiry at which it is fetched again
+TOKEN_MARGIN = 60
+
+
+class FlipkartAPIError(Exception):
+    """Raised when a request fails for good: a client error, or retries ran out"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: ``rate`` tokens per second, at most ``capacity``
+    stored. ``acquire`` blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or capacity < 1:
+            raise ValueError('rate must be positive and capacity at least 1')
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, returning the seconds spent waiting for it"""
+        waited = 0.0
+        while True:
+            delay = self.try_acquire()
+            if not delay:
+                return waited
+            self._sleep(delay)
+            waited += delay
+
+    def try_acquire(self):
+        """Take one token if one is available; otherwise return the seconds until one is"""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0
+            return (1 - self._tokens) / self.rate
+
+
+class FlipkartClient:
+    """Pooled, rate-limited client for the listing update endpoints"""
+
+    def __init__(self, config=None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self.base_url = self.config['BASE_URL'].rstrip('/')
+        self.bucket = TokenBucket(self.config['RATE_LIMIT'], self.config['BURST'])
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=self.config['POOL_SIZE'], max_retries=0, pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        digest = hashlib.sha256(self.config['API_KEY'].encode('utf-8')).hexdigest()[:16]
+        self._token_key = f'flipkart:token:{digest}'
+        self._token_lock = threading.Lock()
+        self._counters_lock = threading.Lock()
+        self.counters = dict.fromkeys(('requests', 'retries', 'token_fetches', 'throttled_seconds'), 0)
+
+    @property
+    def cache(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    def close(self):
+        self.session.close()
+
+    def push_inventory(self, updates):
+        """
+        Send ``{'sku', 'fsn', 'quantity'}`` updates (optionally with a
+        ``location_id``); returns the number sent and succeeded and the
+        errors of the SKUs that failed.
+        """
+        location = self.config['LOCATION_ID']
+
+        def payload(update):
+            entry = {'product_id': update['fsn'], 'locations': [
+                {'id': update.get('location_id') or location, 'inventory': update['quantity']}
+            ]}
+            return update['sku'], entry
+
+        return self._push(INVENTORY_PATH, (payload(update) for update in updates))
+
+    def push_prices(self, updates):
+        """Send ``{'sku', 'fsn', 'mrp', 'selling_price'}`` updates; returns a summary"""
+        def payload(update):
+            return update['sku'], {'product_id': update['fsn'], 'price': {
+                'mrp': str(update['mrp']), 'selling_price': str(update['selling_price']), 'currency': 'INR',
+            }}
+
+        return self._push(PRICE_PATH, (payload(update) for update in updates))
+
+    def access_token(self, rejected=None):
+        """
+        The cached OAuth access token, fetched when missing or when it is
+        ``rejected``, the token a request just got a 401 for.
+        """
+        token = self.cache.get(self._token_key)
+        if token and token != rejected:
+            return token
+        with self._token_lock:
+            # Another thread may have replaced the token while this one waited
+            token = self.cache.get(self._token_key)
+            if token and token != rejected:
+                return token
+            response = self._send('GET', TOKEN_PATH, auth=(self.config['API_KEY'], self.config['API_SECRET']),
+                                  params={'grant_type': 'client_credentials', 'scope': 'Seller_Api'})
+            data = response.json()
+            token = data['access_token']
+            self._count('token_fetches')
+            timeout = max(int(data.get('expires_in', 3600)) - TOKEN_MARGIN, 1)
+            self.cache.set(self._token_key, token, timeout)
+            return token
+
+    def request(self, method, path, **kwargs):
+        """Authenticated request, fetching a fresh token once on a 401"""
+        token = self.access_token()
+        response = self._send(method, path, headers={'Authorization': f'Bearer {token}'},
+                              allow_unauthorized=True, **kwargs)
+        if response.status_code == 401:
+            token = self.access_token(rejected=token)
+            response = self._send(method, path, headers={'Authorization': f'Bearer {token}'}, **kwargs)
+        return response
+
+    def _push(self, path, entries):
+        summary = {'sent': 0, 'succeeded': 0, 'failed': {}, 'batches': 0}
+        batches = _batched(entries, self.config['BATCH_SIZE'])
+        with ThreadPoolExecutor(max_workers=self.config['WORKERS']) as executor:
+            # Bounded window of submitted batches, so a large sync is not buffered
+            pending = []
+            for batch in batches:
+                pending.append(executor.submit(self._send_batch, path, batch))
+                if len(pending) >= self.config['WORKERS'] * 2:
+                    self._collect(pending.pop(0), summary)
+            for future in pending:
+                self._collect(future, summary)
+        return summary
+
+    def _send_batch(self, path, batch):
+        body = dict(batch)
+        try:
+            results = self.request('POST', path, json=body).json()
+        except (FlipkartAPIError, ValueError) as exc:
+            return {sku: {'status': 'FAILURE', 'errors': [str(exc)]} for sku in body}
+        return {sku: results.get(sku, {'status': 'FAILURE', 'errors': ['Missing from response']}) for sku in body}
+
+    def _collect(self, future, summary):
+        results = future.result()
+        summary['batches'] += 1
+        summary['sent'] += len(results)
+        for sku, result in results.items():
+            if result.get('status') == 'SUCCESS':
+                summary['succeeded'] += 1
+            else:
+                summary['failed'][sku] = result.get('errors') or [result.get('status', 'FAILURE')]
+
+    def _send(self, method, path, allow_unauthorized=False, **kwargs):
+        """One rate-limited request with retries; returns the successful response"""
+        url = f'{self.base_url}{path}'
+        retries = self.config['MAX_RETRIES']
+        for attempt in range(retries + 1):
+            self._count('throttled_seconds', self.bucket.acquire())
+            self._count('requests')
+            try:
+                response = self.session.request(method, url, timeout=self.config['TIMEOUT'], **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == retries:
+                    raise FlipkartAPIError(f'{method} {path} failed: {exc}') from exc
+                self._backoff(attempt)
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                self._backoff(attempt, response.headers.get('Retry-After'))
+                continue
+            if response.status_code == 401 and allow_unauthorized:
+                return response
+            if response.status_code >= 400:
+                raise FlipkartAPIError(
+                    f'{method} {path} returned {response.status_code}: {response.text[:200]}',
+                    status=response.status_code,
+                )
+            return response
+
+    def _backoff(self, attempt, retry_after=None):
+        self._count('retries')
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            # Full jitter keeps retrying workers from moving in lockstep
+            delay = random.uniform(0, min(self.config['MAX_BACKOFF'], self.config['BACKOFF'] * 2 ** attempt))
+        time.sleep(delay)
+
+    def _count(self, name, value=1):
+        with self._counters_lock:
+            self.counters[name] += value
+
+
+def _batched(entries, size):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_config():
+    """``FLIPKART_API_CONFIG`` with defaults filled in"""
+    return {**DEFAULTS, **getattr(settings, 'FLIPKART_API_CONFIG', {})}
+
+
+def get_client():
+    """The process-wide FlipkartClient built from ``FLIPKART_API_CONFIG``"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FlipkartClient(get_config())
+    return _client
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the Flipkart Marketplace API, for tests and benchmarks.
+
+Serves the OAuth token and listing update endpoints used by
+``flipkart_seller_center.flipkart`` and can misbehave on purpose: add
+latency, fail a share of requests with 503, and answer 429 with
+``Retry-After`` above a request rate. Updates are kept in memory, and
+``stats`` counts requests, rejections and the client connections seen, so
+callers can check what arrived and how many connections were opened.
+
+    python -m flipkart_seller_center.flipkart_stub --port 8765 --rate-limit 50 --failure-rate 0.05
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .flipkart import INVENTORY_PATH, PRICE_PATH, TOKEN_PATH, TokenBucket
+
+MAX_BATCH = 10
+
+
+class StubServer:
+    """Threaded stub server; use as a context manager or call start() and stop()"""
+
+    def __init__(self, host='127.0.0.1', port=0, api_key='stub-key', api_secret='stub-secret',
+                 latency=0.0, failure_rate=0.0, rate_limit=None, token_ttl=3600, seed=None):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.token_ttl = token_ttl
+        self.bucket = TokenBucket(rate_limit, max(1, int(rate_limit))) if rate_limit else None
+        self.random = random.Random(seed)
+        self.tokens = {}
+        self.inventory = {}
+        self.prices = {}
+        self.stats = dict.fromkeys(('requests', 'token_requests', 'unauthorized', 'throttled', 'failed'), 0)
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def expire_tokens(self):
+        """Invalidate every issued token, as a server-side revocation would"""
+        with self.lock:
+            self.tokens.clear()
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                self.handle_request()
+
+            def do_POST(self):
+                self.handle_request()
+
+            def handle_request(self):
+                with server.lock:
+                    server.connections.add(self.client_address)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                server._count('requests')
+                if server.latency:
+                    time.sleep(server.latency)
+                path = self.path.split('?', 1)[0]
+                if path.endswith(TOKEN_PATH) and self.command == 'GET':
+                    return self.issue_token()
+                if self.command != 'POST' or not path.endswith((INVENTORY_PATH, PRICE_PATH)):
+                    return self.reply(404, {'error': 'Not found'})
+                if server.bucket is not None and server.bucket.try_acquire():
+                    server._count('throttled')
+                    return self.reply(429, {'error': 'Rate limit exceeded'}, {'Retry-After': '0.1'})
+                token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+                with server.lock:
+                    expires = server.tokens.get(token)
+                if expires is None or expires < time.monotonic():
+                    server._count('unauthorized')
+                    return self.reply(401, {'error': 'Invalid or expired token'})
+                if server.failure_rate and server.random.random() < server.failure_rate:
+                    server._count('failed')
+                    return self.reply(503, {'error': 'Service unavailable'})
+                try:
+                    updates = json.loads(body)
+                except ValueError:
+                    return self.reply(400, {'error': 'Invalid JSON'})
+                if not isinstance(updates, dict) or not 0 < len(updates) <= MAX_BATCH:
+                    return self.reply(400, {'error': f'Send between 1 and {MAX_BATCH} SKUs'})
+                store = server.inventory if path.endswith(INVENTORY_PATH) else server.prices
+                results = {}
+                for sku, update in updates.items():
+                    if not isinstance(update, dict) or not update.get('product_id'):
+                        results[sku] = {'status': 'FAILURE', 'errors': ['product_id is required']}
+                        continue
+                    with server.lock:
+                        store[sku] = update
+                    results[sku] = {'status': 'SUCCESS'}
+                self.reply(200, results)
+
+            def issue_token(self):
+                server._count('token_requests')
+                expected = base64.b64encode(f'{server.api_key}:{server.api_secret}'.encode()).decode()
+                if self.headers.get('Authorization') != f'Basic {expected}':
+                    return self.reply(401, {'error': 'Invalid client credentials'})
+                token = uuid.uuid4().hex
+                with server.lock:
+                    server.tokens[token] = time.monotonic() + server.token_ttl
+                self.reply(200, {'access_token': token, 'token_type': 'bearer', 'expires_in': server.token_ttl})
+
+            def reply(self, status, data, headers=None):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-key', default='stub-key')
+    parser.add_argument('--api-secret', default='stub-secret')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of updates answered with 503')
+    parser.add_argument('--rate-limit', type=float, help='Requests per second before answering 429')
+    parser.add_argument('--token-ttl', type=int, default=3600, help='Seconds an access token is valid')
+    args = parser.parse_args()
+    server = StubServer(args.host, args.port, args.api_key, args.api_secret, args.latency,
+                        args.failure_rate, args.rate_limit, args.token_ttl)
+    print(f'Flipkart stub listening on {server.url} (key {args.api_key}, secret {args.api_secret})')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Idempotency-Key support for mutating API requests.
+
+A client that may retry a POST, PUT, PATCH or DELETE sends a unique
+``Idempotency-Key`` header. The first request runs normally and its
+response is stored for ``IDEMPOTENCY_CONFIG['TTL']`` seconds. Retries with
+the same key get the stored response back, marked with an
+``Idempotent-Replayed: true`` header, without running the view again.
+
+- A retry that arrives while the first request is still running gets 409.
+- Reusing a key for a different method, path or body gets 422. Bodies too
+  big to buffer (over ``DATA_UPLOAD_MAX_MEMORY_SIZE``, such as bulk NDJSON
+  uploads) are hashed as the view streams them; a retry reads its body
+  through before the stored response is replayed.
+- Server errors (5xx) are not stored, so the request can be retried.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import RequestDataTooBig
+from django.http import HttpResponse, JsonResponse
+
+HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+READ_SIZE = 64 * 1024
+UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+def get_config():
+    config = {'CACHE_ALIAS': 'default', 'TTL': 24 * 60 * 60, 'LOCK_TIMEOUT': 60}
+    config.update(getattr(settings, 'IDEMPOTENCY_CONFIG', {}))
+    return config
+
+
+class IdempotencyMixin:
+    """Replays the stored response of a mutating request retried with the same ``Idempotency-Key``"""
+
+    def dispatch(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or request.method not in UNSAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return JsonResponse(
+                {'error': f'{HEADER} must be at most {MAX_KEY_LENGTH} characters'}, status=400
+            )
+
+        config = get_config()
+        cache = caches[config['CACHE_ALIAS']]
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        record_key = f'idempotency:{digest}'
+        lock_key = f'idempotency-lock:{digest}'
+        fingerprint = RequestFingerprint(request)
+
+        record = cache.get(record_key)
+        if record is not None:
+            return replay(record, fingerprint.hexdigest())
+        if not cache.add(lock_key, True, config['LOCK_TIMEOUT']):
+            return JsonResponse(
+                {'error': f'A request with this {HEADER} is still being processed'}, status=409
+            )
+        try:
+            # The first request may have finished between the two lookups
+            record = cache.get(record_key)
+            if record is not None:
+                return replay(record, fingerprint.hexdigest())
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code < 500 and not response.streaming:
+                if hasattr(response, 'render'):
+                    response.render()
+                cache.set(record_key, {
+                    'fingerprint': fingerprint.hexdigest(),
+                    'status': response.status_code,
+                    'content': response.content,
+                    'content_type': response.get('Content-Type'),
+                }, config['TTL'])
+            return response
+        finally:
+            cache.delete(lock_key)
+
+
+class RequestFingerprint:
+    """
+    Hash of what a key may not be reused for something else with: the
+    method, path and body. A body too big to buffer is hashed as it is read
+    from the request, and whatever is left unread when ``hexdigest`` is
+    called is read through first.
+    """
+
+    def __init__(self, request):
+        self._digest = hashlib.sha256(f'{request.method} {request.get_full_path()}\n'.encode('utf-8'))
+        self._stream = None
+        try:
+            self._digest.update(request.body)
+        except RequestDataTooBig:
+            # Bulk uploads are streamed by their parsers rather than buffered
+            self._stream = request._stream = HashingStream(request._stream, self._digest)
+
+    def hexdigest(self):
+        if self._stream is not None:
+            while self._stream.read(READ_SIZE):
+                pass
+        return self._digest.hexdigest()
+
+
+class HashingStream:
+    """Request body stream that adds what is read from it to ``digest``"""
+
+    def __init__(self, stream, digest):
+        self._stream = stream
+        self._digest = digest
+
+    def read(self, *args):
+        data = self._stream.read(*args)
+        self._digest.update(data)
+        return data
+
+    def readline(self, *args):
+        data = self._stream.readline(*args)
+        self._digest.update(data)
+        return data
+
+
+def replay(record, fingerprint):
+    if record['fingerprint'] != fingerprint:
+        return JsonResponse(
+            {'error': f'{HEADER} was already used for a different request'}, status=422
+        )
+    response = HttpResponse(record['content'], status=record['status'], content_type=record['content_type'])
+    response['Idempotent-Replayed'] = 'true'
+    return response
@@ -141,12 +141,79 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
+    'DEFAULT_FILTER_BACKENDS': [
+        'flipkart_seller_center.filters.FieldFilterBackend',
+    ],
+}
+
+# Orders API Configuration
+ORDERS_API_CONFIG = {
+    'PAGE_SIZE': 50,  # Default number of orders per page
+    'MAX_PAGE_SIZE': 500,  # Upper bound for the ?page_size= query parameter
+    'INGEST_CHUNK_SIZE': 500,  # Orders written per bulk_create transaction
+    'EXPORT_CHUNK_SIZE': 2000,  # Rows fetched per round trip when streaming exports
+    'SEARCH_BACKEND': None,  # Dotted path of the order search backend; None picks one for the database
+    'SEARCH_MAX_CANDIDATES': 5000,  # Most matches ?q= reads to fill a page when combined with other filters
+    'STATS_DEFAULT_DAYS': 30,  # Days /stats covers when ?day_after= is not given
+}
+
+# Product Cache Configuration
+# Product lookups by SKU/FSN go through a per-process LRU (entries live for
+# LOCAL_TTL seconds) in front of the Django cache named by CACHE_ALIAS.
+# Saves and deletes invalidate both tiers in the writing process; other
+# processes only see the change once their LRU entry expires.
+PRODUCT_CACHE_CONFIG = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,  # Seconds a product stays in the shared cache
+    'LOCAL_MAX_ENTRIES': 10000,
+    'LOCAL_TTL': 5,
+}
+
+# Effective Price Configuration
+# Each process indexes active pricing rules and special prices in memory.
+# Writes bump a generation counter in the Django cache named by CACHE_ALIAS;
+# point it at a shared cache so every process reloads after a write.
+EFFECTIVE_PRICE_CONFIG = {
+    'CACHE_ALIAS': 'default',
+}
+
+# Price Scheduler Configuration
+# run_price_scheduler learns about saved rules and promotions from a change
+# feed in the Django cache named by CACHE_ALIAS, which must be shared with
+# the web processes (Redis, Memcached, database) for it to see their writes.
+PRICE_SCHEDULER_CONFIG = {
+    'CACHE_ALIAS': 'default',
+    'POLL_INTERVAL': 1,  # Seconds between checks of the change feed
+    'CHANGE_TTL': 3600,  # Seconds a published change is kept
+    'RELOAD_INTERVAL': 3600,  # Seconds between full reloads of every window
+}
+
+# Idempotency-Key Configuration
+# Stored responses live in a Django cache. The default per-process
+# LocMemCache only deduplicates retries that reach the same worker; point
+# CACHE_ALIAS at a shared cache (Redis, Memcached, database) in production.
+IDEMPOTENCY_CONFIG = {
+    'CACHE_ALIAS': 'default',
+    'TTL': 24 * 60 * 60,  # Seconds a stored response is replayed for
+    'LOCK_TIMEOUT': 60,  # Seconds a key stays locked while its first request runs
 }
 
 # Flipkart Seller Center API Configuration
+# Used by flipkart_seller_center.flipkart.FlipkartClient. RATE_LIMIT is shared
+# by all WORKERS of one process; lower it when several processes sync at once.
 FLIPKART_API_CONFIG = {
     'BASE_URL': 'https://api.flipkart.net/sellers',
     'API_KEY': '',  # Set this in your environment
     'API_SECRET': '',  # Set this in your environment
     'TIMEOUT': 30,
+    'CACHE_ALIAS': 'default',  # Django cache holding the OAuth access token
+    'RATE_LIMIT': 10,  # Requests per second (token bucket refill rate)
+    'BURST': 10,  # Requests that may be sent at once after an idle period
+    'BATCH_SIZE': 10,  # SKUs per listing update request; the API accepts at most 10
+    'WORKERS': 4,  # Concurrent requests per sync
+    'POOL_SIZE': 10,  # Pooled HTTP connections
+    'MAX_RETRIES': 5,  # Retries of a 429, 5xx or connection error
+    'BACKOFF': 0.5,  # Seconds; doubles with every retry, with full jitter
+    'MAX_BACKOFF': 30,
+    'LOCATION_ID': '',  # Flipkart location for inventory rows without a warehouse_location
 }
@@ -0,0 +1,125 @@
+"""
+Compare-and-set status transitions shared by the orders, shipments and
+returns apps.
+
+A transition is applied as a single conditional UPDATE:
+
+    UPDATE ... SET status = <target>, updated_at = <now>, <changes>
+    WHERE pk = <pk> AND status IN (<legal source statuses>)
+
+No row lock is held between reading and writing, concurrent workers cannot
+overwrite each other, and only the changed columns are written. When the
+row has already moved on, the caller gets a ``TransitionConflict``.
+
+Every applied transition sends ``status_transitioned`` inside the same
+transaction, with the primary keys that moved and the exact status they
+left, so derived data such as counters can follow along.
+"""
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Sent with sender=<model>, pks=[...], previous=<status>, target=<status>
+status_transitioned = Signal()
+
+
+class TransitionConflict(Exception):
+    """Raised when a row is not in a status the requested transition starts from"""
+
+    def __init__(self, instance, current, target):
+        self.instance = instance
+        self.current = current
+        self.target = target
+        model_name = instance._meta.verbose_name.capitalize()
+        if current is None:
+            message = f"{model_name} {instance.pk} no longer exists"
+        else:
+            message = f"{model_name} {instance.pk} cannot move from {current} to {target}"
+        super().__init__(message)
+
+
+class StateMachine:
+    """
+    Legal status transitions of a model.
+
+    ``transitions`` maps each target status to the statuses it may be
+    reached from. Statuses that are not a key can only be set on creation.
+    """
+
+    def __init__(self, model, transitions, field='status', timestamp_field='updated_at'):
+        choices = {value for value, _ in model._meta.get_field(field).choices}
+        for target, sources in transitions.items():
+            unknown = ({target} | set(sources)) - choices
+            if unknown:
+                raise ValueError(f"Unknown {model.__name__}.{field} values: {sorted(unknown)}")
+        self.model = model
+        self.transitions = {target: tuple(sources) for target, sources in transitions.items()}
+        self.field = field
+        self.timestamp_field = timestamp_field
+
+    def sources(self, target):
+        """Statuses from which ``target`` may be reached"""
+        try:
+            return self.transitions[target]
+        except KeyError:
+            raise ValueError(f"No transition leads to {self.model.__name__}.{self.field} {target}")
+
+    def can_transition(self, current, target):
+        return current in self.transitions.get(target, ())
+
+    def transition(self, instance, target, **changes):
+        """
+        Move ``instance`` to ``target``, also writing ``changes``.
+
+        On success the instance is updated in place. Raises
+        ``TransitionConflict`` when the stored row is not in a legal source
+        status (or is gone), leaving the instance untouched.
+        """
+        values = self._values(target, changes)
+        # Guard on one source status at a time so the status the row left is
+        # known exactly; the status last seen on the instance is tried first,
+        # which makes the common case a single UPDATE
+        current = getattr(instance, self.field)
+        sources = sorted(self.sources(target), key=lambda source: source != current)
+        manager = self.model._default_manager
+        with transaction.atomic():
+            for source in sources:
+                if manager.filter(pk=instance.pk, **{self.field: source}).update(**values):
+                    status_transitioned.send(
+                        sender=self.model, pks=[instance.pk], previous=source, target=target
+                    )
+                    break
+            else:
+                current = manager.filter(pk=instance.pk).values_list(self.field, flat=True).first()
+                raise TransitionConflict(instance, current, target)
+        for name, value in values.items():
+            setattr(instance, name, value)
+        return instance
+
+    def transition_many(self, pks, target, **changes):
+        """
+        Move every row in ``pks`` that is in a legal source status, returning
+        the primary keys that moved. Rows in any other status are left alone.
+        """
+        values = self._values(target, changes)
+        manager = self.model._default_manager
+        moved = []
+        with transaction.atomic():
+            for source in self.sources(target):
+                matched = list(
+                    manager.select_for_update()
+                    .filter(pk__in=pks, **{self.field: source})
+                    .values_list('pk', flat=True)
+                )
+                if not matched:
+                    continue
+                manager.filter(pk__in=matched, **{self.field: source}).update(**values)
+                status_transitioned.send(sender=self.model, pks=matched, previous=source, target=target)
+                moved.extend(matched)
+        return moved
+
+    def _values(self, target, changes):
+        values = {self.field: target, **changes}
+        if self.timestamp_field:
+            values.setdefault(self.timestamp_field, timezone.now())
+        return values
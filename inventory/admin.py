@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Product, Inventory, Listing
+from .models import Product, ProductFacetCount, ProductFacetTotal, Inventory, Listing, StockLedgerEntry
 
 
 @admin.register(Product)
@@ -24,3 +24,25 @@ class ListingAdmin(admin.ModelAdmin):
     list_filter = ['listing_status', 'marketplace', 'fulfillment_type', 'is_cod_available']
     search_fields = ['listing_id', 'product__sku', 'product__product_name']
     readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(ProductFacetCount)
+class ProductFacetCountAdmin(admin.ModelAdmin):
+    list_display = ['brand', 'category', 'subcategory', 'is_active', 'mrp_band', 'product_count']
+    list_filter = ['is_active', 'category']
+    search_fields = ['brand', 'category', 'subcategory']
+
+
+@admin.register(ProductFacetTotal)
+class ProductFacetTotalAdmin(admin.ModelAdmin):
+    list_display = ['facet', 'value', 'is_active', 'product_count']
+    list_filter = ['facet', 'is_active']
+    search_fields = ['value']
+
+
+@admin.register(StockLedgerEntry)
+class StockLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ['product', 'available_delta', 'reserved_delta', 'damaged_delta', 'reason', 'reference_id', 'created_at', 'applied_at']
+    list_filter = ['reason']
+    search_fields = ['product__sku', 'reference_id']
+    readonly_fields = ['created_at', 'applied_at']
@@ -0,0 +1,70 @@
+"""
+Listing availability driven by stock levels.
+
+A product is out of stock while its available quantity, including pending
+stock ledger entries, is at or below its ``Inventory.out_of_stock_threshold``
+(zero by default). Whenever the quantity crosses the threshold, the
+product's ACTIVE listings become OUT_OF_STOCK and vice versa; INACTIVE and
+DELISTED listings are never touched.
+
+All flips are set-based UPDATEs on the listings table: stock movements
+report the SKUs that crossed with ``flip_listings``, a bulk snapshot flips
+each chunk of SKUs at once, and ``sync_listing_status`` reconciles listings
+against the current stock with one join per direction.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from . import ledger
+from .models import Listing
+
+CHUNK_SIZE = 1000
+
+
+def crossed(before, after, threshold):
+    """Whether moving available stock from ``before`` to ``after`` crosses ``threshold``"""
+    return (before <= threshold) != (after <= threshold)
+
+
+def flip_listings(out_of_stock=(), back_in_stock=()):
+    """
+    Mark the ACTIVE listings of ``out_of_stock`` SKUs OUT_OF_STOCK and the
+    OUT_OF_STOCK listings of ``back_in_stock`` SKUs ACTIVE; returns the
+    number of listings changed.
+    """
+    changed = 0
+    for skus, current, target in (
+        (list(out_of_stock), 'ACTIVE', 'OUT_OF_STOCK'),
+        (list(back_in_stock), 'OUT_OF_STOCK', 'ACTIVE'),
+    ):
+        for start in range(0, len(skus), CHUNK_SIZE):
+            changed += Listing.objects.filter(
+                product_id__in=skus[start:start + CHUNK_SIZE], listing_status=current
+            ).update(listing_status=target, updated_at=timezone.now())
+    return changed
+
+
+def sync_listing_status(skus=None):
+    """
+    Bring listings of ``skus`` (every product when None) in line with their
+    stock; returns (listings marked out of stock, listings restocked).
+    """
+    # available + pending <= threshold, with the pending sum moved to the right
+    threshold = F('product__inventory__out_of_stock_threshold') - ledger.pending_sum('available_quantity')
+    if skus is None:
+        batches = [Listing.objects.all()]
+    else:
+        skus = list(skus)
+        batches = [
+            Listing.objects.filter(product_id__in=skus[start:start + CHUNK_SIZE])
+            for start in range(0, len(skus), CHUNK_SIZE)
+        ]
+    out_of_stock = back_in_stock = 0
+    for listings in batches:
+        out_of_stock += listings.filter(
+            listing_status='ACTIVE', product__inventory__available_quantity__lte=threshold
+        ).update(listing_status='OUT_OF_STOCK', updated_at=timezone.now())
+        back_in_stock += listings.filter(
+            listing_status='OUT_OF_STOCK', product__inventory__available_quantity__gt=threshold
+        ).update(listing_status='ACTIVE', updated_at=timezone.now())
+    return out_of_stock, back_in_stock
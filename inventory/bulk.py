@@ -0,0 +1,126 @@
+"""
+Bulk stock updates for whole-catalog inventory syncs.
+
+A snapshot maps SKUs to absolute stock levels. SKUs are resolved to
+inventory rows ``CHUNK_SIZE`` at a time; each chunk is read under a row lock,
+compared in Python, and only the rows that actually changed are written,
+with one prepared UPDATE executed for all of them. (``bulk_update`` builds
+a CASE expression per column whose cost grows with the square of the chunk
+size, which made full snapshots take minutes.)
+
+Pending stock ledger entries of each chunk are folded in before it is read,
+so the snapshot replaces them, and the written differences are logged as
+SNAPSHOT entries. SKUs whose available stock crosses their out-of-stock
+threshold have their listings flipped with one UPDATE per direction per
+chunk.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import availability, cache, ledger
+from .models import Inventory
+
+CHUNK_SIZE = 1000
+
+STOCK_FIELDS = ('available_quantity', 'reserved_quantity', 'damaged_quantity')
+
+
+def bulk_update_stock(levels, include_changes=False, reference_id=''):
+    """
+    Apply ``levels`` ({sku: quantity or {field: quantity}}); a bare number
+    sets ``available_quantity``. Returns a summary of what changed.
+    """
+    result = {
+        'received': len(levels),
+        'updated': 0,
+        'unchanged': 0,
+        'not_found': [],
+        'invalid': {},
+        'delta': dict.fromkeys(STOCK_FIELDS, 0),
+        'out_of_stock': 0,
+        'back_in_stock': 0,
+    }
+    if include_changes:
+        result['changes'] = {}
+
+    targets = {}
+    for sku, value in levels.items():
+        try:
+            targets[sku] = normalize_level(value)
+        except ValueError as exc:
+            result['invalid'][sku] = str(exc)
+
+    skus = list(targets)
+    for start in range(0, len(skus), CHUNK_SIZE):
+        _apply_chunk(skus[start:start + CHUNK_SIZE], targets, result, reference_id)
+    return result
+
+
+def normalize_level(value):
+    """Validate one snapshot entry, returning {field: quantity}"""
+    if not isinstance(value, dict):
+        value = {'available_quantity': value}
+    if not value:
+        raise ValueError('No quantities given')
+    level = {}
+    for field, quantity in value.items():
+        if field not in STOCK_FIELDS:
+            raise ValueError(f'Unknown field {field}')
+        if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 0:
+            raise ValueError(f'{field} must be a non-negative integer')
+        level[field] = quantity
+    return level
+
+
+def _apply_chunk(skus, targets, result, reference_id):
+    now = Inventory._meta.get_field('last_updated').get_db_prep_value(timezone.now(), connection)
+    changed = []
+    changed_skus = []
+    logged = []
+    crossings = {'out_of_stock': [], 'back_in_stock': []}
+    found = set()
+    with transaction.atomic():
+        ledger.compact(skus)
+        rows = (
+            Inventory.objects.select_for_update()
+            .filter(product_id__in=skus)
+            .values_list('id', 'product_id', 'out_of_stock_threshold', *STOCK_FIELDS)
+        )
+        for pk, sku, threshold, *quantities in rows:
+            found.add(sku)
+            current = dict(zip(STOCK_FIELDS, quantities))
+            diff = {
+                field: [current[field], quantity]
+                for field, quantity in targets[sku].items() if current[field] != quantity
+            }
+            if not diff:
+                result['unchanged'] += 1
+                continue
+            for field, (old, new) in diff.items():
+                current[field] = new
+                result['delta'][field] += new - old
+            if 'changes' in result:
+                result['changes'][sku] = diff
+            changed.append((*(current[field] for field in STOCK_FIELDS), now, pk))
+            changed_skus.append(sku)
+            logged.append((sku, {field: new - old for field, (old, new) in diff.items()}))
+            if 'available_quantity' in diff and availability.crossed(*diff['available_quantity'], threshold):
+                crossings['out_of_stock' if current['available_quantity'] <= threshold else 'back_in_stock'].append(sku)
+        if changed:
+            with connection.cursor() as cursor:
+                cursor.executemany(_update_sql(), changed)
+            ledger.log_many(logged, 'SNAPSHOT', reference_id)
+            availability.flip_listings(**crossings)
+    if changed_skus:
+        cache.invalidate_on_commit(*changed_skus)
+    result['updated'] += len(changed)
+    for direction, crossed_skus in crossings.items():
+        result[direction] += len(crossed_skus)
+    result['not_found'].extend(sku for sku in skus if sku not in found)
+
+
+def _update_sql():
+    quote = connection.ops.quote_name
+    columns = [*STOCK_FIELDS, 'last_updated']
+    assignments = ', '.join(f'{quote(column)} = %s' for column in columns)
+    return f'UPDATE {quote(Inventory._meta.db_table)} SET {assignments} WHERE {quote("id")} = %s'
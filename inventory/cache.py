@@ -0,0 +1,202 @@
+"""
+Read-through cache of catalog lookups by SKU and FSN.
+
+Products are cached together with their inventory (including pending stock
+ledger entries) and price rows in two tiers:
+
+- a small in-process LRU, answered without pickling or network round trips;
+- Django's cache framework (``PRODUCT_CACHE_CONFIG['CACHE_ALIAS']``), shared
+  by every worker when it points at Redis or Memcached.
+
+FSNs are stored as pointers to the SKU entry, so each product is cached once.
+Saving or deleting a Product, Inventory or Price invalidates its SKU (see
+``inventory.signals``); code that writes with ``QuerySet.update`` calls
+``invalidate_on_commit`` itself. Writes invalidate again once their
+transaction commits, as a concurrent reader may have cached the old row in
+the meantime. Other workers' LRUs are not notified, which is why local
+entries only live for ``LOCAL_TTL`` seconds.
+
+Cached instances are shared between callers and must be treated as
+read-only; load a fresh row before modifying and saving it.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import ledger
+from .models import Product
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': 300,
+    'LOCAL_MAX_ENTRIES': 10000,
+    'LOCAL_TTL': 5,
+}
+
+
+class ProductCache:
+    """Two-tier product cache with hit and miss counters"""
+
+    def __init__(self, cache_alias, timeout, local_max_entries, local_ttl):
+        self.cache_alias = cache_alias
+        self.timeout = timeout
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('local_hits', 'shared_hits', 'misses', 'invalidations'), 0)
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def get_by_sku(self, sku):
+        """Product ``sku`` with inventory and price loaded; raises Product.DoesNotExist"""
+        key = sku_key(sku)
+        product = self._get_local(key)
+        if product is not None:
+            return product
+        product = self.shared.get(key)
+        if product is not None:
+            self._count('shared_hits')
+            self._set_local(key, product)
+            return product
+        self._count('misses')
+        return self._load(sku=sku)
+
+    def get_by_fsn(self, fsn):
+        """Product with Flipkart Serial Number ``fsn``; raises Product.DoesNotExist"""
+        key = fsn_key(fsn)
+        product = self._get_local(key)
+        if product is not None and product.fsn == fsn:
+            return product
+        sku = self.shared.get(key)
+        if sku is not None:
+            try:
+                product = self.get_by_sku(sku)
+            except Product.DoesNotExist:
+                product = None
+            # The FSN may have moved to another product since the pointer was stored
+            if product is not None and product.fsn == fsn:
+                self._set_local(key, product)
+                return product
+        self._count('misses')
+        return self._load(fsn=fsn)
+
+    def invalidate(self, *skus):
+        """Drop cached entries for ``skus``; FSN pointers are checked on read"""
+        keys = [sku_key(sku) for sku in skus]
+        with self._lock:
+            for key in keys:
+                entry = self._local.pop(key, None)
+                if entry is not None:
+                    self._local.pop(fsn_key(entry[1].fsn), None)
+            self._counters['invalidations'] += len(keys)
+        self.shared.delete_many(keys)
+
+    def clear(self):
+        """Empty this process's LRU and reset the counters"""
+        with self._lock:
+            self._local.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters, local_entries=len(self._local))
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else None
+        return stats
+
+    def _load(self, **lookup):
+        # A missing inventory or price row is cached as missing, too
+        product = Product.objects.select_related('inventory', 'price').get(**lookup)
+        if hasattr(product, 'inventory'):
+            ledger.attach_pending([product.inventory])
+        self.shared.set_many({sku_key(product.sku): product, fsn_key(product.fsn): product.sku}, self.timeout)
+        self._set_local(sku_key(product.sku), product)
+        self._set_local(fsn_key(product.fsn), product)
+        return product
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires, product = entry
+            if expires < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            self._counters['local_hits'] += 1
+            return product
+
+    def _set_local(self, key, product):
+        if not self.local_max_entries:
+            return
+        with self._lock:
+            self._local[key] = (time.monotonic() + self.local_ttl, product)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+def sku_key(sku):
+    return f'product:sku:{sku}'
+
+
+def fsn_key(fsn):
+    return f'product:fsn:{fsn}'
+
+
+_product_cache = None
+_product_cache_lock = threading.Lock()
+
+
+def get_config():
+    """``PRODUCT_CACHE_CONFIG`` with defaults filled in"""
+    return {**DEFAULTS, **getattr(settings, 'PRODUCT_CACHE_CONFIG', {})}
+
+
+def get_product_cache():
+    """The process-wide ProductCache built from ``PRODUCT_CACHE_CONFIG``"""
+    global _product_cache
+    if _product_cache is None:
+        with _product_cache_lock:
+            if _product_cache is None:
+                config = get_config()
+                _product_cache = ProductCache(
+                    config['CACHE_ALIAS'], config['TIMEOUT'],
+                    config['LOCAL_MAX_ENTRIES'], config['LOCAL_TTL'],
+                )
+    return _product_cache
+
+
+def get_product(sku=None, fsn=None):
+    """Cached product by ``sku`` or ``fsn``; raises Product.DoesNotExist"""
+    if sku is not None:
+        return get_product_cache().get_by_sku(sku)
+    return get_product_cache().get_by_fsn(fsn)
+
+
+def invalidate(*skus):
+    get_product_cache().invalidate(*skus)
+
+
+def invalidate_on_commit(*skus):
+    """
+    Drop ``skus`` now, for reads later in the writing transaction, and again
+    once it commits, so an old row a concurrent reader cached in between is
+    not served until it expires
+    """
+    invalidate(*skus)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: invalidate(*skus))
@@ -0,0 +1,229 @@
+"""
+Streaming catalog import.
+
+A catalog file holds one product per CSV row or NDJSON line, with its
+inventory and price columns alongside (see ``CatalogRecordSerializer``).
+Records are read lazily and validated and written ``chunk_size`` at a time,
+so memory use does not grow with the file. Each chunk is upserted in one
+transaction:
+
+- products, inventory rows and prices with
+  ``bulk_create(update_conflicts=True)``, one INSERT per table;
+- stock levels of existing inventory rows through
+  ``inventory.bulk.bulk_update_stock``, so pending ledger entries are folded
+  in and the changes are logged as SNAPSHOT entries;
+- listing availability, the product cache and the price history, which
+  the signal handlers would otherwise maintain, and the facet counts unless
+  ``count_facets`` is off. Counting facets takes an UPDATE per changed facet key, which
+  dominates large imports, so the command rebuilds them once at the end
+  instead.
+
+The readers report the byte offset after every record; once a chunk has
+committed, the ``import_catalog`` command stores the offset as a checkpoint
+to resume from. Re-running a chunk that committed before a crash writes
+the same values again.
+"""
+import csv
+import json
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from pricing import history
+from pricing.models import Price
+
+from . import availability, cache, facets
+from .bulk import STOCK_FIELDS, bulk_update_stock
+from .models import Inventory, Product
+from .serializers import CatalogRecordSerializer
+
+PRODUCT_FIELDS = [
+    'sku', 'fsn', 'product_name', 'description', 'brand', 'category', 'subcategory',
+    'mrp', 'hsn_code', 'tax_percentage', 'is_active',
+]
+INVENTORY_FIELDS = ['warehouse_location', 'procurement_sla', 'out_of_stock_threshold']
+PRICE_FIELDS = [
+    'listing_price', 'selling_price', 'discount_percentage', 'cost_price',
+    'commission_percentage', 'shipping_fee',
+]
+
+
+def read_ndjson(file, offset=0, line_number=0):
+    """
+    Yield ``(line_number, record, error, offset)`` for each line of a binary
+    NDJSON ``file``, starting at byte ``offset``.
+    """
+    file.seek(offset)
+    for raw in iter(file.readline, b''):
+        offset += len(raw)
+        line_number += 1
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError) as exc:
+            yield line_number, None, f'Invalid JSON: {exc}', offset
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object', offset
+            continue
+        yield line_number, record, None, offset
+
+
+def read_csv(file, offset=0, line_number=0):
+    """
+    Yield ``(line_number, record, error, offset)`` for each row of a binary
+    CSV ``file`` with a header row, starting at byte ``offset`` (0 for the
+    first row after the header). Empty cells are left out of the record.
+    """
+    file.seek(0)
+    header = file.readline()
+    try:
+        fieldnames = next(csv.reader([header.decode('utf-8-sig')]), [])
+    except UnicodeDecodeError:
+        fieldnames = []
+    if not fieldnames:
+        yield 1, None, 'Missing CSV header', len(header)
+        return
+    if not offset:
+        offset, line_number = len(header), 1
+    file.seek(offset)
+
+    # csv.reader pulls one physical line at a time, so after each row the
+    # position is the end of that row, even for quoted multi-line values
+    position = {'offset': offset, 'line': line_number, 'error': None}
+
+    def lines():
+        for raw in iter(file.readline, b''):
+            position['offset'] += len(raw)
+            position['line'] += 1
+            try:
+                yield raw.decode('utf-8')
+            except UnicodeDecodeError as exc:
+                position['error'] = f'Invalid UTF-8: {exc}'
+                yield '\n'
+
+    for row in csv.reader(lines()):
+        error = position['error']
+        position['error'] = None
+        if error:
+            yield position['line'], None, error, position['offset']
+        elif len(row) != len(fieldnames):
+            if any(row):
+                yield position['line'], None, f'Expected {len(fieldnames)} columns, got {len(row)}', position['offset']
+        else:
+            record = {name: value for name, value in zip(fieldnames, row) if value != ''}
+            yield position['line'], record, None, position['offset']
+
+
+def validate_records(records):
+    """
+    Validate ``(line_number, record, error, offset)`` tuples, yielding
+    ``(line_number, sku, validated_data or None, errors, offset)``.
+    """
+    # One serializer validates every record, as for order ingestion
+    validator = CatalogRecordSerializer()
+    for line_number, record, error, offset in records:
+        if error:
+            yield line_number, None, None, error, offset
+            continue
+        try:
+            yield line_number, record.get('sku'), validator.run_validation(record), None, offset
+        except ValidationError as exc:
+            yield line_number, record.get('sku'), None, exc.detail, offset
+
+
+def import_chunk(chunk, reference_id='', count_facets=True):
+    """
+    Upsert one chunk of ``(line_number, validated_data)`` pairs. Returns
+    ``(counts, failures)``: created and updated product counts, and
+    ``(line_number, sku, errors)`` for records that could not be written.
+    """
+    counts = {'created': 0, 'updated': 0}
+    failures = []
+    pending = []
+    skus, fsns = set(), set()
+    for line_number, data in chunk:
+        if data['sku'] in skus:
+            failures.append((line_number, data['sku'], 'Duplicate sku in chunk'))
+        elif data['fsn'] in fsns:
+            failures.append((line_number, data['sku'], 'Duplicate fsn in chunk'))
+        else:
+            skus.add(data['sku'])
+            fsns.add(data['fsn'])
+            pending.append((line_number, data))
+    if not pending:
+        return counts, failures
+
+    try:
+        _write(pending, counts, reference_id, count_facets)
+    except IntegrityError:
+        # Usually an FSN that belongs to another stored product: retry
+        # record by record so only the offending ones fail
+        for line_number, data in pending:
+            try:
+                _write([(line_number, data)], counts, reference_id, count_facets)
+            except IntegrityError as exc:
+                failures.append((line_number, data['sku'], str(exc)))
+    return counts, failures
+
+
+def _write(pending, counts, reference_id, count_facets):
+    records = [data for _, data in pending]
+    skus = [data['sku'] for data in records]
+    now = timezone.now()
+    with transaction.atomic():
+        previous = {
+            product.sku: facets.product_key(product)
+            for product in Product.objects.filter(sku__in=skus).only(*facets.PRODUCT_FIELDS)
+        }
+        stocked = set(Inventory.objects.filter(product_id__in=skus).values_list('product_id', flat=True))
+
+        products = [Product(**{field: data.get(field) for field in PRODUCT_FIELDS}) for data in records]
+        for product in products:
+            product.created_at = product.updated_at = now
+        Product.objects.bulk_create(
+            products, update_conflicts=True, unique_fields=['sku'],
+            update_fields=[field for field in PRODUCT_FIELDS if field != 'sku'] + ['updated_at'],
+        )
+        # Stock columns are only written for new rows here; existing rows go
+        # through bulk_update_stock below so the ledger records the change
+        Inventory.objects.bulk_create(
+            [
+                Inventory(
+                    product_id=data['sku'], last_updated=now,
+                    **{field: data[field] for field in (*INVENTORY_FIELDS, *STOCK_FIELDS)}
+                )
+                for data in records
+            ],
+            update_conflicts=True, unique_fields=['product'], update_fields=[*INVENTORY_FIELDS, 'last_updated'],
+        )
+        prices = [
+            Price(product_id=data['sku'], last_updated=now, **{field: data[field] for field in PRICE_FIELDS})
+            for data in records
+        ]
+        Price.objects.bulk_create(
+            prices, update_conflicts=True, unique_fields=['product'], update_fields=[*PRICE_FIELDS, 'last_updated'],
+        )
+        bulk_update_stock(
+            {data['sku']: {field: data[field] for field in STOCK_FIELDS} for data in records if data['sku'] in stocked},
+            reference_id=reference_id,
+        )
+
+        # bulk_create sends no signals, so maintain what the handlers would
+        if count_facets:
+            deltas = {}
+            for product in products:
+                if product.sku in previous:
+                    deltas[previous[product.sku]] = deltas.get(previous[product.sku], 0) - 1
+                key = facets.product_key(product)
+                deltas[key] = deltas.get(key, 0) + 1
+            facets.apply_deltas(deltas)
+        # Recorded only where the listing or selling price changed
+        history.record([history.entry(price, now) for price in prices])
+        availability.sync_listing_status(skus)
+    cache.invalidate_on_commit(*skus)
+    counts['updated'] += len(previous)
+    counts['created'] += len(records) - len(previous)
@@ -0,0 +1,246 @@
+"""
+Catalog facet counts for brand, category, subcategory, is_active and MRP band.
+
+Two tables are kept up to date incrementally by the signal handlers in
+``inventory.signals``; ``rebuild`` recomputes both from the products table
+(see the ``rebuild_product_facets`` management command):
+
+- ``ProductFacetCount`` holds the number of products for every combination
+  of facet values that occurs in the catalog: one row per combination
+  rather than per product, with covering indexes for filtering by category
+  or brand.
+- ``ProductFacetTotal`` holds the count per value of each facet, split by
+  is_active, so facets that no other filter applies to (the unfiltered
+  catalog, or just active products) read a few hundred rows.
+
+``facet_counts`` counts each facet with the filters on the *other* facets
+applied, so selecting a brand still shows how many products the other
+brands have. Answers are cached in the product cache's Django cache under a
+version token that is replaced whenever a count changes. MRP bounds that
+are not band edges cannot be answered from the tables and group the
+products table instead.
+"""
+import hashlib
+import uuid
+from bisect import bisect_right
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, When
+
+from .cache import get_config
+from .models import Product, ProductFacetCount, ProductFacetTotal
+
+# Lower edges of the MRP bands; the last band is open-ended
+MRP_BANDS = tuple(Decimal(edge) for edge in ('0.00', '500.00', '1000.00', '2500.00', '5000.00',
+                                             '10000.00', '25000.00', '50000.00'))
+
+FACETS = ('brand', 'category', 'subcategory', 'is_active', 'mrp_band')
+
+PRODUCT_FIELDS = ('brand', 'category', 'subcategory', 'is_active', 'mrp')
+
+# Facets with rows in ProductFacetTotal; is_active totals are summed from the category rows
+TOTAL_FACETS = ('brand', 'category', 'subcategory', 'mrp_band')
+
+VERSION_KEY = 'product_facets:version'
+
+
+def mrp_band(mrp):
+    """Index of the MRP band containing ``mrp``"""
+    return max(bisect_right(MRP_BANDS, mrp) - 1, 0)
+
+
+def product_key(product):
+    """(brand, category, subcategory, is_active, mrp_band) that ``product`` is counted under"""
+    mrp = Product._meta.get_field('mrp').to_python(product.mrp)
+    return product.brand, product.category, product.subcategory or '', bool(product.is_active), mrp_band(mrp)
+
+
+def record_created(products):
+    """Count newly inserted products"""
+    deltas = {}
+    for product in products:
+        _add(deltas, product_key(product), 1)
+    apply_deltas(deltas)
+
+
+def record_deleted(products):
+    """Stop counting deleted products"""
+    deltas = {}
+    for product in products:
+        _add(deltas, product_key(product), -1)
+    apply_deltas(deltas)
+
+
+def record_changed(previous, current):
+    """Move a product from one facet key to another"""
+    if previous == current:
+        return
+    apply_deltas({previous: -1, current: 1})
+
+
+def apply_deltas(deltas):
+    """Add ``{key: count}`` to the facet count and facet total rows"""
+    deltas = {key: count for key, count in deltas.items() if count}
+    if not deltas:
+        return
+    for key, count in sorted(deltas.items()):
+        _increment(ProductFacetCount, dict(zip(FACETS, key)), count)
+    for (facet, value, is_active), count in sorted(_totals(deltas).items()):
+        if count:
+            _increment(ProductFacetTotal, {'facet': facet, 'value': value, 'is_active': is_active}, count)
+    transaction.on_commit(expire_cached_counts)
+
+
+def rebuild():
+    """Recompute every facet count row from the products table; returns the number of rows"""
+    counts = {}
+    rows = (
+        Product.objects.annotate(mrp_band=_mrp_band_case())
+        .values_list(*FACETS)
+        .annotate(product_count=Count('pk'))
+        .order_by()
+    )
+    for brand, category, subcategory, is_active, band, product_count in rows:
+        _add(counts, (brand, category, subcategory or '', is_active, band), product_count)
+    with transaction.atomic():
+        ProductFacetCount.objects.all().delete()
+        ProductFacetTotal.objects.all().delete()
+        created = ProductFacetCount.objects.bulk_create(
+            ProductFacetCount(**dict(zip(FACETS, key)), product_count=product_count)
+            for key, product_count in counts.items()
+        )
+        ProductFacetTotal.objects.bulk_create(
+            ProductFacetTotal(facet=facet, value=value, is_active=is_active, product_count=product_count)
+            for (facet, value, is_active), product_count in _totals(counts).items()
+        )
+        transaction.on_commit(expire_cached_counts)
+    return len(created)
+
+
+def facet_counts(filters):
+    """
+    Facet counts for products matching ``filters``, the Product field
+    lookups built by ``FieldFilterBackend`` (``brand__in``, ``mrp__gte``...).
+    """
+    shared = _shared_cache()
+    version = shared.get(VERSION_KEY)
+    if version is None:
+        version = expire_cached_counts()
+    signature = repr(sorted(filters.items())).encode('utf-8')
+    key = f'product_facets:{version}:{hashlib.blake2b(signature, digest_size=16).hexdigest()}'
+    result = shared.get(key)
+    if result is None:
+        result = _count(filters)
+        shared.set(key, result, get_config()['TIMEOUT'])
+    return result
+
+
+def expire_cached_counts():
+    """Start a new cache version so cached facet counts are recomputed; returns it"""
+    version = uuid.uuid4().hex
+    _shared_cache().set(VERSION_KEY, version, None)
+    return version
+
+
+def _count(filters):
+    bounds = {name: value for name, value in filters.items() if name.startswith('mrp__')}
+    use_totals = all(value in MRP_BANDS for value in bounds.values())
+    if use_totals:
+        rows = ProductFacetCount.objects.all()
+        count = Sum('product_count')
+        filters = {
+            **{name: value for name, value in filters.items() if name not in bounds},
+            **{name.replace('mrp__', 'mrp_band__'): MRP_BANDS.index(value) for name, value in bounds.items()},
+        }
+    else:
+        rows = Product.objects.annotate(mrp_band=_mrp_band_case())
+        count = Count('pk')
+
+    facets = {}
+    for facet in FACETS:
+        others = {name: value for name, value in filters.items() if _facet_of(name) != facet}
+        if use_totals and _only_is_active(others):
+            grouped = _facet_totals(facet, others)
+        else:
+            grouped = rows.filter(**others).values_list(facet).annotate(total=count).order_by()
+        counts = {}
+        for value, total in grouped:
+            if facet == 'subcategory':
+                value = value or None
+            counts[value] = counts.get(value, 0) + total
+        counts = {value: total for value, total in counts.items() if total > 0}
+        if facet == 'mrp_band':
+            facets['mrp'] = [
+                {
+                    'min': str(MRP_BANDS[band]),
+                    'max': str(MRP_BANDS[band + 1]) if band + 1 < len(MRP_BANDS) else None,
+                    'count': total,
+                }
+                for band, total in sorted(counts.items())
+            ]
+        else:
+            facets[facet] = [
+                {'value': value, 'count': total}
+                for value, total in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+            ]
+    if use_totals and _only_is_active(filters):
+        rows = ProductFacetTotal.objects.filter(facet='category')
+    total = rows.filter(**filters).aggregate(total=count)['total'] or 0
+    return {'total': total, 'facets': facets}
+
+
+def _facet_totals(facet, filters):
+    """(value, count) pairs of ``facet`` from ProductFacetTotal; ``filters`` may only use is_active"""
+    totals = ProductFacetTotal.objects.filter(**filters)
+    if facet == 'is_active':
+        return totals.filter(facet='category').values_list('is_active').annotate(total=Sum('product_count')).order_by()
+    grouped = totals.filter(facet=facet).values_list('value').annotate(total=Sum('product_count')).order_by()
+    return [(int(value) if facet == 'mrp_band' else value, total) for value, total in grouped]
+
+
+def _totals(counts):
+    """Sum ``{facet key: count}`` into ``{(facet, value, is_active): count}``"""
+    totals = {}
+    for key, count in counts.items():
+        values = dict(zip(FACETS, key))
+        for facet in TOTAL_FACETS:
+            _add(totals, (facet, str(values[facet]), values['is_active']), count)
+    return totals
+
+
+def _increment(model, lookup, count):
+    if model.objects.filter(**lookup).update(product_count=F('product_count') + count):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, product_count=count)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**lookup).update(product_count=F('product_count') + count)
+
+
+def _only_is_active(filters):
+    return all(_facet_of(name) == 'is_active' for name in filters)
+
+
+def _facet_of(lookup):
+    name = lookup.split('__')[0]
+    return 'mrp_band' if name == 'mrp' else name
+
+
+def _mrp_band_case():
+    return Case(
+        *[When(mrp__gte=edge, then=band) for band, edge in reversed(list(enumerate(MRP_BANDS)))],
+        default=0,
+        output_field=IntegerField(),
+    )
+
+
+def _shared_cache():
+    return caches[get_config()['CACHE_ALIAS']]
+
+
+def _add(deltas, key, count):
+    deltas[key] = deltas.get(key, 0) + count
@@ -0,0 +1,161 @@
+"""
+Append-only stock ledger.
+
+Every change to an inventory row is recorded as a ``StockLedgerEntry``
+holding the delta per bucket, a reason and a reference id (order, return,
+sync run), which gives each SKU an auditable history. Entries are never
+updated or deleted, except that compaction stamps ``applied_at``.
+
+There are two kinds of writers:
+
+- the guarded movements in ``inventory.stock`` and the absolute writes
+  (``stock.set_levels``, bulk snapshots) change ``Inventory`` directly and
+  log an entry that is already applied;
+- ``record`` only inserts pending entries. Nothing locks the inventory row,
+  so any number of writers can report restocks, damage or returns for a
+  hot SKU at once.
+
+``compact`` (the ``compact_stock_ledger`` command, run periodically) folds
+pending entries into ``Inventory`` in batches. Until then, reads add them
+to the snapshot: ``pending_annotations`` for querysets and
+``attach_pending`` for loaded rows, both read back through
+``Inventory.current_quantity``. Guarded movements count pending stock too,
+so a deferred entry can never lead to overselling, although the snapshot
+alone may dip below zero until the next compaction.
+"""
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import availability, cache
+from .models import Inventory, StockLedgerEntry
+
+BATCH_SIZE = 1000
+
+# Inventory stock field -> ledger delta field
+DELTA_FIELDS = {
+    'available_quantity': 'available_delta',
+    'reserved_quantity': 'reserved_delta',
+    'damaged_quantity': 'damaged_delta',
+}
+
+
+def record(entries):
+    """
+    Append pending entries without touching ``Inventory``. Each entry is a
+    dict with ``sku``, ``reason``, optional ``reference_id`` and one or more
+    of ``available_delta``, ``reserved_delta`` and ``damaged_delta``.
+    Raises ValueError for SKUs without an inventory row.
+    """
+    skus = {entry['sku'] for entry in entries}
+    unknown = skus - set(Inventory.objects.filter(product_id__in=skus).values_list('product_id', flat=True))
+    if unknown:
+        raise ValueError(f"No inventory for {', '.join(sorted(unknown))}")
+    with transaction.atomic():
+        created = StockLedgerEntry.objects.bulk_create(
+            StockLedgerEntry(
+                product_id=entry['sku'],
+                reason=entry['reason'],
+                reference_id=entry.get('reference_id', ''),
+                **{delta: entry.get(delta, 0) for delta in DELTA_FIELDS.values()}
+            )
+            for entry in entries
+        )
+        if any(entry.get('available_delta') for entry in entries):
+            availability.sync_listing_status(skus)
+    cache.invalidate_on_commit(*skus)
+    return created
+
+
+def log(sku, deltas, reason, reference_id=''):
+    """Log a change already written to ``Inventory``; ``deltas`` maps stock fields to changes"""
+    log_many([(sku, deltas)], reason, reference_id)
+
+
+def log_many(changes, reason, reference_id=''):
+    """Log ``[(sku, {stock field: delta})]`` already written to ``Inventory``"""
+    now = timezone.now()
+    StockLedgerEntry.objects.bulk_create(
+        StockLedgerEntry(
+            product_id=sku,
+            reason=reason,
+            reference_id=reference_id,
+            applied_at=now,
+            **{DELTA_FIELDS[field]: delta for field, delta in deltas.items()}
+        )
+        for sku, deltas in changes
+        if any(deltas.values())
+    )
+
+
+def pending_sum(field, outer_ref='product_id'):
+    """Expression for the pending change to stock ``field`` of the SKU in ``outer_ref``"""
+    entries = (
+        StockLedgerEntry.objects
+        .filter(product_id=OuterRef(outer_ref), applied_at__isnull=True)
+        .values('product_id')
+        .annotate(total=Sum(DELTA_FIELDS[field]))
+        .values('total')
+    )
+    return Coalesce(Subquery(entries, output_field=IntegerField()), Value(0))
+
+
+def pending_annotations():
+    """Annotations that make ``Inventory.current_quantity`` include pending entries"""
+    return {f'pending_{field}': pending_sum(field) for field in DELTA_FIELDS}
+
+
+def attach_pending(inventories):
+    """Set the pending totals on loaded inventory rows with one query"""
+    by_sku = {inventory.product_id: inventory for inventory in inventories}
+    for inventory in by_sku.values():
+        for field in DELTA_FIELDS:
+            setattr(inventory, f'pending_{field}', 0)
+    rows = (
+        StockLedgerEntry.objects
+        .filter(product_id__in=by_sku, applied_at__isnull=True)
+        .values_list('product_id')
+        .annotate(*(Sum(delta) for delta in DELTA_FIELDS.values()))
+        .order_by()
+    )
+    for sku, *totals in rows:
+        for field, total in zip(DELTA_FIELDS, totals):
+            setattr(by_sku[sku], f'pending_{field}', total)
+
+
+def compact(skus=None, batch_size=BATCH_SIZE):
+    """
+    Fold pending entries (of ``skus``, or all) into ``Inventory``, oldest
+    first, ``batch_size`` entries per transaction; returns the number folded.
+    """
+    folded = 0
+    while True:
+        # No savepoint of its own when a caller's transaction already holds the rows
+        with transaction.atomic(savepoint=False):
+            entries = StockLedgerEntry.objects.select_for_update().filter(applied_at__isnull=True)
+            if skus is not None:
+                entries = entries.filter(product_id__in=skus)
+            rows = list(entries.order_by('id').values_list('id', 'product_id', *DELTA_FIELDS.values())[:batch_size])
+            if not rows:
+                break
+            totals = {}
+            for _, sku, *deltas in rows:
+                total = totals.setdefault(sku, [0] * len(DELTA_FIELDS))
+                for index, delta in enumerate(deltas):
+                    total[index] += delta
+            now = timezone.now()
+            for sku, total in totals.items():
+                changes = {field: F(field) + delta for field, delta in zip(DELTA_FIELDS, total) if delta}
+                Inventory.objects.filter(product_id=sku).update(last_updated=now, **changes)
+            StockLedgerEntry.objects.filter(id__in=[row[0] for row in rows]).update(applied_at=now)
+        cache.invalidate_on_commit(*totals)
+        folded += len(rows)
+        if len(rows) < batch_size:
+            break
+    return folded
+
+
+def pending_count():
+    """Number of entries waiting for compaction"""
+    return StockLedgerEntry.objects.filter(applied_at__isnull=True).count()
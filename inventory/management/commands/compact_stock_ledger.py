@@ -0,0 +1,20 @@
+"""
+Management command to fold pending stock ledger entries into inventory rows.
+"""
+from django.core.management.base import BaseCommand
+
+from inventory.ledger import BATCH_SIZE, compact, pending_count
+
+
+class Command(BaseCommand):
+    help = 'Apply pending stock ledger entries to the inventory snapshot, oldest first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f'Entries folded per transaction (default: {BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        folded = compact(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Folded {folded} stock ledger entries, {pending_count()} still pending'
+        ))
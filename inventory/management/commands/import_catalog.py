@@ -0,0 +1,105 @@
+"""
+Management command to import a catalog of products with inventory and prices
+from a CSV or NDJSON file.
+"""
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import facets
+from inventory.catalog_import import import_chunk, read_csv, read_ndjson, validate_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Create or update products, inventory and prices from a CSV or NDJSON catalog file, '
+        'resuming from the last checkpoint after an interruption'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Catalog file, one product per CSV row or NDJSON line')
+        parser.add_argument('--format', choices=['csv', 'ndjson'],
+                            help='File format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Records written per transaction')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+        parser.add_argument('--reference-id', default='', help='Reference logged with stock ledger entries')
+        parser.add_argument('--count-facets', action='store_true',
+                            help='Update facet counts per chunk instead of rebuilding them at the end '
+                                 '(faster for small files against a large catalog)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} does not exist')
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        checkpoint_path = options['checkpoint'] or f'{path}.checkpoint'
+        stat = os.stat(path)
+        fingerprint = {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        state = {'offset': 0, 'line': 0, 'created': 0, 'updated': 0, 'failed': 0}
+        if os.path.exists(checkpoint_path) and not options['restart']:
+            with open(checkpoint_path) as file:
+                checkpoint = json.load(file)
+            if checkpoint.get('file') != fingerprint:
+                raise CommandError(
+                    f'{path} changed since {checkpoint_path} was written; use --restart to import it from the start'
+                )
+            state.update(checkpoint['state'])
+            self.stdout.write(f"Resuming {path} after line {state['line']}")
+
+        reader = read_csv if file_format == 'csv' else read_ndjson
+        started = time.monotonic()
+        processed = 0
+        with open(path, 'rb') as file:
+            chunk = []
+            failed = []
+            position = None
+            for line_number, sku, data, errors, offset in validate_records(reader(file, state['offset'], state['line'])):
+                if data is None:
+                    failed.append((line_number, sku, errors))
+                else:
+                    chunk.append((line_number, data))
+                position = (offset, line_number)
+                if len(chunk) + len(failed) >= options['chunk_size']:
+                    processed += self.write_chunk(chunk, failed, position, state, checkpoint_path, fingerprint, options)
+                    self.report(state, processed, started)
+                    chunk, failed = [], []
+            if position is not None and (chunk or failed):
+                processed += self.write_chunk(chunk, failed, position, state, checkpoint_path, fingerprint, options)
+                self.report(state, processed, started)
+
+        if not options['count_facets']:
+            facets.rebuild()
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {path}: {state['created']} created, {state['updated']} updated, {state['failed']} failed"
+        ))
+
+    def write_chunk(self, chunk, failed, position, state, checkpoint_path, fingerprint, options):
+        counts, failures = import_chunk(
+            chunk, reference_id=options['reference_id'], count_facets=options['count_facets']
+        )
+        for line_number, sku, errors in sorted(failed + failures, key=lambda failure: failure[0]):
+            self.stderr.write(f'line {line_number}' + (f' ({sku})' if sku else '') + f': {errors}')
+        state['created'] += counts['created']
+        state['updated'] += counts['updated']
+        state['failed'] += len(failed) + len(failures)
+        state['offset'], state['line'] = position
+
+        # Written only after the chunk committed; replace() keeps it whole
+        temporary = f'{checkpoint_path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump({'file': fingerprint, 'state': state}, file)
+        os.replace(temporary, checkpoint_path)
+        return len(chunk) + len(failed)
+
+    def report(self, state, processed, started):
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(
+            f"line {state['line']}: {state['created']} created, {state['updated']} updated, "
+            f"{state['failed']} failed ({processed / elapsed:,.0f} records/s)"
+        )
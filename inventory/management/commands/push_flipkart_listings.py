@@ -0,0 +1,44 @@
+"""
+Management command to push stock levels and prices to the Flipkart Marketplace.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from flipkart_seller_center.flipkart import FlipkartAPIError, get_client
+from inventory.marketplace import inventory_updates, price_updates
+
+
+class Command(BaseCommand):
+    help = 'Push stock levels and/or prices of active products to the Flipkart listing update API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--inventory', action='store_true', help='Push stock levels')
+        parser.add_argument('--prices', action='store_true', help='Push prices')
+        parser.add_argument('--sku', action='append', dest='skus', help='Only push this SKU (repeatable)')
+
+    def handle(self, *args, **options):
+        if not options['inventory'] and not options['prices']:
+            raise CommandError('Pass --inventory, --prices or both')
+        client = get_client()
+        pushes = [
+            ('inventory', options['inventory'], client.push_inventory, inventory_updates),
+            ('prices', options['prices'], client.push_prices, price_updates),
+        ]
+        failed = 0
+        for name, enabled, push, updates in pushes:
+            if not enabled:
+                continue
+            try:
+                summary = push(updates(options['skus']))
+            except FlipkartAPIError as exc:
+                raise CommandError(f'Pushing {name} failed: {exc}')
+            for sku, errors in summary['failed'].items():
+                self.stderr.write(f'{sku}: {"; ".join(map(str, errors))}')
+            failed += len(summary['failed'])
+            self.stdout.write(
+                f"{name}: {summary['succeeded']} of {summary['sent']} SKUs updated in {summary['batches']} requests"
+            )
+        counters = client.counters
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {counters['requests']} HTTP requests, {counters['retries']} retries, "
+            f"{counters['throttled_seconds']:.1f} s waiting for the rate limit, {failed} SKUs failed"
+        ))
@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the catalog facet counts from the products table.
+"""
+from django.core.management.base import BaseCommand
+
+from inventory.facets import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the brand, category, subcategory, status and MRP band counts served by /api/products/facets/'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} product facet count rows'))
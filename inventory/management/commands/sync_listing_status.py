@@ -0,0 +1,16 @@
+"""
+Management command to reconcile listing statuses with current stock levels.
+"""
+from django.core.management.base import BaseCommand
+
+from inventory.availability import sync_listing_status
+
+
+class Command(BaseCommand):
+    help = 'Flip ACTIVE and OUT_OF_STOCK listings to match each product\'s available stock'
+
+    def handle(self, *args, **options):
+        out_of_stock, back_in_stock = sync_listing_status()
+        self.stdout.write(self.style.SUCCESS(
+            f'Marked {out_of_stock} listings out of stock and {back_in_stock} back in stock'
+        ))
@@ -0,0 +1,38 @@
+"""
+Push stock levels and prices of the catalog to the Flipkart Marketplace.
+
+Rows are streamed from the database and handed to
+``flipkart_seller_center.flipkart.FlipkartClient``, which batches,
+rate-limits and retries the listing update requests. Stock levels include
+pending stock ledger entries.
+"""
+from pricing.models import Price
+
+from . import ledger
+from .models import Inventory
+
+CHUNK_SIZE = 2000
+
+
+def inventory_updates(skus=None):
+    """``{'sku', 'fsn', 'quantity', 'location_id'}`` for active products with inventory"""
+    rows = Inventory.objects.filter(product__is_active=True)
+    if skus is not None:
+        rows = rows.filter(product_id__in=skus)
+    rows = (
+        rows.annotate(pending=ledger.pending_sum('available_quantity'))
+        .order_by('product_id')
+        .values_list('product_id', 'product__fsn', 'available_quantity', 'pending', 'warehouse_location')
+    )
+    for sku, fsn, available, pending, location in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield {'sku': sku, 'fsn': fsn, 'quantity': max(available + pending, 0), 'location_id': location}
+
+
+def price_updates(skus=None):
+    """``{'sku', 'fsn', 'mrp', 'selling_price'}`` for active products with a price"""
+    rows = Price.objects.filter(product__is_active=True)
+    if skus is not None:
+        rows = rows.filter(product_id__in=skus)
+    rows = rows.order_by('product_id').values_list('product_id', 'product__fsn', 'product__mrp', 'selling_price')
+    for sku, fsn, mrp, selling_price in rows.iterator(chunk_size=CHUNK_SIZE):
+        yield {'sku': sku, 'fsn': fsn, 'mrp': mrp, 'selling_price': selling_price}
@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-18 15:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventory',
+            name='out_of_stock_threshold',
+            field=models.PositiveIntegerField(default=0, help_text='Listings go out of stock when available quantity falls to this level'),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# Generated by Django 6.0 on 2026-10-18 15:41
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, Count, When
+
+MRP_BANDS = ('0.00', '500.00', '1000.00', '2500.00', '5000.00', '10000.00', '25000.00', '50000.00')
+
+
+def backfill_facet_counts(apps, schema_editor):
+    Product = apps.get_model('inventory', 'Product')
+    ProductFacetCount = apps.get_model('inventory', 'ProductFacetCount')
+    ProductFacetTotal = apps.get_model('inventory', 'ProductFacetTotal')
+    band = Case(
+        *[When(mrp__gte=Decimal(edge), then=index) for index, edge in reversed(list(enumerate(MRP_BANDS)))],
+        default=0,
+        output_field=models.IntegerField(),
+    )
+    counts = {}
+    rows = (
+        Product.objects.annotate(mrp_band=band)
+        .values_list('brand', 'category', 'subcategory', 'is_active', 'mrp_band')
+        .annotate(product_count=Count('pk'))
+        .order_by()
+    )
+    for brand, category, subcategory, is_active, mrp_band, product_count in rows:
+        key = (brand, category, subcategory or '', is_active, mrp_band)
+        counts[key] = counts.get(key, 0) + product_count
+    ProductFacetCount.objects.bulk_create(
+        ProductFacetCount(
+            brand=brand, category=category, subcategory=subcategory,
+            is_active=is_active, mrp_band=mrp_band, product_count=product_count
+        )
+        for (brand, category, subcategory, is_active, mrp_band), product_count in counts.items()
+    )
+    totals = {}
+    for (brand, category, subcategory, is_active, mrp_band), product_count in counts.items():
+        for facet, value in (('brand', brand), ('category', category),
+                             ('subcategory', subcategory), ('mrp_band', str(mrp_band))):
+            key = (facet, value, is_active)
+            totals[key] = totals.get(key, 0) + product_count
+    ProductFacetTotal.objects.bulk_create(
+        ProductFacetTotal(facet=facet, value=value, is_active=is_active, product_count=product_count)
+        for (facet, value, is_active), product_count in totals.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_out_of_stock_threshold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand', models.CharField(max_length=100)),
+                ('category', models.CharField(max_length=100)),
+                ('subcategory', models.CharField(blank=True, default='', max_length=100)),
+                ('is_active', models.BooleanField()),
+                ('mrp_band', models.PositiveSmallIntegerField(help_text='Index into inventory.facets.MRP_BANDS')),
+                ('product_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductFacetTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(blank=True, max_length=100)),
+                ('is_active', models.BooleanField()),
+                ('product_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value', 'is_active'), name='product_facet_total_uniq')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['brand', 'product_name'], name='product_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'subcategory', 'product_name'], name='product_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['subcategory', 'product_name'], name='product_subcategory_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'product_name'], name='product_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['mrp'], name='product_mrp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productfacetcount',
+            index=models.Index(fields=['category', 'brand', 'subcategory', 'is_active', 'mrp_band', 'product_count'], name='facet_count_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productfacetcount',
+            index=models.Index(fields=['brand', 'category', 'subcategory', 'is_active', 'mrp_band', 'product_count'], name='facet_count_brand_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='productfacetcount',
+            constraint=models.UniqueConstraint(fields=('brand', 'category', 'subcategory', 'is_active', 'mrp_band'), name='product_facet_count_uniq'),
+        ),
+        migrations.RunPython(backfill_facet_counts, migrations.RunPython.noop),
+    ]
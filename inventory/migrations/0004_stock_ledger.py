@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-18 16:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_product_facets'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('available_delta', models.IntegerField(default=0)),
+                ('reserved_delta', models.IntegerField(default=0)),
+                ('damaged_delta', models.IntegerField(default=0)),
+                ('reason', models.CharField(choices=[('RESERVE', 'Reserve'), ('RELEASE', 'Release'), ('COMMIT', 'Commit'), ('ADJUST', 'Adjust'), ('SET', 'Set Stock Levels'), ('SNAPSHOT', 'Stock Snapshot'), ('RESTOCK', 'Restock'), ('DAMAGE', 'Damage'), ('RETURN', 'Customer Return'), ('CORRECTION', 'Correction')], max_length=20)),
+                ('reference_id', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('applied_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_ledger', to='inventory.product')),
+            ],
+            options={
+                'verbose_name_plural': 'stock ledger entries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['product', '-created_at'], name='stock_ledger_product_idx'), models.Index(fields=['-created_at'], name='stock_ledger_created_idx'), models.Index(condition=models.Q(('applied_at__isnull', True)), fields=['product'], name='stock_ledger_pending_idx')],
+            },
+        ),
+    ]
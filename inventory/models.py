@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 
 
 class Product(models.Model):
@@ -19,11 +20,66 @@ class Product(models.Model):
     
     class Meta:
         ordering = ['product_name']
+        indexes = [
+            models.Index(fields=['brand', 'product_name'], name='product_brand_idx'),
+            models.Index(fields=['category', 'subcategory', 'product_name'], name='product_category_idx'),
+            models.Index(fields=['subcategory', 'product_name'], name='product_subcategory_idx'),
+            models.Index(fields=['is_active', 'product_name'], name='product_active_idx'),
+            models.Index(fields=['mrp'], name='product_mrp_idx'),
+        ]
         
     def __str__(self):
         return f"{self.product_name} ({self.sku})"
 
 
+class ProductFacetCount(models.Model):
+    """Product counts per combination of catalog facet values"""
+    brand = models.CharField(max_length=100)
+    category = models.CharField(max_length=100)
+    subcategory = models.CharField(max_length=100, blank=True, default='')  # '' for no subcategory
+    is_active = models.BooleanField()
+    mrp_band = models.PositiveSmallIntegerField(help_text="Index into inventory.facets.MRP_BANDS")
+    product_count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['brand', 'category', 'subcategory', 'is_active', 'mrp_band'],
+                name='product_facet_count_uniq'
+            ),
+        ]
+        # Covering indexes, so facet counts within a category or brand never read the table
+        indexes = [
+            models.Index(
+                fields=['category', 'brand', 'subcategory', 'is_active', 'mrp_band', 'product_count'],
+                name='facet_count_category_idx'
+            ),
+            models.Index(
+                fields=['brand', 'category', 'subcategory', 'is_active', 'mrp_band', 'product_count'],
+                name='facet_count_brand_idx'
+            ),
+        ]
+        
+    def __str__(self):
+        return f"{self.brand} / {self.category} / {self.subcategory or '-'}: {self.product_count}"
+
+
+class ProductFacetTotal(models.Model):
+    """Product counts per value of one catalog facet, split by is_active"""
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=100, blank=True)  # str() of the value; '' for no subcategory
+    is_active = models.BooleanField()
+    product_count = models.IntegerField(default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['facet', 'value', 'is_active'], name='product_facet_total_uniq'),
+        ]
+        
+    def __str__(self):
+        return f"{self.facet}={self.value or '-'} ({'active' if self.is_active else 'inactive'}): {self.product_count}"
+
+
 class Inventory(models.Model):
     """Model for Inventory Stock"""
     product = models.OneToOneField(Product, on_delete=models.CASCADE, related_name='inventory')
@@ -32,6 +88,9 @@ class Inventory(models.Model):
     damaged_quantity = models.IntegerField(default=0)
     warehouse_location = models.CharField(max_length=100, blank=True, null=True)
     procurement_sla = models.IntegerField(help_text="Procurement SLA in days")
+    out_of_stock_threshold = models.PositiveIntegerField(
+        default=0, help_text="Listings go out of stock when available quantity falls to this level"
+    )
     last_updated = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -40,9 +99,54 @@ class Inventory(models.Model):
     def __str__(self):
         return f"Inventory for {self.product.sku}"
     
+    def current_quantity(self, field):
+        """``field`` plus pending stock ledger entries, when the queryset annotated them"""
+        return getattr(self, field) + (getattr(self, f'pending_{field}', 0) or 0)
+    
     @property
     def total_quantity(self):
-        return self.available_quantity + self.reserved_quantity + self.damaged_quantity
+        return sum(self.current_quantity(field) for field in ('available_quantity', 'reserved_quantity', 'damaged_quantity'))
+    
+    @property
+    def is_out_of_stock(self):
+        return self.current_quantity('available_quantity') <= self.out_of_stock_threshold
+
+
+class StockLedgerEntry(models.Model):
+    """Append-only record of one change to a product's stock levels"""
+    REASON_CHOICES = [
+        ('RESERVE', 'Reserve'),
+        ('RELEASE', 'Release'),
+        ('COMMIT', 'Commit'),
+        ('ADJUST', 'Adjust'),
+        ('SET', 'Set Stock Levels'),
+        ('SNAPSHOT', 'Stock Snapshot'),
+        ('RESTOCK', 'Restock'),
+        ('DAMAGE', 'Damage'),
+        ('RETURN', 'Customer Return'),
+        ('CORRECTION', 'Correction'),
+    ]
+    
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_ledger')
+    available_delta = models.IntegerField(default=0)
+    reserved_delta = models.IntegerField(default=0)
+    damaged_delta = models.IntegerField(default=0)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    reference_id = models.CharField(max_length=100, blank=True)  # Order, return or sync run
+    created_at = models.DateTimeField(auto_now_add=True)
+    applied_at = models.DateTimeField(null=True, blank=True)  # Folded into Inventory
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = 'stock ledger entries'
+        indexes = [
+            models.Index(fields=['product', '-created_at'], name='stock_ledger_product_idx'),
+            models.Index(fields=['-created_at'], name='stock_ledger_created_idx'),
+            models.Index(fields=['product'], condition=Q(applied_at__isnull=True), name='stock_ledger_pending_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.reason} {self.product_id}: {self.available_delta:+}/{self.reserved_delta:+}/{self.damaged_delta:+}"
 
 
 class Listing(models.Model):
@@ -1,17 +1,28 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import Product, Inventory, Listing
+from .models import Product, Inventory, Listing, StockLedgerEntry
 
 
 class InventorySerializer(serializers.ModelSerializer):
     """Serializer for Inventory"""
     total_quantity = serializers.ReadOnlyField()
+    is_out_of_stock = serializers.ReadOnlyField()
     
     class Meta:
         model = Inventory
         fields = [
             'id', 'available_quantity', 'reserved_quantity', 'damaged_quantity',
-            'warehouse_location', 'procurement_sla', 'last_updated', 'total_quantity'
+            'warehouse_location', 'procurement_sla', 'out_of_stock_threshold',
+            'last_updated', 'total_quantity', 'is_out_of_stock'
         ]
+    
+    def to_representation(self, instance):
+        # Report the stock levels including pending ledger entries
+        data = super().to_representation(instance)
+        for field in ('available_quantity', 'reserved_quantity', 'damaged_quantity'):
+            data[field] = instance.current_quantity(field)
+        return data
 
 
 class ListingSerializer(serializers.ModelSerializer):
@@ -37,3 +48,96 @@ class ProductSerializer(serializers.ModelSerializer):
             'subcategory', 'mrp', 'hsn_code', 'tax_percentage', 'is_active',
             'created_at', 'updated_at', 'inventory', 'listings'
         ]
+
+
+class ProductLookupSerializer(serializers.ModelSerializer):
+    """Serializer for cached product lookups (without listings)"""
+    inventory = InventorySerializer(read_only=True)
+    
+    class Meta:
+        model = Product
+        fields = [
+            'sku', 'fsn', 'product_name', 'description', 'brand', 'category',
+            'subcategory', 'mrp', 'hsn_code', 'tax_percentage', 'is_active',
+            'created_at', 'updated_at', 'inventory'
+        ]
+
+
+class StockMovementSerializer(serializers.Serializer):
+    """Serializer for a reserve, release or commit request"""
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    """Serializer for a stock adjustment; negative quantities remove stock"""
+    quantity = serializers.IntegerField()
+    
+    def validate_quantity(self, value):
+        if value == 0:
+            raise serializers.ValidationError('Quantity must not be zero.')
+        return value
+
+
+class BulkStockSerializer(serializers.Serializer):
+    """Serializer for a bulk stock snapshot: {sku: quantity or {field: quantity}}"""
+    stock = serializers.DictField(allow_empty=False)
+    include_changes = serializers.BooleanField(required=False, default=False)
+    reference_id = serializers.CharField(required=False, default='', allow_blank=True, max_length=100)
+    
+    def validate_stock(self, value):
+        if len(value) > 10000:
+            raise serializers.ValidationError('At most 10000 SKUs per request.')
+        return value
+
+
+class StockLedgerEntrySerializer(serializers.ModelSerializer):
+    """Serializer for stock ledger entries; new entries stay pending until compaction"""
+    sku = serializers.CharField(source='product_id', max_length=100)
+    
+    class Meta:
+        model = StockLedgerEntry
+        fields = [
+            'id', 'sku', 'available_delta', 'reserved_delta', 'damaged_delta',
+            'reason', 'reference_id', 'created_at', 'applied_at'
+        ]
+        read_only_fields = ['created_at', 'applied_at']
+    
+    def validate(self, data):
+        if not any(data.get(field) for field in ('available_delta', 'reserved_delta', 'damaged_delta')):
+            raise serializers.ValidationError('At least one delta must be non-zero.')
+        return data
+
+
+class CatalogRecordSerializer(serializers.ModelSerializer):
+    """Serializer for one product of a catalog import, with its inventory and price columns"""
+    available_quantity = serializers.IntegerField(min_value=0)
+    reserved_quantity = serializers.IntegerField(min_value=0, default=0)
+    damaged_quantity = serializers.IntegerField(min_value=0, default=0)
+    warehouse_location = serializers.CharField(max_length=100, required=False, allow_null=True, default=None)
+    procurement_sla = serializers.IntegerField(min_value=0)
+    out_of_stock_threshold = serializers.IntegerField(min_value=0, default=0)
+    listing_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    selling_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    discount_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    commission_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=Decimal('0'))
+    shipping_fee = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), default=Decimal('0'))
+    
+    class Meta:
+        model = Product
+        fields = [
+            'sku', 'fsn', 'product_name', 'description', 'brand', 'category',
+            'subcategory', 'mrp', 'hsn_code', 'tax_percentage', 'is_active',
+            'available_quantity', 'reserved_quantity', 'damaged_quantity', 'warehouse_location',
+            'procurement_sla', 'out_of_stock_threshold', 'listing_price', 'selling_price',
+            'discount_percentage', 'cost_price', 'commission_percentage', 'shipping_fee'
+        ]
+        # Existing SKUs and FSNs are updated, so uniqueness is left to the upsert
+        extra_kwargs = {'sku': {'validators': []}, 'fsn': {'validators': []}}
+    
+    def validate(self, data):
+        data.setdefault('is_active', True)
+        if 'discount_percentage' not in data:
+            discount = (data['listing_price'] - data['selling_price']) / data['listing_price'] * 100
+            data['discount_percentage'] = discount.quantize(Decimal('0.01'))
+        return data
@@ -0,0 +1,60 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from . import availability, cache, facets
+from .models import Product, Inventory
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product(sender, instance, **kwargs):
+    """Drop a saved or deleted product from the product cache"""
+    cache.invalidate_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+@receiver(post_save, sender='pricing.Price')
+@receiver(post_delete, sender='pricing.Price')
+def invalidate_product_rows(sender, instance, **kwargs):
+    """Drop the owning product when its cached inventory or price row changes"""
+    cache.invalidate_on_commit(instance.product_id)
+
+
+@receiver(post_save, sender=Inventory)
+def sync_listings(sender, instance, update_fields=None, raw=False, **kwargs):
+    """Flip the product's listings when a saved stock level crosses its threshold"""
+    if raw or (update_fields is not None
+               and not {'available_quantity', 'out_of_stock_threshold'} & set(update_fields)):
+        return
+    availability.sync_listing_status([instance.product_id])
+
+
+@receiver(pre_save, sender=Product)
+def remember_facet_key(sender, instance, raw=False, **kwargs):
+    """Read the stored facet values of a product about to be updated"""
+    instance._facet_previous = None
+    if raw:
+        return
+    # SKUs are set by the caller, so even an unsaved instance may update a stored row
+    stored = Product.objects.filter(pk=instance.pk).only(*facets.PRODUCT_FIELDS).first()
+    if stored is not None:
+        instance._facet_previous = facets.product_key(stored)
+
+
+@receiver(post_save, sender=Product)
+def count_saved_product(sender, instance, created, raw=False, **kwargs):
+    """Keep the catalog facet counts in step with saved products"""
+    if raw:
+        return
+    previous = getattr(instance, '_facet_previous', None)
+    if previous is not None:
+        facets.record_changed(previous, facets.product_key(instance))
+    elif created:
+        facets.record_created([instance])
+
+
+@receiver(post_delete, sender=Product)
+def uncount_deleted_product(sender, instance, **kwargs):
+    """Drop deleted products from the catalog facet counts"""
+    facets.record_deleted([instance])
@@ -1,8 +1,33 @@
-from spyne import Application, rpc, ServiceBase, Unicode, Integer, Decimal, Boolean
+from spyne import Application, rpc, ServiceBase, Unicode, Integer, Decimal, Boolean, Array, ComplexModel, Fault
 from spyne.protocol.soap import Soap11
 from spyne.server.django import DjangoApplication
 from django.views.decorators.csrf import csrf_exempt
 from .models import Product, Inventory, Listing
+from .bulk import bulk_update_stock, STOCK_FIELDS
+from . import cache, stock
+
+
+class StockLevel(ComplexModel):
+    """Absolute stock levels of one SKU; omitted quantities are left unchanged"""
+    __namespace__ = 'flipkart.seller.inventory'
+    
+    sku = Unicode
+    available_quantity = Integer
+    reserved_quantity = Integer
+    damaged_quantity = Integer
+
+
+class StockUpdateSummary(ComplexModel):
+    """Outcome of a bulk stock update"""
+    __namespace__ = 'flipkart.seller.inventory'
+    
+    received = Integer
+    updated = Integer
+    unchanged = Integer
+    not_found = Array(Unicode)
+    invalid = Array(Unicode)
+    out_of_stock = Integer
+    back_in_stock = Integer
 
 
 class InventoryService(ServiceBase):
@@ -12,7 +37,7 @@ class InventoryService(ServiceBase):
     def get_product(ctx, sku):
         """Get product details by SKU"""
         try:
-            product = Product.objects.get(sku=sku)
+            product = cache.get_product(sku=sku)
             return f"SKU: {product.sku}, Name: {product.product_name}, MRP: {product.mrp}, Active: {product.is_active}"
         except Product.DoesNotExist:
             return f"Product {sku} not found"
@@ -30,9 +55,12 @@ class InventoryService(ServiceBase):
     def get_inventory(ctx, sku):
         """Get inventory details by product SKU"""
         try:
-            product = Product.objects.get(sku=sku)
+            product = cache.get_product(sku=sku)
             inventory = product.inventory
-            return f"SKU: {sku}, Available: {inventory.available_quantity}, Reserved: {inventory.reserved_quantity}, Total: {inventory.total_quantity}"
+            return (
+                f"SKU: {sku}, Available: {inventory.current_quantity('available_quantity')}, "
+                f"Reserved: {inventory.current_quantity('reserved_quantity')}, Total: {inventory.total_quantity}"
+            )
         except Product.DoesNotExist:
             return f"Product {sku} not found"
         except Inventory.DoesNotExist:
@@ -42,15 +70,56 @@ class InventoryService(ServiceBase):
     def update_stock(ctx, sku, available_quantity):
         """Update stock levels for a product"""
         try:
-            product = Product.objects.get(sku=sku)
-            inventory = product.inventory
-            inventory.available_quantity = available_quantity
-            inventory.save()
-            return f"Stock updated for {sku}. New available quantity: {available_quantity}"
-        except Product.DoesNotExist:
-            return f"Product {sku} not found"
+            stock.set_levels({'available_quantity': available_quantity}, product_id=sku)
         except Inventory.DoesNotExist:
+            if not Product.objects.filter(sku=sku).exists():
+                return f"Product {sku} not found"
             return f"Inventory not found for product {sku}"
+        return f"Stock updated for {sku}. New available quantity: {available_quantity}"
+    
+    @rpc(Unicode, Integer, _returns=Unicode)
+    def reserve_stock(ctx, sku, quantity):
+        """Move available stock to reserved"""
+        return _move_stock(stock.reserve, sku, quantity, 'reserved')
+    
+    @rpc(Unicode, Integer, _returns=Unicode)
+    def release_stock(ctx, sku, quantity):
+        """Return reserved stock to available"""
+        return _move_stock(stock.release, sku, quantity, 'released')
+    
+    @rpc(Unicode, Integer, _returns=Unicode)
+    def commit_stock(ctx, sku, quantity):
+        """Remove reserved stock that has shipped"""
+        return _move_stock(stock.commit, sku, quantity, 'committed')
+    
+    @rpc(Unicode, Integer, _returns=Unicode)
+    def adjust_stock(ctx, sku, quantity):
+        """Add to (or, with a negative quantity, remove from) available stock"""
+        return _move_stock(stock.adjust, sku, quantity, 'adjusted')
+    
+    @rpc(Array(StockLevel), _returns=StockUpdateSummary)
+    def bulk_update_stock(ctx, levels):
+        """Apply absolute stock levels to many SKUs at once, skipping unchanged rows"""
+        levels = levels or []
+        if len(levels) > 10000:
+            raise Fault('Client.TooManySkus', 'At most 10000 SKUs per call')
+        snapshot = {
+            level.sku: {
+                field: getattr(level, field) for field in STOCK_FIELDS
+                if getattr(level, field) is not None
+            }
+            for level in levels
+        }
+        result = bulk_update_stock(snapshot)
+        return StockUpdateSummary(
+            received=result['received'],
+            updated=result['updated'],
+            unchanged=result['unchanged'],
+            not_found=result['not_found'],
+            invalid=[f"{sku}: {error}" for sku, error in result['invalid'].items()],
+            out_of_stock=result['out_of_stock'],
+            back_in_stock=result['back_in_stock']
+        )
     
     @rpc(Unicode, _returns=Unicode)
     def activate_product(ctx, sku):
@@ -75,6 +144,23 @@ class InventoryService(ServiceBase):
             return f"Product {sku} not found"
 
 
+def _move_stock(movement, sku, quantity, verb):
+    """Apply a stock movement and format the result"""
+    try:
+        inventory = movement(quantity, product_id=sku)
+    except ValueError as exc:
+        return str(exc)
+    except Inventory.DoesNotExist:
+        return f"Inventory not found for product {sku}"
+    except stock.InsufficientStock as exc:
+        return str(exc)
+    return (
+        f"{quantity} units {verb} for {sku}. "
+        f"Available: {inventory.current_quantity('available_quantity')}, "
+        f"Reserved: {inventory.current_quantity('reserved_quantity')}"
+    )
+
+
 # Create SOAP application
 inventory_soap_app = Application(
     [InventoryService],
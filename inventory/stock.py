@@ -0,0 +1,136 @@
+"""
+Atomic stock movements.
+
+Every movement is one guarded UPDATE, for example a reservation:
+
+    UPDATE inventory_inventory
+    SET available_quantity = available_quantity - n,
+        reserved_quantity = reserved_quantity + n
+    WHERE id = <id> AND available_quantity >= n
+
+The database applies the arithmetic under its own row lock, so concurrent
+reservations of one hot SKU can neither lose updates nor oversell. When the
+guard fails, ``InsufficientStock`` reports the quantity that was short.
+
+- reserve: available -> reserved (an order is placed)
+- release: reserved -> available (the order is cancelled)
+- commit: reserved -> gone (the order ships)
+- adjust: available +/- n (restock, shrinkage, stock count corrections)
+- set_levels: absolute levels (inventory syncs, manual edits)
+
+Pending entries in the stock ledger count towards the guard, and every
+movement is logged there as an applied entry (see ``inventory.ledger``).
+
+Movements that take available stock across the product's out-of-stock
+threshold flip its listings in the same transaction (see
+``inventory.availability``).
+"""
+from django.db import transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from . import availability, cache, ledger
+from .models import Inventory
+
+
+class InsufficientStock(Exception):
+    """Raised when a movement would take a quantity below zero"""
+
+    def __init__(self, inventory, field, requested):
+        self.inventory = inventory
+        self.field = field
+        self.requested = requested
+        self.current = inventory.current_quantity(field)
+        label = field.replace('_quantity', '')
+        super().__init__(
+            f"Insufficient {label} stock for {inventory.product_id}: "
+            f"requested {requested}, {label} {self.current}"
+        )
+
+
+def reserve(quantity, reference_id='', **lookup):
+    """Move ``quantity`` units from available to reserved"""
+    _check_quantity(quantity)
+    return _move(lookup, 'available_quantity', quantity, {
+        'available_quantity': -quantity,
+        'reserved_quantity': quantity,
+    }, 'RESERVE', reference_id)
+
+
+def release(quantity, reference_id='', **lookup):
+    """Return ``quantity`` reserved units to available"""
+    _check_quantity(quantity)
+    return _move(lookup, 'reserved_quantity', quantity, {
+        'available_quantity': quantity,
+        'reserved_quantity': -quantity,
+    }, 'RELEASE', reference_id)
+
+
+def commit(quantity, reference_id='', **lookup):
+    """Remove ``quantity`` reserved units that have left the warehouse"""
+    _check_quantity(quantity)
+    return _move(lookup, 'reserved_quantity', quantity, {
+        'reserved_quantity': -quantity,
+    }, 'COMMIT', reference_id)
+
+
+def adjust(delta, reference_id='', **lookup):
+    """Add ``delta`` (negative to remove) units to available stock"""
+    if not isinstance(delta, int) or isinstance(delta, bool) or delta == 0:
+        raise ValueError('delta must be a non-zero integer')
+    return _move(lookup, 'available_quantity', max(-delta, 0), {
+        'available_quantity': delta,
+    }, 'ADJUST', reference_id)
+
+
+def set_levels(levels, reason='SET', reference_id='', **lookup):
+    """
+    Set absolute stock ``levels`` ({field: quantity}) on the inventory row
+    matching ``lookup``, folding its pending ledger entries in first, and
+    log the difference; returns the updated row.
+    """
+    with transaction.atomic():
+        inventory = Inventory.objects.select_for_update().get(**lookup)
+        if ledger.compact([inventory.product_id]):
+            inventory.refresh_from_db()
+        deltas = {field: quantity - getattr(inventory, field) for field, quantity in levels.items()}
+        for field, quantity in levels.items():
+            setattr(inventory, field, quantity)
+        # post_save flips listings and invalidates the cache
+        inventory.save(update_fields=[*levels, 'last_updated'])
+        ledger.log(inventory.product_id, deltas, reason, reference_id)
+    return inventory
+
+
+def _check_quantity(quantity):
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+        raise ValueError('quantity must be a positive integer')
+
+
+def _move(lookup, guard_field, required, deltas, reason, reference_id=''):
+    """
+    Apply ``deltas`` ({field: change}) to the inventory row matching
+    ``lookup`` if its ``guard_field``, counting pending ledger entries, is
+    at least ``required``; logs the movement and returns the updated row.
+    """
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    guard = Value(required) - ledger.pending_sum(guard_field)
+    with transaction.atomic():
+        updated = Inventory.objects.filter(**lookup, **{f'{guard_field}__gte': guard}).update(
+            last_updated=timezone.now(), **changes
+        )
+        # Within the transaction the row still holds exactly this write
+        inventory = Inventory.objects.annotate(**ledger.pending_annotations()).get(**lookup)
+        if updated:
+            ledger.log(inventory.product_id, deltas, reason, reference_id)
+            available = inventory.current_quantity('available_quantity')
+            if availability.crossed(
+                available - deltas.get('available_quantity', 0), available, inventory.out_of_stock_threshold
+            ):
+                direction = 'out_of_stock' if inventory.is_out_of_stock else 'back_in_stock'
+                availability.flip_listings(**{direction: [inventory.product_id]})
+    if not updated:
+        raise InsufficientStock(inventory, guard_field, required)
+    # QuerySet.update sends no post_save, so drop the cached product here
+    cache.invalidate_on_commit(inventory.product_id)
+    return inventory
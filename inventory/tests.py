@@ -1,3 +1,734 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from flipkart_seller_center import flipkart
+from flipkart_seller_center.flipkart_stub import StubServer
+from pricing.models import PriceHistory
+
+from .bulk import bulk_update_stock
+from .cache import get_product_cache, sku_key
+from .models import Product, ProductFacetCount, ProductFacetTotal, Inventory, Listing, StockLedgerEntry
+from . import facets, ledger, stock
+
+
+def create_product(sku, **kwargs):
+    """Create a product with sensible defaults for tests"""
+    defaults = {
+        'fsn': f'FSN-{sku}',
+        'product_name': f'Product {sku}',
+        'brand': 'Test Brand',
+        'category': 'Electronics',
+        'mrp': Decimal('1000.00'),
+        'hsn_code': 'HSN1000',
+        'tax_percentage': Decimal('18.00'),
+    }
+    defaults.update(kwargs)
+    return Product.objects.create(sku=sku, **defaults)
+
+
+class ProductQueryBudgetTests(TestCase):
+    """Product endpoints must serialize nested relations in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(5):
+            product = create_product(f'SKU-{i}')
+            # Leave one product without inventory to cover the missing reverse one-to-one
+            if i:
+                Inventory.objects.create(product=product, available_quantity=10, procurement_sla=3)
+            for j in range(2):
+                Listing.objects.create(
+                    product=product, listing_id=f'LIST-{i}-{j}', fulfillment_type='FBF'
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_product_list(self):
+        # products, inventory with pending ledger totals, listings
+        with self.assertNumQueries(3):
+            response = self.client.get('/inventory/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+    def test_product_detail(self):
+        # validators, product, inventory with pending ledger totals, listings
+        with self.assertNumQueries(4):
+            response = self.client.get('/inventory/api/products/SKU-1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['listings']), 2)
+
+    def test_inventory_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/inventory/api/inventory/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_listing_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/inventory/api/listings/')
+        self.assertEqual(response.status_code, 200)
+
+
+class StockMovementTests(TestCase):
+    """Guarded reserve, release, commit and adjust operations"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.inventory = Inventory.objects.create(
+            product=create_product('SKU-1'), available_quantity=10, procurement_sla=3
+        )
+        self.url = f'/inventory/api/inventory/{self.inventory.pk}'
+
+    def post(self, action, quantity):
+        return self.client.post(f'{self.url}/{action}/', {'quantity': quantity}, format='json')
+
+    def quantities(self):
+        self.inventory.refresh_from_db()
+        return self.inventory.available_quantity, self.inventory.reserved_quantity
+
+    def test_reserve_release_commit(self):
+        response = self.post('reserve', 4)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['available_quantity'], 6)
+        self.assertEqual(response.data['reserved_quantity'], 4)
+        self.post('release', 1)
+        self.assertEqual(self.quantities(), (7, 3))
+        self.post('commit', 3)
+        self.assertEqual(self.quantities(), (7, 0))
+
+    def test_reservation_never_oversells(self):
+        self.assertEqual(self.post('reserve', 10).status_code, 200)
+        response = self.post('reserve', 1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['available_quantity'], 0)
+        self.assertEqual(self.post('commit', 11).status_code, 409)
+        self.assertEqual(self.quantities(), (0, 10))
+
+    def test_reserve_is_a_single_guarded_update(self):
+        # savepoint, UPDATE, SELECT, ledger INSERT, release savepoint
+        with self.assertNumQueries(5):
+            self.post('reserve', 1)
+
+    def test_adjust(self):
+        self.assertEqual(self.post('adjust', 5).status_code, 200)
+        self.assertEqual(self.post('adjust', -15).status_code, 200)
+        self.assertEqual(self.post('adjust', -1).status_code, 409)
+        self.assertEqual(self.post('adjust', 0).status_code, 400)
+        self.assertEqual(self.quantities(), (0, 0))
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.post('reserve', 0).status_code, 400)
+        response = self.client.post('/inventory/api/inventory/999/reserve/', {'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_stock_leaves_other_columns_alone(self):
+        self.post('reserve', 2)
+        Inventory.objects.filter(pk=self.inventory.pk).update(reserved_quantity=5)
+        response = self.client.post(f'{self.url}/update-stock/', {'available_quantity': 20}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantities(), (20, 5))
+
+
+class BulkStockUpdateTests(TestCase):
+    """Whole-catalog stock snapshots over REST and SOAP"""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(3):
+            Inventory.objects.create(
+                product=create_product(f'SKU-{i}'), available_quantity=10, procurement_sla=3
+            )
+
+    def levels(self):
+        return dict(Inventory.objects.values_list('product_id', 'available_quantity'))
+
+    def test_bulk_update(self):
+        stamp = Inventory.objects.get(product_id='SKU-0').last_updated
+        response = self.client.post('/inventory/api/inventory/bulk-update-stock/', {
+            'stock': {
+                'SKU-0': 25,
+                'SKU-1': {'available_quantity': 10},
+                'SKU-2': {'available_quantity': 4, 'damaged_quantity': 1},
+                'SKU-MISSING': 5,
+                'SKU-BAD': -1,
+            },
+            'include_changes': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['received'], 5)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertEqual(response.data['not_found'], ['SKU-MISSING'])
+        self.assertEqual(list(response.data['invalid']), ['SKU-BAD'])
+        self.assertEqual(response.data['delta'], {
+            'available_quantity': 9, 'reserved_quantity': 0, 'damaged_quantity': 1
+        })
+        self.assertEqual(response.data['changes']['SKU-0'], {'available_quantity': [10, 25]})
+        self.assertEqual(self.levels(), {'SKU-0': 25, 'SKU-1': 10, 'SKU-2': 4})
+        self.assertGreater(Inventory.objects.get(product_id='SKU-0').last_updated, stamp)
+
+    def test_unchanged_rows_are_not_written(self):
+        stamp = Inventory.objects.get(product_id='SKU-0').last_updated
+        # savepoint, pending ledger entries, locked read, release savepoint
+        with self.assertNumQueries(4):
+            response = self.client.post('/inventory/api/inventory/bulk-update-stock/', {
+                'stock': {'SKU-0': 10, 'SKU-1': 10}
+            }, format='json')
+        self.assertEqual(response.data['unchanged'], 2)
+        self.assertEqual(Inventory.objects.get(product_id='SKU-0').last_updated, stamp)
+
+    def test_soap_bulk_update(self):
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:tns="flipkart.seller.inventory"><soapenv:Body><tns:bulk_update_stock><tns:levels>'
+            '<tns:StockLevel><tns:sku>SKU-0</tns:sku><tns:available_quantity>3</tns:available_quantity></tns:StockLevel>'
+            '<tns:StockLevel><tns:sku>SKU-1</tns:sku><tns:available_quantity>10</tns:available_quantity></tns:StockLevel>'
+            '<tns:StockLevel><tns:sku>SKU-9</tns:sku><tns:available_quantity>1</tns:available_quantity></tns:StockLevel>'
+            '</tns:levels></tns:bulk_update_stock></soapenv:Body></soapenv:Envelope>'
+        )
+        response = self.client.post('/inventory/soap/', envelope, content_type='text/xml')
+        self.assertEqual(response.status_code, 200)
+        root = ET.fromstring(response.content)
+        ns = {'tns': 'flipkart.seller.inventory'}
+        self.assertEqual(root.findtext('.//tns:updated', namespaces=ns), '1')
+        self.assertEqual(root.findtext('.//tns:unchanged', namespaces=ns), '1')
+        self.assertEqual(root.findtext('.//tns:not_found/tns:string', namespaces=ns), 'SKU-9')
+        self.assertEqual(self.levels()['SKU-0'], 3)
+
+
+class ProductCacheTests(TestCase):
+    """Read-through product lookups by SKU and FSN"""
+
+    def setUp(self):
+        cache.clear()
+        self.product_cache = get_product_cache()
+        self.product_cache.clear()
+        self.client = APIClient()
+        self.inventory = Inventory.objects.create(
+            product=create_product('SKU-1'), available_quantity=10, procurement_sla=3
+        )
+
+    def test_repeated_lookups_hit_the_cache(self):
+        # product joined with inventory and price, pending ledger totals
+        with self.assertNumQueries(2):
+            first = self.product_cache.get_by_sku('SKU-1')
+            again = self.product_cache.get_by_sku('SKU-1')
+            by_fsn = self.product_cache.get_by_fsn('FSN-SKU-1')
+            self.assertEqual(by_fsn.inventory.available_quantity, 10)
+        self.assertIs(first, again)
+        self.assertIs(first, by_fsn)
+        stats = self.product_cache.stats()
+        self.assertEqual((stats['misses'], stats['local_hits']), (1, 2))
+
+    def test_shared_cache_backs_the_local_lru(self):
+        self.product_cache.get_by_sku('SKU-1')
+        self.product_cache._local.clear()
+        with self.assertNumQueries(0):
+            product = self.product_cache.get_by_fsn('FSN-SKU-1')
+        self.assertEqual(product.sku, 'SKU-1')
+        self.assertEqual(self.product_cache.stats()['shared_hits'], 1)
+
+    def test_missing_product(self):
+        with self.assertRaises(Product.DoesNotExist):
+            self.product_cache.get_by_sku('SKU-9')
+        with self.assertRaises(Product.DoesNotExist):
+            self.product_cache.get_by_fsn('FSN-SKU-9')
+
+    def test_saves_and_stock_movements_invalidate(self):
+        self.product_cache.get_by_sku('SKU-1')
+        Product.objects.filter(sku='SKU-1').first().save()
+        self.inventory.available_quantity = 7
+        self.inventory.save()
+        self.assertEqual(self.product_cache.get_by_sku('SKU-1').inventory.available_quantity, 7)
+        stock.reserve(2, product_id='SKU-1')
+        self.assertEqual(self.product_cache.get_by_fsn('FSN-SKU-1').inventory.available_quantity, 5)
+        self.product_cache.get_by_sku('SKU-1').delete()
+        with self.assertRaises(Product.DoesNotExist):
+            self.product_cache.get_by_sku('SKU-1')
+
+    def test_invalidated_again_on_commit(self):
+        stale = self.product_cache.get_by_sku('SKU-1')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.inventory.available_quantity = 7
+                self.inventory.save()
+                # A concurrent reader caches the old committed row before the commit
+                self.product_cache.shared.set(sku_key('SKU-1'), stale)
+        self.assertEqual(self.product_cache.get_by_sku('SKU-1').inventory.available_quantity, 7)
+
+    def test_fsn_moved_to_another_product(self):
+        self.product_cache.get_by_fsn('FSN-SKU-1')
+        Product.objects.filter(sku='SKU-1').update(fsn='FSN-OLD')
+        self.product_cache.invalidate('SKU-1')
+        create_product('SKU-2', fsn='FSN-SKU-1')
+        self.assertEqual(self.product_cache.get_by_fsn('FSN-SKU-1').sku, 'SKU-2')
+
+    def test_lookup_endpoint(self):
+        response = self.client.get('/inventory/api/products/lookup/', {'fsn': 'FSN-SKU-1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['sku'], 'SKU-1')
+        self.assertEqual(response.data['inventory']['available_quantity'], 10)
+        response = self.client.get('/inventory/api/products/lookup/', {'sku': 'SKU-9'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/inventory/api/products/lookup/')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/inventory/api/products/cache-stats/')
+        self.assertEqual(response.data['misses'], 2)
+
+    def test_soap_get_inventory(self):
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:tns="flipkart.seller.inventory"><soapenv:Body><tns:get_inventory>'
+            '<tns:sku>SKU-1</tns:sku></tns:get_inventory></soapenv:Body></soapenv:Envelope>'
+        )
+        self.client.post('/inventory/soap/', envelope, content_type='text/xml')
+        with self.assertNumQueries(0):
+            response = self.client.post('/inventory/soap/', envelope, content_type='text/xml')
+        self.assertIn('Available: 10', response.content.decode())
+
+
+class ListingAvailabilityTests(TestCase):
+    """Listings follow their product's stock across the out-of-stock threshold"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.inventory = Inventory.objects.create(
+            product=create_product('SKU-1'), available_quantity=2, procurement_sla=3
+        )
+        for i, status in enumerate(('ACTIVE', 'ACTIVE', 'DELISTED')):
+            Listing.objects.create(
+                product_id='SKU-1', listing_id=f'LIST-1-{i}',
+                fulfillment_type='FBF', listing_status=status
+            )
+
+    def statuses(self, sku='SKU-1'):
+        return sorted(Listing.objects.filter(product_id=sku).values_list('listing_status', flat=True))
+
+    def test_stock_movements_flip_listings(self):
+        stock.reserve(1, product_id='SKU-1')
+        self.assertEqual(self.statuses(), ['ACTIVE', 'ACTIVE', 'DELISTED'])
+        stock.reserve(1, product_id='SKU-1')
+        self.assertEqual(self.statuses(), ['DELISTED', 'OUT_OF_STOCK', 'OUT_OF_STOCK'])
+        stock.release(1, product_id='SKU-1')
+        self.assertEqual(self.statuses(), ['ACTIVE', 'ACTIVE', 'DELISTED'])
+
+    def test_movement_within_stock_skips_listing_update(self):
+        # savepoint, guarded update, re-read, ledger INSERT, release; no listing query
+        with self.assertNumQueries(5):
+            stock.adjust(5, product_id='SKU-1')
+
+    def test_threshold_and_saves(self):
+        self.inventory.out_of_stock_threshold = 2
+        self.inventory.save()
+        self.assertEqual(self.statuses(), ['DELISTED', 'OUT_OF_STOCK', 'OUT_OF_STOCK'])
+        response = self.client.post(
+            f'/inventory/api/inventory/{self.inventory.pk}/update-stock/', {'available_quantity': 3}, format='json'
+        )
+        self.assertFalse(response.data['is_out_of_stock'])
+        self.assertEqual(self.statuses(), ['ACTIVE', 'ACTIVE', 'DELISTED'])
+
+    def test_bulk_update_flips_in_batches(self):
+        for i in range(2, 5):
+            Inventory.objects.create(product=create_product(f'SKU-{i}'), available_quantity=0, procurement_sla=3)
+            Listing.objects.create(
+                product_id=f'SKU-{i}', listing_id=f'LIST-{i}', fulfillment_type='FBF', listing_status='OUT_OF_STOCK'
+            )
+        # savepoint, pending ledger entries, locked read, stock UPDATE, ledger INSERT,
+        # one listing UPDATE per direction, release
+        with self.assertNumQueries(8):
+            result = bulk_update_stock({'SKU-1': 0, 'SKU-2': 5, 'SKU-3': 5, 'SKU-4': 0})
+        self.assertEqual((result['out_of_stock'], result['back_in_stock']), (1, 2))
+        self.assertEqual(self.statuses(), ['DELISTED', 'OUT_OF_STOCK', 'OUT_OF_STOCK'])
+        self.assertEqual(self.statuses('SKU-3'), ['ACTIVE'])
+        self.assertEqual(self.statuses('SKU-4'), ['OUT_OF_STOCK'])
+
+    def test_sync_command_reconciles(self):
+        Inventory.objects.filter(pk=self.inventory.pk).update(available_quantity=0)
+        out = StringIO()
+        call_command('sync_listing_status', stdout=out)
+        self.assertIn('Marked 2 listings out of stock', out.getvalue())
+        self.assertEqual(self.statuses(), ['DELISTED', 'OUT_OF_STOCK', 'OUT_OF_STOCK'])
+
+
+class ProductFacetTests(TestCase):
+    """Faceted product filtering backed by the maintained facet counts"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        create_product('SKU-1', brand='Acme', category='Audio', subcategory='Headphones', mrp=Decimal('499.00'))
+        create_product('SKU-2', brand='Acme', category='Audio', subcategory='Speakers', mrp=Decimal('1500.00'))
+        create_product('SKU-3', brand='Zen', category='Audio', mrp=Decimal('1500.00'), is_active=False)
+        create_product('SKU-4', brand='Zen', category='Kitchen', mrp=Decimal('60000.00'))
+
+    def get_facets(self, **params):
+        response = self.client.get('/inventory/api/products/facets/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def counts(self, data, facet):
+        return {entry['value']: entry['count'] for entry in data['facets'][facet]}
+
+    def test_list_filters(self):
+        response = self.client.get('/inventory/api/products/', {'brand': 'Acme,Zen', 'category': 'Audio'})
+        self.assertEqual([product['sku'] for product in response.data], ['SKU-1', 'SKU-2', 'SKU-3'])
+        response = self.client.get('/inventory/api/products/', {'mrp_min': '500', 'mrp_max': '2500', 'is_active': 'true'})
+        self.assertEqual([product['sku'] for product in response.data], ['SKU-2'])
+        response = self.client.get('/inventory/api/products/', {'mrp_min': 'cheap'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_facet_counts(self):
+        data = self.get_facets()
+        self.assertEqual(data['total'], 4)
+        self.assertEqual(self.counts(data, 'brand'), {'Acme': 2, 'Zen': 2})
+        self.assertEqual(self.counts(data, 'subcategory'), {'Headphones': 1, 'Speakers': 1, None: 2})
+        self.assertEqual(self.counts(data, 'is_active'), {True: 3, False: 1})
+        self.assertEqual(data['facets']['mrp'], [
+            {'min': '0.00', 'max': '500.00', 'count': 1},
+            {'min': '1000.00', 'max': '2500.00', 'count': 2},
+            {'min': '50000.00', 'max': None, 'count': 1},
+        ])
+
+    def test_each_facet_ignores_its_own_filter(self):
+        data = self.get_facets(brand='Acme', mrp_min='1000')
+        self.assertEqual(data['total'], 1)
+        self.assertEqual(self.counts(data, 'brand'), {'Acme': 1, 'Zen': 2})
+        self.assertEqual([band['count'] for band in data['facets']['mrp']], [1, 1])
+        self.assertEqual(self.counts(data, 'category'), {'Audio': 1})
+
+    def test_bounds_between_band_edges_count_products(self):
+        data = self.get_facets(mrp_min='450', mrp_max='1600')
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self.counts(data, 'brand'), {'Acme': 2, 'Zen': 1})
+
+    def test_counts_follow_product_writes(self):
+        self.assertEqual(self.get_facets()['total'], 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.get(sku='SKU-1')
+            product.brand = 'Zen'
+            product.mrp = Decimal('2000.00')
+            product.save()
+            Product.objects.get(sku='SKU-4').delete()
+            # Cached counts are replaced once the writes commit
+            self.assertEqual(self.get_facets()['total'], 4)
+        data = self.get_facets()
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self.counts(data, 'brand'), {'Zen': 2, 'Acme': 1})
+        self.assertEqual([band['count'] for band in data['facets']['mrp']], [3])
+
+    def test_active_products_are_counted_from_totals(self):
+        # total, brand, category, subcategory, is_active, mrp facets
+        with self.assertNumQueries(6):
+            data = self.get_facets(is_active='true')
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self.counts(data, 'brand'), {'Acme': 2, 'Zen': 1})
+        self.assertEqual(self.counts(data, 'is_active'), {True: 3, False: 1})
+
+    def test_incremental_counts_match_rebuild(self):
+        product = Product.objects.get(sku='SKU-3')
+        product.is_active = True
+        product.subcategory = 'Speakers'
+        product.save()
+        Product.objects.get(sku='SKU-1').delete()
+        create_product('SKU-5', brand='Acme', category='Kitchen', mrp=Decimal('5000.00'))
+        
+        def snapshot():
+            return (
+                sorted(ProductFacetCount.objects.filter(product_count__gt=0).values_list(
+                    'brand', 'category', 'subcategory', 'is_active', 'mrp_band', 'product_count')),
+                sorted(ProductFacetTotal.objects.filter(product_count__gt=0).values_list(
+                    'facet', 'value', 'is_active', 'product_count')),
+            )
+        incremental = snapshot()
+        facets.rebuild()
+        self.assertEqual(snapshot(), incremental)
+
+    def test_cached_facets_skip_the_database(self):
+        self.get_facets(category='Audio')
+        with self.assertNumQueries(0):
+            self.get_facets(category='Audio')
+
+    def test_rebuild_command(self):
+        ProductFacetCount.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_product_facets', stdout=out)
+        self.assertIn('Rebuilt 4 product facet count rows', out.getvalue())
+        self.assertEqual(sum(ProductFacetCount.objects.values_list('product_count', flat=True)), 4)
+
+
+class StockLedgerTests(TestCase):
+    """Append-only stock ledger with deferred entries and compaction"""
+
+    def setUp(self):
+        cache.clear()
+        get_product_cache().clear()
+        self.client = APIClient()
+        self.inventory = Inventory.objects.create(
+            product=create_product('SKU-1'), available_quantity=1, procurement_sla=3
+        )
+        Listing.objects.create(product_id='SKU-1', listing_id='LIST-1', fulfillment_type='FBF')
+        self.url = '/inventory/api/stock-ledger/'
+
+    def quantities(self):
+        self.inventory.refresh_from_db()
+        return self.inventory.available_quantity, self.inventory.reserved_quantity
+
+    def test_movements_are_logged_as_applied(self):
+        stock.reserve(1, reference_id='ORDER-1', product_id='SKU-1')
+        stock.adjust(4, product_id='SKU-1')
+        entries = StockLedgerEntry.objects.order_by('id')
+        self.assertEqual(
+            list(entries.values_list('reason', 'available_delta', 'reserved_delta', 'reference_id')),
+            [('RESERVE', -1, 1, 'ORDER-1'), ('ADJUST', 4, 0, '')]
+        )
+        self.assertEqual(ledger.pending_count(), 0)
+
+    def test_pending_entries_count_without_touching_inventory(self):
+        stamp = Inventory.objects.get(pk=self.inventory.pk).last_updated
+        ledger.record([{'sku': 'SKU-1', 'reason': 'RESTOCK', 'available_delta': 5}] * 2)
+        self.assertEqual(self.quantities(), (1, 0))
+        self.assertEqual(self.inventory.last_updated, stamp)
+        response = self.client.get(f'/inventory/api/inventory/{self.inventory.pk}/')
+        self.assertEqual(response.data['available_quantity'], 11)
+        self.assertEqual(get_product_cache().get_by_sku('SKU-1').inventory.current_quantity('available_quantity'), 11)
+
+    def test_product_endpoints_include_pending_entries(self):
+        self.inventory.available_quantity = 0
+        self.inventory.save()
+        response = self.client.get('/inventory/api/products/SKU-1/')
+        self.assertTrue(response.data['inventory']['is_out_of_stock'])
+        etag = response['ETag']
+        ledger.record([{'sku': 'SKU-1', 'reason': 'RESTOCK', 'available_delta': 5}])
+        # A pending entry changes the validators, so a cached copy is not reused
+        response = self.client.get('/inventory/api/products/SKU-1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['inventory']['available_quantity'], 5)
+        self.assertFalse(response.data['inventory']['is_out_of_stock'])
+        response = self.client.get('/inventory/api/products/')
+        self.assertEqual(response.data[0]['inventory']['available_quantity'], 5)
+        self.assertFalse(response.data[0]['inventory']['is_out_of_stock'])
+
+    def test_pending_stock_guards_reservations(self):
+        ledger.record([{'sku': 'SKU-1', 'reason': 'DAMAGE', 'available_delta': -1, 'damaged_delta': 1}])
+        self.assertEqual(Listing.objects.get().listing_status, 'OUT_OF_STOCK')
+        with self.assertRaises(stock.InsufficientStock) as raised:
+            stock.reserve(1, product_id='SKU-1')
+        self.assertEqual(raised.exception.current, 0)
+        ledger.record([{'sku': 'SKU-1', 'reason': 'RETURN', 'available_delta': 2}])
+        self.assertEqual(Listing.objects.get().listing_status, 'ACTIVE')
+        stock.reserve(2, product_id='SKU-1')
+        self.assertEqual(self.quantities(), (-1, 2))
+
+    def test_compaction_folds_pending_entries(self):
+        ledger.record([{'sku': 'SKU-1', 'reason': 'RESTOCK', 'available_delta': 3} for _ in range(5)])
+        out = StringIO()
+        call_command('compact_stock_ledger', '--batch-size', '2', stdout=out)
+        self.assertIn('Folded 5 stock ledger entries, 0 still pending', out.getvalue())
+        self.assertEqual(self.quantities(), (16, 0))
+        self.assertFalse(StockLedgerEntry.objects.filter(applied_at__isnull=True).exists())
+
+    def test_absolute_writes_replace_pending_entries(self):
+        ledger.record([{'sku': 'SKU-1', 'reason': 'RESTOCK', 'available_delta': 5}])
+        response = self.client.post(
+            f'/inventory/api/inventory/{self.inventory.pk}/update-stock/', {'available_quantity': 4}, format='json'
+        )
+        self.assertEqual(response.data['available_quantity'], 4)
+        entry = StockLedgerEntry.objects.latest('id')
+        self.assertEqual((entry.reason, entry.available_delta), ('SET', -2))
+        bulk_update_stock({'SKU-1': 7}, reference_id='SYNC-1')
+        entry = StockLedgerEntry.objects.latest('id')
+        self.assertEqual((entry.reason, entry.available_delta, entry.reference_id), ('SNAPSHOT', 3, 'SYNC-1'))
+        self.assertEqual(self.quantities(), (7, 0))
+
+    def test_api_appends_entries(self):
+        response = self.client.post(self.url, [
+            {'sku': 'SKU-1', 'available_delta': 2, 'reason': 'RETURN', 'reference_id': 'RET-1'},
+            {'sku': 'SKU-1', 'damaged_delta': 1, 'reason': 'DAMAGE'},
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([entry['applied_at'] for entry in response.data], [None, None])
+        response = self.client.post(self.url, {'sku': 'SKU-2', 'available_delta': 1, 'reason': 'RETURN'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(self.url, {'sku': 'SKU-1', 'reason': 'RETURN'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(self.url, {'product': 'SKU-1'})
+        self.assertEqual([entry['reason'] for entry in response.data['results']], ['DAMAGE', 'RETURN'])
+        self.assertEqual(self.client.delete(f"{self.url}{StockLedgerEntry.objects.first().pk}/").status_code, 405)
+
+
+class CatalogImportTests(TestCase):
+    """Streaming CSV and NDJSON catalog imports with checkpoints"""
+
+    HEADER = ('sku,fsn,product_name,brand,category,subcategory,mrp,hsn_code,tax_percentage,'
+              'available_quantity,procurement_sla,listing_price,selling_price,cost_price,commission_percentage')
+
+    def setUp(self):
+        cache.clear()
+        get_product_cache().clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w') as file:
+            file.write('\n'.join(lines) + '\n')
+        return path
+
+    def row(self, i, available=10, brand='Acme'):
+        return (f'SKU-{i},FSN-{i},"Product {i}, boxed",{brand},Audio,,999.00,HSN1,18.00,'
+                f'{available},2,999.00,899.00,500.00,10.00')
+
+    def run_import(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_catalog', path, '--chunk-size', '2', *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_csv_import_creates_and_updates(self):
+        path = self.write('catalog.csv', [self.HEADER] + [self.row(i) for i in range(3)])
+        out, err = self.run_import(path)
+        self.assertIn('3 created, 0 updated, 0 failed', out)
+        self.assertEqual(err, '')
+        product = Product.objects.select_related('inventory', 'price').get(sku='SKU-1')
+        self.assertEqual(product.product_name, 'Product 1, boxed')
+        self.assertIsNone(product.subcategory)
+        self.assertEqual(product.inventory.available_quantity, 10)
+        self.assertEqual(product.price.discount_percentage, Decimal('10.01'))
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+        path = self.write('update.csv', [self.HEADER, self.row(1, available=4, brand='Zen'), self.row(5)])
+        out, _ = self.run_import(path)
+        self.assertIn('1 created, 1 updated, 0 failed', out)
+        self.assertEqual(Inventory.objects.get(product_id='SKU-1').available_quantity, 4)
+        entry = StockLedgerEntry.objects.get()
+        self.assertEqual((entry.reason, entry.available_delta), ('SNAPSHOT', -6))
+        self.assertEqual(
+            dict(ProductFacetTotal.objects.filter(facet='brand').values_list('value', 'product_count')),
+            {'Acme': 3, 'Zen': 1}
+        )
+        # SKU-1's price did not change, so only the new product adds history
+        self.assertEqual(
+            sorted(PriceHistory.objects.values_list('sku', flat=True)), ['SKU-0', 'SKU-1', 'SKU-2', 'SKU-5']
+        )
+
+    def test_bad_records_are_reported_and_skipped(self):
+        other = create_product('SKU-X', fsn='FSN-TAKEN')
+        path = self.write('catalog.ndjson', [
+            json.dumps({'sku': 'SKU-1', 'fsn': 'FSN-1', 'product_name': 'One', 'brand': 'Acme',
+                        'category': 'Audio', 'mrp': '10.00', 'hsn_code': 'H', 'tax_percentage': '5.00',
+                        'available_quantity': 3, 'procurement_sla': 1, 'listing_price': '10.00',
+                        'selling_price': '9.00', 'cost_price': '5.00', 'commission_percentage': '5.00'}),
+            'not json',
+            json.dumps({'sku': 'SKU-2'}),
+            json.dumps({'sku': 'SKU-3', 'fsn': other.fsn, 'product_name': 'Three', 'brand': 'Acme',
+                        'category': 'Audio', 'mrp': '10.00', 'hsn_code': 'H', 'tax_percentage': '5.00',
+                        'available_quantity': 3, 'procurement_sla': 1, 'listing_price': '10.00',
+                        'selling_price': '9.00', 'cost_price': '5.00', 'commission_percentage': '5.00'}),
+        ])
+        out, err = self.run_import(path)
+        self.assertIn('1 created, 0 updated, 3 failed', out)
+        self.assertIn('line 2: Invalid JSON', err)
+        self.assertIn('line 3 (SKU-2):', err)
+        self.assertIn('line 4 (SKU-3):', err)
+        self.assertEqual(sorted(Product.objects.values_list('sku', flat=True)), ['SKU-1', 'SKU-X'])
+
+    def test_import_resumes_from_checkpoint(self):
+        path = self.write('catalog.csv', [self.HEADER] + [self.row(i) for i in range(5)])
+        with open(path, 'rb') as file:
+            lines = file.readlines()
+        stat = os.stat(path)
+        with open(f'{path}.checkpoint', 'w') as file:
+            json.dump({
+                'file': {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns},
+                'state': {'offset': sum(map(len, lines[:3])), 'line': 3, 'created': 2, 'updated': 0, 'failed': 0},
+            }, file)
+        out, _ = self.run_import(path)
+        self.assertIn('Resuming', out)
+        self.assertIn('5 created, 0 updated, 0 failed', out)
+        self.assertEqual(sorted(Product.objects.values_list('sku', flat=True)), ['SKU-2', 'SKU-3', 'SKU-4'])
+
+        with open(f'{path}.checkpoint', 'w') as file:
+            json.dump({'file': {'path': path, 'size': 1, 'mtime_ns': 0}, 'state': {}}, file)
+        with self.assertRaises(CommandError):
+            self.run_import(path)
+        self.run_import(path, '--restart')
+        self.assertEqual(Product.objects.count(), 5)
+
+
+class FlipkartSyncTests(TestCase):
+    """Pushing stock and prices to the marketplace through the pooled, rate-limited client"""
+
+    def setUp(self):
+        cache.clear()
+        self.stub = StubServer(seed=1).start()
+        self.addCleanup(self.stub.stop)
+        self.config = {
+            'BASE_URL': self.stub.url, 'API_KEY': 'stub-key', 'API_SECRET': 'stub-secret', 'TIMEOUT': 5,
+            'RATE_LIMIT': 1000, 'BURST': 50, 'WORKERS': 3, 'POOL_SIZE': 3, 'BACKOFF': 0.001, 'LOCATION_ID': 'LOC1',
+        }
+        for i in range(25):
+            Inventory.objects.create(product=create_product(f'SKU-{i:02d}'), available_quantity=i, procurement_sla=2)
+
+    def push(self, *args, **config):
+        flipkart._client = None
+        self.addCleanup(setattr, flipkart, '_client', None)
+        out = StringIO()
+        with override_settings(FLIPKART_API_CONFIG={**self.config, **config}):
+            call_command('push_flipkart_listings', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def test_token_bucket_waits_for_refill(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        bucket = flipkart.TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        self.assertEqual([bucket.acquire() for _ in range(4)], [0, 0, 0.5, 0.5])
+        self.assertEqual(now[0], 1.0)
+
+    def test_push_inventory_in_batches_over_pooled_connections(self):
+        ledger.record([{'sku': 'SKU-03', 'reason': 'RETURN', 'available_delta': 2}])
+        out = self.push('--inventory')
+        self.assertIn('inventory: 25 of 25 SKUs updated in 3 requests', out)
+        self.assertEqual(self.stub.inventory['SKU-03'], {
+            'product_id': 'FSN-SKU-03', 'locations': [{'id': 'LOC1', 'inventory': 5}]
+        })
+        self.assertEqual(self.stub.stats['token_requests'], 1)
+        self.assertLessEqual(len(self.stub.connections), 3)
+
+    def test_push_prices(self):
+        from pricing.models import Price
+        Price.objects.create(
+            product_id='SKU-01', listing_price=Decimal('1000.00'), selling_price=Decimal('899.00'),
+            cost_price=Decimal('500.00'), commission_percentage=Decimal('10.00')
+        )
+        self.assertIn('prices: 1 of 1 SKUs updated', self.push('--prices'))
+        self.assertEqual(self.stub.prices['SKU-01']['price'], {
+            'mrp': '1000.00', 'selling_price': '899.00', 'currency': 'INR'
+        })
+
+    def test_failures_and_throttling_are_retried(self):
+        self.stub.failure_rate = 0.3
+        self.stub.bucket = flipkart.TokenBucket(rate=200, capacity=1)
+        out = self.push('--inventory', '--sku', 'SKU-01', '--sku', 'SKU-02', BATCH_SIZE=1, MAX_RETRIES=20)
+        self.assertIn('inventory: 2 of 2 SKUs updated', out)
+        self.assertEqual(set(self.stub.inventory), {'SKU-01', 'SKU-02'})
+        self.assertGreater(self.stub.stats['failed'] + self.stub.stats['throttled'], 0)
+
+    def test_rejected_token_is_fetched_again(self):
+        self.push('--inventory', '--sku', 'SKU-01')
+        self.stub.expire_tokens()
+        self.assertIn('1 of 1 SKUs updated', self.push('--inventory', '--sku', 'SKU-01'))
+        self.assertEqual(self.stub.stats['token_requests'], 2)
+        self.assertEqual(self.stub.stats['unauthorized'], 1)
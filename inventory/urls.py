@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, InventoryViewSet, ListingViewSet
+from .views import ProductViewSet, InventoryViewSet, ListingViewSet, StockLedgerEntryViewSet
 from .soap_views import inventory_soap_application
 
 # REST API Router
@@ -8,6 +8,7 @@ router = DefaultRouter()
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r'inventory', InventoryViewSet, basename='inventory')
 router.register(r'listings', ListingViewSet, basename='listing')
+router.register(r'stock-ledger', StockLedgerEntryViewSet, basename='stock-ledger')
 
 urlpatterns = [
     # REST API endpoints
@@ -1,25 +1,54 @@
-from rest_framework import viewsets, status
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import Http404
+from rest_framework import mixins, viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from .models import Product, Inventory, Listing
-from .serializers import ProductSerializer, InventorySerializer, ListingSerializer
+from flipkart_seller_center.conditional import ConditionalGetMixin
+from flipkart_seller_center.filters import FieldFilterBackend
+from flipkart_seller_center.idempotency import IdempotencyMixin
+from .models import Product, Inventory, Listing, StockLedgerEntry
+from .serializers import (
+    ProductSerializer, ProductLookupSerializer, InventorySerializer, ListingSerializer,
+    StockMovementSerializer, StockAdjustmentSerializer, BulkStockSerializer, StockLedgerEntrySerializer
+)
+from .bulk import bulk_update_stock, normalize_level
+from .facets import facet_counts
+from . import cache, ledger, stock
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Products API
     
     Endpoints:
-    - GET /api/products/ - List all products
+    - GET /api/products/ - List all products (filters: brand, category, subcategory, is_active, mrp_min, mrp_max)
+    - GET /api/products/facets/ - Product counts per brand, category, subcategory, status and MRP band
     - POST /api/products/ - Create a new product
     - GET /api/products/{sku}/ - Get product details
     - PUT /api/products/{sku}/ - Update product
     - DELETE /api/products/{sku}/ - Delete product
     - POST /api/products/{sku}/activate/ - Activate a product
     - POST /api/products/{sku}/deactivate/ - Deactivate a product
+    - GET /api/products/lookup/?sku=...|fsn=... - Cached lookup by SKU or FSN
+    - GET /api/products/cache-stats/ - Product cache hit and miss counters
+    
+    Stock levels include pending stock ledger entries.
     """
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    conditional_validators = {
+        'retrieve': ['updated_at', 'inventory__last_updated', 'listings__updated_at', 'stock_ledger__created_at'],
+    }
+    filter_fields = ['brand', 'category', 'subcategory', 'is_active']
+    range_fields = ['mrp']
+    
+    def get_queryset(self):
+        # Prefetched rather than joined, so the inventory rows carry their pending totals
+        inventories = Inventory.objects.annotate(**ledger.pending_annotations())
+        return super().get_queryset().prefetch_related(Prefetch('inventory', queryset=inventories), 'listings')
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
@@ -36,9 +65,33 @@ class ProductViewSet(viewsets.ModelViewSet):
         product.is_active = False
         product.save()
         return Response({'message': f'Product {product.sku} deactivated successfully'})
+    
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        """Facet counts for the products matching the list filters, each facet ignoring its own filter"""
+        filters = FieldFilterBackend().get_filters(request, Product, self)
+        return Response(facet_counts(filters))
+    
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """Look up a product by SKU or FSN through the product cache"""
+        sku = request.query_params.get('sku')
+        fsn = request.query_params.get('fsn')
+        if not sku and not fsn:
+            return Response({'error': 'sku or fsn is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            product = cache.get_product(sku=sku or None, fsn=fsn or None)
+        except Product.DoesNotExist:
+            return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ProductLookupSerializer(product).data)
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """Hit and miss counters of this worker's product cache"""
+        return Response(cache.get_product_cache().stats())
 
 
-class InventoryViewSet(viewsets.ModelViewSet):
+class InventoryViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Inventory API
     
@@ -47,33 +100,138 @@ class InventoryViewSet(viewsets.ModelViewSet):
     - POST /api/inventory/ - Create inventory record
     - GET /api/inventory/{id}/ - Get inventory details
     - PUT /api/inventory/{id}/ - Update inventory
-    - POST /api/inventory/{id}/update-stock/ - Update stock levels
+    - POST /api/inventory/{id}/update-stock/ - Overwrite stock levels
+    - POST /api/inventory/{id}/reserve/ - Move available stock to reserved
+    - POST /api/inventory/{id}/release/ - Return reserved stock to available
+    - POST /api/inventory/{id}/commit/ - Remove reserved stock that has shipped
+    - POST /api/inventory/{id}/adjust/ - Add to (or remove from) available stock
+    - POST /api/inventory/bulk-update-stock/ - Apply a stock snapshot for many SKUs
+    
+    Stock levels include pending stock ledger entries.
     """
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
+    conditional_validators = {'retrieve': ['last_updated', 'product__stock_ledger__created_at']}
     
-    @action(detail=True, methods=['post'])
+    def get_queryset(self):
+        return super().get_queryset().annotate(**ledger.pending_annotations())
+    
+    def perform_update(self, serializer):
+        # Fold pending entries in first so the written levels replace them
+        with transaction.atomic():
+            inventory = Inventory.objects.select_for_update().get(pk=serializer.instance.pk)
+            ledger.compact([inventory.product_id])
+            inventory.refresh_from_db()
+            before = {field: getattr(inventory, field) for field in ledger.DELTA_FIELDS}
+            serializer.instance = inventory
+            serializer.save()
+            ledger.log(inventory.product_id, {
+                field: getattr(inventory, field) - quantity for field, quantity in before.items()
+            }, 'CORRECTION')
+    
+    @action(detail=True, methods=['post'], url_path='update-stock')
     def update_stock(self, request, pk=None):
-        """Update stock levels"""
+        """Overwrite stock levels"""
         inventory = self.get_object()
-        available = request.data.get('available_quantity')
-        reserved = request.data.get('reserved_quantity')
-        damaged = request.data.get('damaged_quantity')
-        
-        if available is not None:
-            inventory.available_quantity = available
-        if reserved is not None:
-            inventory.reserved_quantity = reserved
-        if damaged is not None:
-            inventory.damaged_quantity = damaged
+        levels = {
+            field: request.data[field] for field in ('available_quantity', 'reserved_quantity', 'damaged_quantity')
+            if request.data.get(field) is not None
+        }
+        try:
+            levels = normalize_level(levels)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        inventory.save()
+        # Only write the given columns so concurrent reservations of the
+        # others are not overwritten
+        inventory = stock.set_levels(levels, pk=inventory.pk)
         
         serializer = self.get_serializer(inventory)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['post'])
+    def reserve(self, request, pk=None):
+        """Reserve stock for an order"""
+        return self._move_stock(request, pk, stock.reserve, StockMovementSerializer)
+    
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        """Release reserved stock back to available"""
+        return self._move_stock(request, pk, stock.release, StockMovementSerializer)
+    
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        """Remove reserved stock that has shipped"""
+        return self._move_stock(request, pk, stock.commit, StockMovementSerializer)
+    
+    @action(detail=True, methods=['post'])
+    def adjust(self, request, pk=None):
+        """Add to or remove from available stock"""
+        return self._move_stock(request, pk, stock.adjust, StockAdjustmentSerializer)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-update-stock')
+    def bulk_update_stock(self, request):
+        """Apply absolute stock levels to many SKUs, skipping unchanged rows"""
+        serializer = BulkStockSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        return Response(bulk_update_stock(
+            params['stock'], include_changes=params['include_changes'], reference_id=params['reference_id']
+        ))
+    
+    def _move_stock(self, request, pk, movement, serializer_class):
+        serializer = serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            pk = Inventory._meta.pk.to_python(pk)
+            inventory = movement(serializer.validated_data['quantity'], pk=pk)
+        except (Inventory.DoesNotExist, DjangoValidationError):
+            raise Http404
+        except stock.InsufficientStock as exc:
+            return Response(
+                {'error': str(exc), exc.field: exc.current}, status=status.HTTP_409_CONFLICT
+            )
+        return Response(InventorySerializer(inventory).data)
+
+
+class StockLedgerPagination(CursorPagination):
+    page_size = 100
+    ordering = '-id'
+
+
+class StockLedgerEntryViewSet(IdempotencyMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
+                              mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    ViewSet for the append-only stock ledger
+    
+    Endpoints:
+    - GET /api/stock-ledger/ - List entries, newest first (filters: product, created_at_after, created_at_before)
+    - POST /api/stock-ledger/ - Record one entry or a list of entries as pending stock changes
+    - GET /api/stock-ledger/{id}/ - Get entry details
+    """
+    queryset = StockLedgerEntry.objects.all()
+    serializer_class = StockLedgerEntrySerializer
+    pagination_class = StockLedgerPagination
+    filter_fields = ['product']
+    date_range_fields = ['created_at']
+    
+    def create(self, request, *args, **kwargs):
+        many = isinstance(request.data, list)
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+        entries = serializer.validated_data if many else [serializer.validated_data]
+        try:
+            created = ledger.record([
+                {**{name: value for name, value in entry.items() if name != 'product_id'}, 'sku': entry['product_id']}
+                for entry in entries
+            ])
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(created, many=True).data
+        return Response(data if many else data[0], status=status.HTTP_201_CREATED)
 
 
-class ListingViewSet(viewsets.ModelViewSet):
+class ListingViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Listings API
     
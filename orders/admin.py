@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem, OrderCancellation
+from .models import Order, OrderItem, OrderCancellation, OrderDailyStatus
 
 
 @admin.register(Order)
@@ -24,3 +24,10 @@ class OrderCancellationAdmin(admin.ModelAdmin):
     list_filter = ['cancelled_by', 'cancellation_date']
     search_fields = ['cancellation_id', 'order__order_id', 'reason']
     date_hierarchy = 'cancellation_date'
+
+
+@admin.register(OrderDailyStatus)
+class OrderDailyStatusAdmin(admin.ModelAdmin):
+    list_display = ['day', 'status', 'order_count', 'total_amount']
+    list_filter = ['status']
+    date_hierarchy = 'day'
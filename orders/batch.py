@@ -0,0 +1,115 @@
+"""
+Batch order state transitions.
+
+Each batch runs in one transaction: the requested orders are read once,
+the eligible ones are moved with a single guarded UPDATE per chunk (see
+``order_status_machine``), and cancellations are inserted with
+``bulk_create``. Orders that are missing or not in a state that allows the
+transition are reported as skipped.
+"""
+from django.db import transaction
+
+from .models import Order, OrderCancellation, order_status_machine
+
+# Keeps every IN (...) list well under the database parameter limit
+CHUNK_SIZE = 500
+
+
+def batch_dispatch(order_ids):
+    """Mark every dispatchable order in ``order_ids`` as ready to dispatch"""
+    order_ids = _unique(order_ids)
+    with transaction.atomic():
+        orders = _lock_orders(order_ids)
+        eligible, skipped = _partition(order_ids, orders, 'READY_TO_DISPATCH')
+        eligible = _transition(eligible, 'READY_TO_DISPATCH', skipped)
+    return {'updated': eligible, 'skipped': skipped}
+
+
+def batch_cancel(order_ids, reason='', cancelled_by='SELLER'):
+    """Cancel every cancellable order in ``order_ids``, refunding the order total"""
+    order_ids = _unique(order_ids)
+    with transaction.atomic():
+        orders = _lock_orders(order_ids)
+        eligible, skipped = _partition(order_ids, orders, 'CANCELLED')
+
+        # An order cancelled before and then moved back must not collide
+        # with its earlier cancellation record
+        cancellation_ids = {f"CANC-{order_id}": order_id for order_id in eligible}
+        already_cancelled = set()
+        for chunk in _chunks(list(cancellation_ids)):
+            already_cancelled.update(
+                cancellation_ids[cancellation_id] for cancellation_id in
+                OrderCancellation.objects.filter(cancellation_id__in=chunk)
+                .values_list('cancellation_id', flat=True)
+            )
+        if already_cancelled:
+            skipped.extend(
+                {'order_id': order_id, 'reason': 'Cancellation already exists'}
+                for order_id in eligible if order_id in already_cancelled
+            )
+            eligible = [order_id for order_id in eligible if order_id not in already_cancelled]
+
+        eligible = _transition(eligible, 'CANCELLED', skipped)
+        OrderCancellation.objects.bulk_create([
+            OrderCancellation(
+                order_id=order_id,
+                cancellation_id=f"CANC-{order_id}",
+                reason=reason,
+                cancelled_by=cancelled_by,
+                refund_amount=orders[order_id][1]
+            )
+            for order_id in eligible
+        ], batch_size=CHUNK_SIZE)
+    return {'updated': eligible, 'skipped': skipped}
+
+
+def _lock_orders(order_ids):
+    """Return ``{order_id: (status, total_amount)}``, locking the rows where supported"""
+    orders = {}
+    for chunk in _chunks(order_ids):
+        rows = (
+            Order.objects.select_for_update()
+            .filter(order_id__in=chunk)
+            .values_list('order_id', 'status', 'total_amount')
+        )
+        for order_id, status, total_amount in rows:
+            orders[order_id] = (status, total_amount)
+    return orders
+
+
+def _partition(order_ids, orders, target):
+    eligible, skipped = [], []
+    for order_id in order_ids:
+        if order_id not in orders:
+            skipped.append({'order_id': order_id, 'reason': 'Order not found'})
+        elif not order_status_machine.can_transition(orders[order_id][0], target):
+            skipped.append({'order_id': order_id, 'reason': f'Order is {orders[order_id][0]}'})
+        else:
+            eligible.append(order_id)
+    return eligible, skipped
+
+
+def _transition(order_ids, target, skipped):
+    """Apply the guarded UPDATE, returning the IDs that actually moved"""
+    moved = set()
+    for chunk in _chunks(order_ids):
+        moved.update(order_status_machine.transition_many(chunk, target))
+    if len(moved) == len(order_ids):
+        return order_ids
+
+    # Databases without row locks let a concurrent writer move some orders
+    # between the read and the UPDATE; the guard left those untouched
+    skipped.extend(
+        {'order_id': order_id, 'reason': 'Order changed concurrently'}
+        for order_id in order_ids if order_id not in moved
+    )
+    return [order_id for order_id in order_ids if order_id in moved]
+
+
+def _unique(order_ids):
+    return list(dict.fromkeys(order_ids))
+
+
+def _chunks(values):
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
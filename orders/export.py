@@ -0,0 +1,94 @@
+"""
+Streaming export of orders joined with their items.
+
+Rows are read with a server-side ``iterator(chunk_size=...)`` over a single
+LEFT JOIN of orders and items and written to the response as they arrive,
+so memory stays flat no matter how many orders are exported.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+ORDER_COLUMNS = [
+    'order_id', 'order_date', 'status', 'customer_name', 'customer_email',
+    'customer_phone', 'shipping_address', 'billing_address', 'total_amount',
+    'payment_method', 'created_at', 'updated_at',
+]
+
+ITEM_COLUMNS = ['sku', 'product_name', 'quantity', 'unit_price', 'total_price', 'hsn_code']
+
+# Lines are grouped into blocks of about this many characters so the
+# server writes a few large chunks instead of one per line
+BLOCK_SIZE = 64 * 1024
+
+
+class Echo:
+    """File-like object that hands each written line straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Yield one tuple per order item (order columns followed by item
+    columns). Orders without items yield a single row with empty item
+    columns.
+    """
+    lookups = ORDER_COLUMNS + [f'items__{column}' for column in ITEM_COLUMNS]
+    return (
+        queryset
+        .order_by('-order_date', '-order_id', 'items__id')
+        .values_list(*lookups)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def stream_csv(rows):
+    """Yield CSV text: a header, then one line per order item"""
+    return _blocks(_csv_lines(rows))
+
+
+def stream_ndjson(rows):
+    """Yield NDJSON text: one line per order with its items nested"""
+    return _blocks(_ndjson_lines(rows))
+
+
+def _csv_lines(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(ORDER_COLUMNS + [f'item_{column}' for column in ITEM_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(rows):
+    order_width = len(ORDER_COLUMNS)
+    current = None
+    for row in rows:
+        if current is None or row[0] != current['order_id']:
+            if current is not None:
+                yield _json_line(current)
+            current = dict(zip(ORDER_COLUMNS, row[:order_width]))
+            current['items'] = []
+        item = row[order_width:]
+        if item[0] is not None:
+            current['items'].append(dict(zip(ITEM_COLUMNS, item)))
+    if current is not None:
+        yield _json_line(current)
+
+
+def _json_line(order):
+    return json.dumps(order, cls=DjangoJSONEncoder) + '\n'
+
+
+def _blocks(lines):
+    block, size = [], 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
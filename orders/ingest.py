@@ -0,0 +1,119 @@
+"""
+Bulk order ingestion.
+
+Records are validated one by one, then written in chunks with
+``bulk_create`` so that a feed of tens of thousands of orders costs a
+handful of INSERTs per chunk instead of several queries per order.
+"""
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Order, OrderItem
+from .serializers import OrderIngestSerializer
+from .rollups import record_created
+from .search import get_search_backend
+
+
+def ingest_orders(records, chunk_size=500):
+    """
+    Create orders and their items from an iterable of
+    ``(line_number, record, error)`` tuples.
+
+    Returns one result dict per record, in input order. A bad record is
+    reported and skipped; it never stops the rest of the feed.
+    """
+    results = []
+    chunk = []
+    # One serializer validates every record; building the ModelSerializer
+    # fields dominates the cost of validating a single record
+    validator = OrderIngestSerializer()
+    for line_number, record, error in records:
+        if error:
+            results.append(_failed(line_number, None, error))
+            continue
+        try:
+            validated_data = validator.run_validation(record)
+        except ValidationError as exc:
+            results.append(_failed(line_number, record.get('order_id'), exc.detail))
+            continue
+        chunk.append((line_number, validated_data))
+        if len(chunk) >= chunk_size:
+            results.extend(_write_chunk(chunk))
+            chunk = []
+    if chunk:
+        results.extend(_write_chunk(chunk))
+    results.sort(key=lambda result: result['line'])
+    return results
+
+
+def _write_chunk(chunk):
+    """Insert one chunk of validated orders, reporting a result for each"""
+    results = []
+    order_ids = [data['order_id'] for _, data in chunk]
+    existing = set(
+        Order.objects.filter(order_id__in=order_ids).values_list('order_id', flat=True)
+    )
+
+    pending = []
+    seen = set()
+    for line_number, data in chunk:
+        order_id = data['order_id']
+        if order_id in existing:
+            results.append(_failed(line_number, order_id, 'Order already exists'))
+        elif order_id in seen:
+            results.append(_failed(line_number, order_id, 'Duplicate order_id in request'))
+        else:
+            seen.add(order_id)
+            pending.append((line_number, data))
+
+    try:
+        with transaction.atomic():
+            orders, items = [], []
+            for _, data in pending:
+                order, order_items = _build_order(data)
+                orders.append(order)
+                items.extend(order_items)
+            Order.objects.bulk_create(orders)
+            OrderItem.objects.bulk_create(items)
+            # bulk_create skips post_save, so index and count the chunk directly
+            get_search_backend().update(orders)
+            record_created(orders)
+    except IntegrityError:
+        # Something slipped past the pre-checks (e.g. a concurrent writer),
+        # retry record by record so only the offending orders fail
+        results.extend(_write_one_by_one(pending))
+    else:
+        results.extend(_created(line_number, data['order_id']) for line_number, data in pending)
+    return results
+
+
+def _write_one_by_one(pending):
+    results = []
+    for line_number, data in pending:
+        try:
+            with transaction.atomic():
+                order, order_items = _build_order(data)
+                Order.objects.bulk_create([order])
+                OrderItem.objects.bulk_create(order_items)
+                get_search_backend().update([order])
+                record_created([order])
+        except IntegrityError as exc:
+            results.append(_failed(line_number, data['order_id'], str(exc)))
+        else:
+            results.append(_created(line_number, data['order_id']))
+    return results
+
+
+def _build_order(data):
+    data = dict(data)
+    items = data.pop('items', [])
+    order = Order(**data)
+    return order, [OrderItem(order=order, **item) for item in items]
+
+
+def _created(line_number, order_id):
+    return {'line': line_number, 'order_id': order_id, 'status': 'created'}
+
+
+def _failed(line_number, order_id, errors):
+    return {'line': line_number, 'order_id': order_id, 'status': 'failed', 'errors': errors}
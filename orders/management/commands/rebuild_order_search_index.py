@@ -0,0 +1,36 @@
+"""
+Management command to rebuild the order search index from the orders table.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from orders.models import Order
+from orders.search import get_search_backend, SEARCH_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the order full-text search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Orders indexed per batch')
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        chunk_size = options['chunk_size']
+        orders = Order.objects.only('order_id', *SEARCH_FIELDS).order_by().iterator(chunk_size=chunk_size)
+        
+        count = 0
+        with transaction.atomic():
+            backend.clear()
+            batch = []
+            for order in orders:
+                batch.append(order)
+                if len(batch) >= chunk_size:
+                    backend.update(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                backend.update(batch)
+                count += len(batch)
+        
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} orders'))
@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the daily order status rollup from the orders table.
+"""
+from django.core.management.base import BaseCommand
+
+from orders.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per day, per status order counts served by /api/orders/stats/'
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} daily order status rows'))
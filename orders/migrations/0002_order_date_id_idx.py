@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 14:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['-order_date', '-order_id'], name='order_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-18 15:02
+
+from django.db import migrations
+
+from orders.search import CREATE_FTS_TABLE_SQL, FTS_TABLE, SEARCH_FIELDS, fts_rowid
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_FTS_TABLE_SQL)
+
+    Order = apps.get_model('orders', 'Order')
+    placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 2))
+    insert_sql = (
+        f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, order_id, {', '.join(SEARCH_FIELDS)}) "
+        f"VALUES ({placeholders})"
+    )
+    rows = Order.objects.values_list('order_id', *SEARCH_FIELDS).iterator(chunk_size=2000)
+    batch = []
+    with schema_editor.connection.cursor() as cursor:
+        for order_id, *values in rows:
+            batch.append((fts_rowid(order_id), order_id, *(value or '' for value in values)))
+            if len(batch) >= 2000:
+                cursor.executemany(insert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_date_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
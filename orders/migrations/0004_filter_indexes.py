@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_order_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', '-order_date', '-order_id'], name='order_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['sku', 'order'], name='orderitem_sku_order_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0 on 2026-10-18 15:04
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_status(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    OrderDailyStatus = apps.get_model('orders', 'OrderDailyStatus')
+    rows = (
+        Order.objects
+        .annotate(day=TruncDate('order_date'))
+        .values('day', 'status')
+        .annotate(order_count=Count('pk'), amount=Sum('total_amount'))
+        .order_by()
+    )
+    OrderDailyStatus.objects.bulk_create(
+        OrderDailyStatus(
+            day=row['day'], status=row['status'],
+            order_count=row['order_count'], total_amount=row['amount']
+        )
+        for row in rows
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderDailyStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('APPROVED', 'Approved'), ('PACKED', 'Packed'), ('READY_TO_DISPATCH', 'Ready to Dispatch'), ('SHIPPED', 'Shipped'), ('DELIVERED', 'Delivered'), ('CANCELLED', 'Cancelled'), ('RETURNED', 'Returned')], max_length=50)),
+                ('order_count', models.IntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'verbose_name_plural': 'order daily statuses',
+                'ordering': ['-day', 'status'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'status'), name='order_daily_status_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_status, migrations.RunPython.noop),
+    ]
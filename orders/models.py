@@ -1,4 +1,5 @@
 from django.db import models
+from flipkart_seller_center.state_machine import StateMachine
 
 
 class Order(models.Model):
@@ -13,6 +14,16 @@ class Order(models.Model):
         ('RETURNED', 'Returned'),
     ]
     
+    # Target status -> statuses it may be reached from
+    STATUS_TRANSITIONS = {
+        'PACKED': ['APPROVED'],
+        'READY_TO_DISPATCH': ['APPROVED', 'PACKED'],
+        'SHIPPED': ['READY_TO_DISPATCH'],
+        'DELIVERED': ['SHIPPED'],
+        'CANCELLED': ['APPROVED', 'PACKED', 'READY_TO_DISPATCH'],
+        'RETURNED': ['SHIPPED', 'DELIVERED'],
+    }
+    
     order_id = models.CharField(max_length=100, unique=True, primary_key=True)
     order_date = models.DateTimeField()
     status = models.CharField(max_length=50, choices=STATUS_CHOICES)
@@ -28,11 +39,20 @@ class Order(models.Model):
     
     class Meta:
         ordering = ['-order_date']
+        indexes = [
+            # Keyset pagination walks orders by (order_date, order_id)
+            models.Index(fields=['-order_date', '-order_id'], name='order_date_id_idx'),
+            # ?status= filtering, in list order
+            models.Index(fields=['status', '-order_date', '-order_id'], name='order_status_date_idx'),
+        ]
         
     def __str__(self):
         return f"Order {self.order_id}"
 
 
+order_status_machine = StateMachine(Order, Order.STATUS_TRANSITIONS)
+
+
 class OrderItem(models.Model):
     """Model for Order Items"""
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
@@ -45,6 +65,9 @@ class OrderItem(models.Model):
     
     class Meta:
         ordering = ['order', 'sku']
+        indexes = [
+            models.Index(fields=['sku', 'order'], name='orderitem_sku_order_idx'),
+        ]
         
     def __str__(self):
         return f"{self.product_name} (x{self.quantity})"
@@ -61,3 +84,21 @@ class OrderCancellation(models.Model):
     
     def __str__(self):
         return f"Cancellation {self.cancellation_id} for Order {self.order.order_id}"
+
+
+class OrderDailyStatus(models.Model):
+    """Rollup of order counts and amounts per order day and status"""
+    day = models.DateField()
+    status = models.CharField(max_length=50, choices=Order.STATUS_CHOICES)
+    order_count = models.IntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-day', 'status']
+        verbose_name_plural = 'order daily statuses'
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'status'], name='order_daily_status_uniq'),
+        ]
+        
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.order_count}"
@@ -0,0 +1,125 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+ORDERING = ('-order_date', '-order_id')
+
+
+def encode_cursor_token(order):
+    """Opaque cursor pointing just past ``order``"""
+    data = json.dumps(
+        {'d': order.order_date.isoformat(), 'k': order.order_id},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor_token(token):
+    """(order_date, order_id) of a cursor; raises ValueError when it is malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        order_date = parse_datetime(data['d'])
+        order_id = data['k']
+    except (TypeError, ValueError, KeyError, UnicodeError):
+        raise ValueError('Invalid cursor')
+    if order_date is None or not isinstance(order_id, str):
+        raise ValueError('Invalid cursor')
+    return order_date, order_id
+
+
+def order_page(queryset, cursor, page_size):
+    """
+    One page of ``queryset`` in (order_date, order_id) descending order,
+    starting after ``cursor`` (a decoded cursor or None). Returns the page
+    and whether a next page exists.
+    """
+    queryset = queryset.order_by(*ORDERING)
+    if cursor is not None:
+        order_date, order_id = cursor
+        queryset = queryset.filter(
+            Q(order_date__lt=order_date) |
+            Q(order_date=order_date, order_id__lt=order_id)
+        )
+    # Fetch one extra row to find out whether a next page exists
+    results = list(queryset[:page_size + 1])
+    return results[:page_size], len(results) > page_size
+
+
+class OrderCursorPagination(BasePagination):
+    """
+    Keyset pagination for orders, newest first.
+
+    Pages are ordered by (order_date, order_id) descending and the cursor
+    carries the key of the last row served, so every page is a single
+    indexed range scan with no OFFSET and no COUNT(*).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ORDERING
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        config = getattr(settings, 'ORDERS_API_CONFIG', {})
+        self.page_size = config.get('PAGE_SIZE', 50)
+        self.max_page_size = config.get('MAX_PAGE_SIZE', 500)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        self.page, self.has_next = order_page(queryset, self.decode_cursor(request), page_size)
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            return decode_cursor_token(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, order):
+        return replace_query_param(self.base_url, self.cursor_query_param, encode_cursor_token(order))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1])
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {
+                    'type': 'string',
+                    'nullable': True,
+                    'format': 'uri',
+                },
+                'results': schema,
+            },
+        }
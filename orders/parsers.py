@@ -0,0 +1,35 @@
+import json
+
+from django.conf import settings
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON.
+
+    The body is not buffered: ``request.data`` is a generator that reads the
+    stream one line at a time and yields ``(line_number, record, error)``
+    tuples, so a malformed line is reported without aborting the rest.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        return self.iter_records(stream, encoding)
+
+    def iter_records(self, stream, encoding):
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line.decode(encoding))
+            except (UnicodeDecodeError, ValueError) as exc:
+                yield line_number, None, f'Invalid JSON: {exc}'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, 'Expected a JSON object'
+                continue
+            yield line_number, record, None
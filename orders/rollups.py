@@ -0,0 +1,133 @@
+"""
+Order counts and ``total_amount`` sums per (order day, status).
+
+``OrderDailyStatus`` is kept up to date incrementally as orders change,
+so dashboards read a handful of rows instead of grouping the orders table:
+
+- ``save()`` and ``delete()`` go through the signal handlers in
+  ``orders.signals``
+- bulk ingest calls ``record_created`` for every chunk it inserts
+- state machine transitions, single and batched, arrive through
+  ``status_transitioned``
+
+Days are calendar days in the current time zone. ``rebuild`` recomputes
+the whole table from the orders table, see the
+``rebuild_order_stats`` management command.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Order, OrderDailyStatus
+
+
+def order_day(order_date):
+    """Rollup day of an order date"""
+    if timezone.is_aware(order_date):
+        return timezone.localdate(order_date)
+    return order_date.date()
+
+
+def order_key(order):
+    """(day, status, amount) that ``order`` contributes to the rollup"""
+    order_date = Order._meta.get_field('order_date').to_python(order.order_date)
+    amount = Order._meta.get_field('total_amount').to_python(order.total_amount)
+    return order_day(order_date), order.status, amount
+
+
+def record_created(orders):
+    """Count newly inserted orders"""
+    deltas = _deltas()
+    for order in orders:
+        day, status, amount = order_key(order)
+        _add(deltas, day, status, 1, amount)
+    apply_deltas(deltas)
+
+
+def record_deleted(orders):
+    """Stop counting deleted orders"""
+    deltas = _deltas()
+    for order in orders:
+        day, status, amount = order_key(order)
+        _add(deltas, day, status, -1, -amount)
+    apply_deltas(deltas)
+
+
+def record_changed(previous, current):
+    """Move an order from one (day, status, amount) key to another"""
+    if previous == current:
+        return
+    deltas = _deltas()
+    _add(deltas, previous[0], previous[1], -1, -previous[2])
+    _add(deltas, current[0], current[1], 1, current[2])
+    apply_deltas(deltas)
+
+
+def record_transitioned(pks, previous, target):
+    """Move orders that the state machine took from ``previous`` to ``target``"""
+    deltas = _deltas()
+    rows = (
+        Order.objects.filter(pk__in=pks)
+        .annotate(day=TruncDate('order_date'))
+        .values('day')
+        .annotate(order_count=Count('pk'), amount=Sum('total_amount'))
+        .order_by()
+    )
+    for row in rows:
+        _add(deltas, row['day'], previous, -row['order_count'], -row['amount'])
+        _add(deltas, row['day'], target, row['order_count'], row['amount'])
+    apply_deltas(deltas)
+
+
+def apply_deltas(deltas):
+    """Add ``{(day, status): [count, amount]}`` to the rollup rows"""
+    for (day, status), (count, amount) in sorted(deltas.items()):
+        if not count and not amount:
+            continue
+        changes = {
+            'order_count': F('order_count') + count,
+            'total_amount': F('total_amount') + amount,
+        }
+        if OrderDailyStatus.objects.filter(day=day, status=status).update(**changes):
+            continue
+        try:
+            with transaction.atomic():
+                OrderDailyStatus.objects.create(day=day, status=status, order_count=count, total_amount=amount)
+        except IntegrityError:
+            # Another writer created the row first
+            OrderDailyStatus.objects.filter(day=day, status=status).update(**changes)
+
+
+def rebuild():
+    """Recompute every rollup row from the orders table; returns the number of rows"""
+    rows = (
+        Order.objects
+        .annotate(day=TruncDate('order_date'))
+        .values('day', 'status')
+        .annotate(order_count=Count('pk'), amount=Sum('total_amount'))
+        .order_by()
+    )
+    with transaction.atomic():
+        OrderDailyStatus.objects.all().delete()
+        created = OrderDailyStatus.objects.bulk_create(
+            OrderDailyStatus(
+                day=row['day'], status=row['status'],
+                order_count=row['order_count'], total_amount=row['amount']
+            )
+            for row in rows
+        )
+    return len(created)
+
+
+def _deltas():
+    return defaultdict(lambda: [0, Decimal('0')])
+
+
+def _add(deltas, day, status, count, amount):
+    delta = deltas[(day, status)]
+    delta[0] += count
+    delta[1] += amount
@@ -0,0 +1,143 @@
+"""
+Full-text search over order customer details.
+
+The backend is chosen by ``ORDERS_API_CONFIG['SEARCH_BACKEND']`` (a dotted
+path). When unset, SQLite databases use ``SQLiteFTSBackend`` and every
+other database falls back to ``DatabaseSearchBackend``.
+"""
+import hashlib
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+SEARCH_FIELDS = ['customer_name', 'customer_email', 'customer_phone', 'shipping_address']
+
+FTS_TABLE = 'orders_order_fts'
+
+CREATE_FTS_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    f"order_id UNINDEXED, {', '.join(SEARCH_FIELDS)}, tokenize='trigram')"
+)
+
+
+def fts_rowid(order_id):
+    """
+    Stable 64-bit FTS rowid for an order.
+
+    Orders have a character primary key, and SQLite may renumber the
+    implicit rowid of such tables on VACUUM, so index rows are keyed by a
+    hash of the order ID instead.
+    """
+    digest = hashlib.blake2b(order_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big', signed=True)
+
+
+class BaseSearchBackend:
+    """Interface for order search backends"""
+    # Shorter terms cannot be matched and are refused
+    min_term_length = 1
+
+    def update(self, orders):
+        """Add or refresh the index entries of ``orders``"""
+
+    def delete(self, order_ids):
+        """Drop the index entries of ``order_ids``"""
+
+    def clear(self):
+        """Drop every index entry"""
+
+    def search(self, query, limit):
+        """Return up to ``limit`` matching order IDs, best match first"""
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """Unindexed fallback: case-insensitive substring match, newest orders first"""
+
+    def search(self, query, limit):
+        from .models import Order
+
+        terms = query.split()
+        if not terms:
+            return []
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for field in SEARCH_FIELDS:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        return list(
+            Order.objects.filter(condition)
+            .order_by('-order_date', '-order_id')
+            .values_list('order_id', flat=True)[:limit]
+        )
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    SQLite FTS5 index with the trigram tokenizer, so fragments of a phone
+    number or address match as well as whole words. Results are ranked
+    with bm25, weighting name and phone above email and address.
+    """
+    # bm25 weights in column order: order_id (unindexed), then SEARCH_FIELDS
+    weights = (0.0, 10.0, 5.0, 10.0, 1.0)
+    # The trigram tokenizer cannot match terms shorter than this
+    min_term_length = 3
+
+    def update(self, orders):
+        rows = [
+            (fts_rowid(order.order_id), order.order_id,
+             *(getattr(order, field) or '' for field in SEARCH_FIELDS))
+            for order in orders
+        ]
+        if not rows:
+            return
+        placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS) + 2))
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT OR REPLACE INTO {FTS_TABLE} (rowid, order_id, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES ({placeholders})",
+                rows
+            )
+
+    def delete(self, order_ids):
+        rows = [(fts_rowid(order_id),) for order_id in order_ids]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", rows)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+
+    def search(self, query, limit):
+        match = self.build_match(query)
+        if not match:
+            return []
+        weights = ', '.join(str(weight) for weight in self.weights)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT order_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s",
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def build_match(self, query):
+        """Quote every whitespace separated term so user input is never parsed as FTS syntax"""
+        return ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in query.split())
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    backend_path = getattr(settings, 'ORDERS_API_CONFIG', {}).get('SEARCH_BACKEND')
+    if backend_path is None:
+        if connection.vendor == 'sqlite':
+            backend_path = 'orders.search.SQLiteFTSBackend'
+        else:
+            backend_path = 'orders.search.DatabaseSearchBackend'
+    return import_string(backend_path)()
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Order, OrderItem, OrderCancellation
+from .models import Order, OrderItem, OrderCancellation, OrderDailyStatus
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
@@ -30,3 +30,58 @@ class OrderSerializer(serializers.ModelSerializer):
             'customer_phone', 'shipping_address', 'billing_address', 'total_amount',
             'payment_method', 'created_at', 'updated_at', 'items', 'cancellations'
         ]
+
+
+class OrderIngestItemSerializer(serializers.ModelSerializer):
+    """Serializer for Order Items nested in a bulk ingest record"""
+    
+    class Meta:
+        model = OrderItem
+        fields = ['sku', 'product_name', 'quantity', 'unit_price', 'total_price', 'hsn_code']
+
+
+class OrderIngestSerializer(serializers.ModelSerializer):
+    """Serializer for one order record of a bulk ingest, with its items"""
+    items = OrderIngestItemSerializer(many=True, required=False)
+    
+    class Meta:
+        model = Order
+        fields = [
+            'order_id', 'order_date', 'status', 'customer_name', 'customer_email',
+            'customer_phone', 'shipping_address', 'billing_address', 'total_amount',
+            'payment_method', 'items'
+        ]
+        # Uniqueness is checked once per chunk instead of one query per record
+        extra_kwargs = {'order_id': {'validators': []}}
+
+
+class OrderBatchSerializer(serializers.Serializer):
+    """Serializer for a batch of order IDs to transition"""
+    order_ids = serializers.ListField(
+        child=serializers.CharField(max_length=100), allow_empty=False, max_length=10000
+    )
+
+
+class OrderBatchCancelSerializer(OrderBatchSerializer):
+    """Serializer for a batch of order IDs to cancel"""
+    reason = serializers.CharField(required=False, allow_blank=True, default='')
+    cancelled_by = serializers.CharField(max_length=50, required=False, default='SELLER')
+
+
+class OrderExportSerializer(serializers.Serializer):
+    """Serializer for order export query parameters"""
+    export_format = serializers.ChoiceField(choices=['csv', 'ndjson'], default='csv')
+
+
+class OrderDailyStatusSerializer(serializers.ModelSerializer):
+    """Serializer for a row of the daily order status rollup"""
+    
+    class Meta:
+        model = OrderDailyStatus
+        fields = ['day', 'status', 'order_count', 'total_amount']
+
+
+class OrderStatsSerializer(serializers.Serializer):
+    """Serializer for order stats query parameters"""
+    day_after = serializers.DateField(required=False)
+    day_before = serializers.DateField(required=False)
@@ -0,0 +1,66 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from flipkart_seller_center.state_machine import status_transitioned
+
+from . import rollups
+from .models import Order, OrderItem, OrderCancellation
+from .search import get_search_backend
+
+
+@receiver(post_save, sender=Order)
+def index_order(sender, instance, **kwargs):
+    """Keep the order search index in sync with saved orders"""
+    get_search_backend().update([instance])
+
+
+@receiver(post_delete, sender=Order)
+def unindex_order(sender, instance, **kwargs):
+    """Remove deleted orders from the search index"""
+    get_search_backend().delete([instance.order_id])
+
+
+@receiver(pre_save, sender=Order)
+def remember_rollup_key(sender, instance, raw=False, **kwargs):
+    """Read the stored day, status and amount of an order about to be updated"""
+    instance._rollup_previous = None
+    if raw or instance._state.adding:
+        return
+    stored = Order.objects.filter(pk=instance.pk).values_list('order_date', 'status', 'total_amount').first()
+    if stored is not None:
+        instance._rollup_previous = (rollups.order_day(stored[0]), stored[1], stored[2])
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, raw=False, **kwargs):
+    """Keep the daily status rollup in step with saved orders"""
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    if created:
+        rollups.record_created([instance])
+    elif previous is not None:
+        rollups.record_changed(previous, rollups.order_key(instance))
+
+
+@receiver(post_delete, sender=Order)
+def uncount_deleted_order(sender, instance, **kwargs):
+    """Drop deleted orders from the daily status rollup"""
+    rollups.record_deleted([instance])
+
+
+@receiver(status_transitioned, sender=Order)
+def count_transitioned_orders(sender, pks, previous, target, **kwargs):
+    """Follow status changes made by the order state machine, which bypass save()"""
+    rollups.record_transitioned(pks, previous, target)
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+@receiver(post_save, sender=OrderCancellation)
+@receiver(post_delete, sender=OrderCancellation)
+def touch_order(sender, instance, raw=False, **kwargs):
+    """Bump the order's updated_at so its ETag changes with its items and cancellations"""
+    if raw:
+        return
+    Order.objects.filter(pk=instance.order_id).update(updated_at=timezone.now())
@@ -1,11 +1,83 @@
-from spyne import Application, rpc, ServiceBase, Unicode, Integer, Decimal, DateTime
+from spyne import Application, rpc, ServiceBase, Unicode, Integer, Decimal, DateTime, Array, ComplexModel, Fault
 from spyne.protocol.soap import Soap11
 from spyne.server.django import DjangoApplication
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from .models import Order, OrderItem, OrderCancellation
+from django.db import transaction
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Order, OrderItem, OrderCancellation, order_status_machine
+from .batch import batch_dispatch, batch_cancel
+from .pagination import decode_cursor_token, encode_cursor_token, order_page
 from django.utils import timezone
 
 
+class OrderItemInfo(ComplexModel):
+    """An order line"""
+    __type_name__ = 'OrderItem'
+    __namespace__ = 'flipkart.seller.orders'
+    
+    sku = Unicode
+    product_name = Unicode
+    quantity = Integer
+    unit_price = Decimal
+    total_price = Decimal
+    hsn_code = Unicode
+
+
+class OrderInfo(ComplexModel):
+    """An order with its items"""
+    __type_name__ = 'Order'
+    __namespace__ = 'flipkart.seller.orders'
+    
+    order_id = Unicode
+    order_date = DateTime
+    status = Unicode
+    customer_name = Unicode
+    customer_email = Unicode
+    customer_phone = Unicode
+    shipping_address = Unicode
+    billing_address = Unicode
+    total_amount = Decimal
+    payment_method = Unicode
+    created_at = DateTime
+    updated_at = DateTime
+    items = Array(OrderItemInfo)
+
+
+class OrderStatusInfo(ComplexModel):
+    """Current status of an order"""
+    __type_name__ = 'OrderStatus'
+    __namespace__ = 'flipkart.seller.orders'
+    
+    order_id = Unicode
+    status = Unicode
+    last_updated = DateTime
+
+
+class OrderPage(ComplexModel):
+    """A page of orders, newest first; pass next_cursor back to get the next page"""
+    __namespace__ = 'flipkart.seller.orders'
+    
+    orders = Array(OrderInfo)
+    next_cursor = Unicode
+
+
+class SkippedOrder(ComplexModel):
+    """An order a batch left alone, and why"""
+    __namespace__ = 'flipkart.seller.orders'
+    
+    order_id = Unicode
+    reason = Unicode
+
+
+class OrderBatchResult(ComplexModel):
+    """Outcome of a batch transition: the orders that moved and the ones skipped"""
+    __namespace__ = 'flipkart.seller.orders'
+    
+    updated = Array(Unicode)
+    skipped = Array(SkippedOrder)
+
+
 class OrderService(ServiceBase):
     """SOAP Service for Orders API"""
     
@@ -32,29 +104,32 @@ class OrderService(ServiceBase):
         """Cancel an order"""
         try:
             order = Order.objects.get(order_id=order_id)
-            cancellation = OrderCancellation.objects.create(
-                order=order,
-                cancellation_id=f"CANC-{order_id}",
-                reason=reason,
-                cancelled_by=cancelled_by,
-                refund_amount=order.total_amount
-            )
-            order.status = 'CANCELLED'
-            order.save()
+            with transaction.atomic():
+                order_status_machine.transition(order, 'CANCELLED')
+                cancellation = OrderCancellation.objects.create(
+                    order=order,
+                    cancellation_id=f"CANC-{order_id}",
+                    reason=reason,
+                    cancelled_by=cancelled_by,
+                    refund_amount=order.total_amount
+                )
             return f"Order {order_id} cancelled successfully. Cancellation ID: {cancellation.cancellation_id}"
         except Order.DoesNotExist:
             return f"Order {order_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(Unicode, _returns=Unicode)
     def dispatch_order(ctx, order_id):
         """Mark order as ready to dispatch"""
         try:
             order = Order.objects.get(order_id=order_id)
-            order.status = 'READY_TO_DISPATCH'
-            order.save()
+            order_status_machine.transition(order, 'READY_TO_DISPATCH')
             return f"Order {order_id} marked for dispatch"
         except Order.DoesNotExist:
             return f"Order {order_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(Unicode, _returns=Unicode)
     def track_order(ctx, order_id):
@@ -64,6 +139,109 @@ class OrderService(ServiceBase):
             return f"Order {order_id} - Status: {order.status}, Last Updated: {order.updated_at}"
         except Order.DoesNotExist:
             return f"Order {order_id} not found"
+    
+    @rpc(Array(Unicode), _returns=Array(OrderInfo))
+    def get_orders(ctx, order_ids):
+        """Get many orders with their items, in request order; unknown IDs are left out"""
+        order_ids = _order_id_list(order_ids)
+        orders = Order.objects.prefetch_related('items').in_bulk(order_ids)
+        return [_order_info(orders[order_id]) for order_id in order_ids if order_id in orders]
+    
+    @rpc(Array(Unicode), _returns=Array(OrderStatusInfo))
+    def track_orders(ctx, order_ids):
+        """Track many orders, in request order; unknown IDs are left out"""
+        order_ids = _order_id_list(order_ids)
+        rows = Order.objects.filter(order_id__in=order_ids).values_list('order_id', 'status', 'updated_at')
+        statuses = {order_id: (status, updated_at) for order_id, status, updated_at in rows}
+        return [
+            OrderStatusInfo(order_id=order_id, status=statuses[order_id][0], last_updated=statuses[order_id][1])
+            for order_id in order_ids if order_id in statuses
+        ]
+    
+    @rpc(Unicode, Integer, Unicode, _returns=OrderPage)
+    def list_orders_paged(ctx, cursor, page_size, status):
+        """List orders with their items, newest first, one page per call"""
+        config = getattr(settings, 'ORDERS_API_CONFIG', {})
+        max_page_size = config.get('MAX_PAGE_SIZE', 500)
+        if not page_size or page_size <= 0:
+            page_size = config.get('PAGE_SIZE', 50)
+        page_size = min(page_size, max_page_size)
+        
+        queryset = Order.objects.prefetch_related('items')
+        if status:
+            statuses = [value.strip() for value in status.split(',') if value.strip()]
+            unknown = set(statuses) - {choice for choice, _ in Order.STATUS_CHOICES}
+            if unknown:
+                raise Fault('Client.InvalidStatus', f"Unknown order status: {', '.join(sorted(unknown))}")
+            queryset = queryset.filter(status__in=statuses)
+        try:
+            decoded = decode_cursor_token(cursor) if cursor else None
+        except ValueError:
+            raise Fault('Client.InvalidCursor', 'Invalid cursor')
+        
+        orders, has_next = order_page(queryset, decoded, page_size)
+        return OrderPage(
+            orders=[_order_info(order) for order in orders],
+            next_cursor=encode_cursor_token(orders[-1]) if has_next else None
+        )
+    
+    @rpc(Array(Unicode), _returns=OrderBatchResult)
+    def batch_dispatch_orders(ctx, order_ids):
+        """Mark a list of orders as ready to dispatch"""
+        return _batch_result(batch_dispatch(_order_id_list(order_ids)))
+    
+    @rpc(Array(Unicode), Unicode, Unicode, _returns=OrderBatchResult)
+    def batch_cancel_orders(ctx, order_ids, reason, cancelled_by):
+        """Cancel a list of orders"""
+        return _batch_result(
+            batch_cancel(_order_id_list(order_ids), reason=reason or '', cancelled_by=cancelled_by or 'SELLER')
+        )
+
+
+def _order_id_list(order_ids):
+    """De-duplicate requested order IDs, refusing more than one page's worth"""
+    order_ids = list(dict.fromkeys(order_ids or []))
+    max_ids = getattr(settings, 'ORDERS_API_CONFIG', {}).get('MAX_PAGE_SIZE', 500)
+    if len(order_ids) > max_ids:
+        raise Fault('Client.TooManyOrderIds', f"At most {max_ids} order IDs per call")
+    return order_ids
+
+
+def _order_info(order):
+    """Build the SOAP representation of an order with prefetched items"""
+    return OrderInfo(
+        order_id=order.order_id,
+        order_date=order.order_date,
+        status=order.status,
+        customer_name=order.customer_name,
+        customer_email=order.customer_email,
+        customer_phone=order.customer_phone,
+        shipping_address=order.shipping_address,
+        billing_address=order.billing_address,
+        total_amount=order.total_amount,
+        payment_method=order.payment_method,
+        created_at=order.created_at,
+        updated_at=order.updated_at,
+        items=[
+            OrderItemInfo(
+                sku=item.sku,
+                product_name=item.product_name,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+                total_price=item.total_price,
+                hsn_code=item.hsn_code
+            )
+            for item in order.items.all()
+        ]
+    )
+
+
+def _batch_result(result):
+    """Build the SOAP representation of a batch transition result"""
+    return OrderBatchResult(
+        updated=result['updated'],
+        skipped=[SkippedOrder(order_id=item['order_id'], reason=item['reason']) for item in result['skipped']]
+    )
 
 
 # Create SOAP application
@@ -1,3 +1,678 @@
-from django.test import TestCase
+import json
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Order, OrderItem, OrderCancellation, OrderDailyStatus, order_status_machine
+from .rollups import rebuild
+
+
+def create_order(order_id, **kwargs):
+    """Create an order with sensible defaults for tests"""
+    defaults = {
+        'order_date': timezone.now(),
+        'status': 'APPROVED',
+        'customer_name': 'Test Customer',
+        'shipping_address': '1 Test Street',
+        'total_amount': Decimal('100.00'),
+        'payment_method': 'COD',
+    }
+    defaults.update(kwargs)
+    return Order.objects.create(order_id=order_id, **defaults)
+
+
+class OrderQueryBudgetTests(TestCase):
+    """Order endpoints must serialize nested relations in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(5):
+            order = create_order(f'ORD-{i}', order_date=now - timedelta(hours=i))
+            for j in range(3):
+                OrderItem.objects.create(
+                    order=order, sku=f'SKU-{j}', product_name=f'Product {j}',
+                    quantity=1, unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+                )
+            OrderCancellation.objects.create(
+                order=order, cancellation_id=f'CANC-ORD-{i}', reason='Test',
+                cancelled_by='SELLER', refund_amount=Decimal('100.00')
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_order_list(self):
+        # orders, items, cancellations
+        with self.assertNumQueries(3):
+            response = self.client.get('/orders/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_order_detail(self):
+        # validators, order, items, cancellations
+        with self.assertNumQueries(4):
+            response = self.client.get('/orders/api/orders/ORD-0/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 3)
+
+    def test_order_item_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/orders/api/order-items/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_cancellation_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/orders/api/order-cancellations/')
+        self.assertEqual(response.status_code, 200)
+
+
+class OrderCursorPaginationTests(TestCase):
+    """Keyset pages of orders, newest first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # Three orders share each timestamp, so pages must break ties on order_id
+        for i in range(7):
+            create_order(
+                f'ORD-{i}', order_date=now - timedelta(hours=i // 3),
+                status='CANCELLED' if i % 2 else 'APPROVED'
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([order['order_id'] for order in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def test_pages_follow_next_link(self):
+        self.assertEqual(self.walk('/orders/api/orders/?page_size=2'), [
+            ['ORD-2', 'ORD-1'], ['ORD-0', 'ORD-5'], ['ORD-4', 'ORD-3'], ['ORD-6'],
+        ])
+
+    @override_settings(ORDERS_API_CONFIG={'PAGE_SIZE': 2, 'MAX_PAGE_SIZE': 3})
+    def test_page_size_is_clamped(self):
+        response = self.client.get('/orders/api/orders/?page_size=100')
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get('/orders/api/orders/?page_size=0')
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_tampered_cursor_is_not_found(self):
+        response = self.client.get('/orders/api/orders/?page_size=2')
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        response = self.client.get('/orders/api/orders/', {'cursor': cursor[:-4]})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/orders/api/orders/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_filter_with_cursor(self):
+        pages = self.walk('/orders/api/orders/?status=CANCELLED&page_size=2')
+        self.assertEqual(pages, [['ORD-1', 'ORD-5'], ['ORD-3']])
+        self.assertIn('status=CANCELLED', self.client.get(
+            '/orders/api/orders/?status=CANCELLED&page_size=2'
+        ).data['next'])
+
+
+class OrderIngestTests(TestCase):
+    """Bulk NDJSON ingestion of orders with nested items"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def record(self, order_id, **kwargs):
+        record = {
+            'order_id': order_id,
+            'order_date': '2025-01-01T10:00:00Z',
+            'status': 'APPROVED',
+            'customer_name': 'Test Customer',
+            'shipping_address': '1 Test Street',
+            'total_amount': '20.00',
+            'payment_method': 'COD',
+            'items': [
+                {'sku': 'SKU-1', 'product_name': 'Product 1', 'quantity': 2,
+                 'unit_price': '10.00', 'total_price': '20.00'},
+            ],
+        }
+        record.update(kwargs)
+        return json.dumps(record)
+
+    def ingest(self, lines):
+        return self.client.post(
+            '/orders/api/orders/ingest/', data='\n'.join(lines).encode(),
+            content_type='application/x-ndjson'
+        )
+
+    def test_ingest_creates_orders_and_items(self):
+        response = self.ingest([self.record(f'ORD-{i}') for i in range(3)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(Order.objects.count(), 3)
+        self.assertEqual(OrderItem.objects.filter(order_id='ORD-1').count(), 1)
+
+    def test_ingest_reports_bad_records_and_continues(self):
+        create_order('ORD-EXISTING')
+        response = self.ingest([
+            self.record('ORD-1'),
+            '{not json',
+            self.record('ORD-EXISTING'),
+            self.record('ORD-2', status='UNKNOWN'),
+            self.record('ORD-1'),
+            self.record('ORD-3'),
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 2)
+        statuses = [(result['line'], result['status']) for result in response.data['results']]
+        self.assertEqual(statuses, [
+            (1, 'created'), (2, 'failed'), (3, 'failed'),
+            (4, 'failed'), (5, 'failed'), (6, 'created'),
+        ])
+        self.assertEqual(set(Order.objects.values_list('order_id', flat=True)),
+                         {'ORD-EXISTING', 'ORD-1', 'ORD-3'})
+
+
+class OrderBatchTransitionTests(TestCase):
+    """Batch dispatch and cancel endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_order('ORD-1')
+        create_order('ORD-2', status='PACKED')
+        create_order('ORD-3', status='DELIVERED')
+
+    def test_batch_dispatch(self):
+        response = self.client.post('/orders/api/orders/batch-dispatch/', {
+            'order_ids': ['ORD-1', 'ORD-2', 'ORD-3', 'ORD-MISSING']
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], ['ORD-1', 'ORD-2'])
+        self.assertEqual([item['order_id'] for item in response.data['skipped']],
+                         ['ORD-3', 'ORD-MISSING'])
+        self.assertEqual(Order.objects.filter(status='READY_TO_DISPATCH').count(), 2)
+
+    def test_batch_cancel(self):
+        response = self.client.post('/orders/api/orders/batch-cancel/', {
+            'order_ids': ['ORD-1', 'ORD-3'], 'reason': 'Out of stock'
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], ['ORD-1'])
+        cancellation = OrderCancellation.objects.get(order_id='ORD-1')
+        self.assertEqual(cancellation.cancellation_id, 'CANC-ORD-1')
+        self.assertEqual(cancellation.refund_amount, Decimal('100.00'))
+        self.assertEqual(Order.objects.get(order_id='ORD-3').status, 'DELIVERED')
+
+    def test_batch_requires_order_ids(self):
+        response = self.client.post('/orders/api/orders/batch-dispatch/', {'order_ids': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderTransitionTests(TestCase):
+    """Guarded status transitions on single orders"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.order = create_order('ORD-1')
+
+    def test_cancel_twice_conflicts(self):
+        response = self.client.post('/orders/api/orders/ORD-1/cancel/', {'reason': 'Test'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/orders/api/orders/ORD-1/cancel/', {'reason': 'Test'}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'CANCELLED')
+        self.assertEqual(OrderCancellation.objects.count(), 1)
+
+    def test_dispatch(self):
+        response = self.client.post('/orders/api/orders/ORD-1/dispatch/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'READY_TO_DISPATCH')
+        response = self.client.post('/orders/api/orders/ORD-1/dispatch/')
+        self.assertEqual(response.status_code, 409)
+
+    def test_stale_instance_does_not_overwrite(self):
+        stale = Order.objects.get(order_id='ORD-1')
+        order_status_machine.transition(self.order, 'CANCELLED')
+        with self.assertRaises(TransitionConflict):
+            order_status_machine.transition(stale, 'READY_TO_DISPATCH')
+        self.assertEqual(Order.objects.get(order_id='ORD-1').status, 'CANCELLED')
+
+    def test_transition_writes_only_changed_columns(self):
+        Order.objects.filter(order_id='ORD-1').update(customer_name='Renamed')
+        order_status_machine.transition(self.order, 'READY_TO_DISPATCH')
+        order = Order.objects.get(order_id='ORD-1')
+        self.assertEqual(order.status, 'READY_TO_DISPATCH')
+        self.assertEqual(order.customer_name, 'Renamed')
+
+
+class OrderExportTests(TestCase):
+    """Streaming export of orders joined with items"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        order = create_order('ORD-1', order_date=now - timedelta(days=1))
+        for sku in ('SKU-1', 'SKU-2'):
+            OrderItem.objects.create(
+                order=order, sku=sku, product_name='Product', quantity=1,
+                unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+            )
+        create_order('ORD-2', order_date=now, status='SHIPPED')
+        create_order('ORD-OLD', order_date=now - timedelta(days=30))
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_has_one_row_per_item(self):
+        since = (timezone.now() - timedelta(days=7)).isoformat()
+        response = self.client.get('/orders/api/orders/export/', {'order_date_after': since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = self.content(response).splitlines()
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], ['ORD-2', 'ORD-1', 'ORD-1'])
+
+    def test_ndjson_nests_items(self):
+        response = self.client.get('/orders/api/orders/export/', {
+            'export_format': 'ndjson', 'status': 'APPROVED,SHIPPED'
+        })
+        orders = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([order['order_id'] for order in orders], ['ORD-2', 'ORD-1', 'ORD-OLD'])
+        self.assertEqual([item['sku'] for item in orders[1]['items']], ['SKU-1', 'SKU-2'])
+        self.assertEqual(orders[0]['items'], [])
+
+    def test_invalid_status(self):
+        response = self.client.get('/orders/api/orders/export/', {'status': 'UNKNOWN'})
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderSearchTests(TestCase):
+    """Full-text search over order customer details"""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_order('ORD-1', customer_name='Asha Rao', customer_phone='9876543210',
+                     shipping_address='12 MG Road, Bangalore')
+        create_order('ORD-2', customer_name='Ravi Kumar', customer_email='ravi@example.com',
+                     shipping_address='4 Park Street, Kolkata')
+
+    def search(self, query):
+        response = self.client.get('/orders/api/orders/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return [order['order_id'] for order in response.data['results']]
+
+    def test_search_by_phone_fragment(self):
+        self.assertEqual(self.search('65432'), ['ORD-1'])
+
+    def test_search_by_address_and_email(self):
+        self.assertEqual(self.search('park kolkata'), ['ORD-2'])
+        self.assertEqual(self.search('ravi@example'), ['ORD-2'])
+
+    def test_index_follows_saves_and_deletes(self):
+        order = Order.objects.get(order_id='ORD-1')
+        order.customer_name = 'Meera Iyer'
+        order.save()
+        self.assertEqual(self.search('asha'), [])
+        self.assertEqual(self.search('meera'), ['ORD-1'])
+        order.delete()
+        self.assertEqual(self.search('meera'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search('"asha NEAR ravi*'), [])
+
+    def test_filters_fill_the_page(self):
+        # The best matches are filtered out, so more are read to fill the page
+        for number in range(3, 15):
+            create_order(f'ORD-{number}', shipping_address='Bangalore Bangalore Bangalore')
+        create_order('ORD-15', shipping_address='Bangalore', status='SHIPPED')
+        create_order('ORD-16', shipping_address='Bangalore', status='SHIPPED')
+        response = self.client.get('/orders/api/orders/', {'q': 'bangalore', 'status': 'SHIPPED', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertCountEqual([order['order_id'] for order in response.data['results']], ['ORD-15', 'ORD-16'])
+
+    @override_settings(ORDERS_API_CONFIG={'SEARCH_MAX_CANDIDATES': 4})
+    def test_candidates_are_capped(self):
+        for number in range(3, 15):
+            create_order(f'ORD-{number}', shipping_address='Bangalore Bangalore Bangalore')
+        create_order('ORD-15', shipping_address='Bangalore', status='SHIPPED')
+        response = self.client.get('/orders/api/orders/', {'q': 'bangalore', 'status': 'SHIPPED', 'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+    def test_short_terms_are_refused(self):
+        response = self.client.get('/orders/api/orders/', {'q': 'mg road'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('mg', response.data['error'])
+
+
+class OrderFilterTests(TestCase):
+    """Query parameter filters on orders and order items"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.order = create_order('ORD-1', order_date=now - timedelta(days=10))
+        create_order('ORD-2', order_date=now - timedelta(days=1), status='SHIPPED')
+        create_order('ORD-3', order_date=now, status='PACKED')
+        OrderItem.objects.create(
+            order=cls.order, sku='SKU-1', product_name='Product', quantity=1,
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def order_ids(self, params):
+        response = self.client.get('/orders/api/orders/', params)
+        self.assertEqual(response.status_code, 200)
+        return [order['order_id'] for order in response.data['results']]
+
+    def test_filter_by_status(self):
+        self.assertEqual(self.order_ids({'status': 'SHIPPED'}), ['ORD-2'])
+        self.assertEqual(self.order_ids({'status': 'SHIPPED,PACKED'}), ['ORD-3', 'ORD-2'])
+
+    def test_filter_by_order_date_range(self):
+        since = (timezone.now() - timedelta(days=5)).isoformat()
+        until = (timezone.now() - timedelta(hours=1)).isoformat()
+        self.assertEqual(self.order_ids({'order_date_after': since, 'order_date_before': until}), ['ORD-2'])
+
+    def test_invalid_filter_values(self):
+        response = self.client.get('/orders/api/orders/', {'status': 'UNKNOWN', 'order_date_after': 'soon'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.data)
+        self.assertIn('order_date_after', response.data)
+
+    def test_filter_items_by_sku(self):
+        response = self.client.get('/orders/api/order-items/', {'sku': 'SKU-1'})
+        self.assertEqual([item['sku'] for item in response.data], ['SKU-1'])
+        response = self.client.get('/orders/api/order-items/', {'sku': 'SKU-2'})
+        self.assertEqual(response.data, [])
+
+
+class OrderStatsTests(TestCase):
+    """Incrementally maintained daily order status rollup"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.day = timezone.now() - timedelta(days=3)
+
+    def rollup(self):
+        return {
+            (row.day, row.status): (row.order_count, row.total_amount)
+            for row in OrderDailyStatus.objects.filter(order_count__gt=0)
+        }
+
+    def assertRollupMatchesRebuild(self):
+        incremental = self.rollup()
+        rebuild()
+        self.assertEqual(incremental, self.rollup())
+
+    def test_rollup_follows_every_write_path(self):
+        create_order('ORD-1', order_date=self.day)
+        create_order('ORD-2', total_amount=Decimal('50.00'))
+        create_order('ORD-3', status='PACKED')
+
+        order = Order.objects.get(order_id='ORD-2')
+        order.status = 'PACKED'
+        order.order_date = self.day
+        order.save()
+        order_status_machine.transition(Order.objects.get(order_id='ORD-1'), 'READY_TO_DISPATCH')
+        self.client.post('/orders/api/orders/batch-cancel/', {'order_ids': ['ORD-2', 'ORD-3']}, format='json')
+        self.client.post(
+            '/orders/api/orders/ingest/', content_type='application/x-ndjson',
+            data=json.dumps({
+                'order_id': 'ORD-4', 'order_date': self.day.isoformat(), 'status': 'APPROVED',
+                'customer_name': 'Test Customer', 'shipping_address': '1 Test Street',
+                'total_amount': '20.00', 'payment_method': 'COD', 'items': [],
+            }).encode()
+        )
+        Order.objects.get(order_id='ORD-3').delete()
+
+        rollup = self.rollup()
+        day = timezone.localdate(self.day)
+        self.assertEqual(rollup[(day, 'READY_TO_DISPATCH')], (1, Decimal('100.00')))
+        self.assertEqual(rollup[(day, 'CANCELLED')], (1, Decimal('50.00')))
+        self.assertEqual(rollup[(day, 'APPROVED')], (1, Decimal('20.00')))
+        self.assertRollupMatchesRebuild()
+
+    def test_stats_endpoint(self):
+        create_order('ORD-1', order_date=self.day)
+        create_order('ORD-2', order_date=self.day, status='SHIPPED')
+        create_order('ORD-3')
+
+        response = self.client.get('/orders/api/orders/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['totals']['APPROVED'], {'order_count': 2, 'total_amount': '200.00'})
+        self.assertEqual(len(response.data['days']), 3)
+
+        today = timezone.localdate()
+        # days, with the per-status totals as window sums
+        with self.assertNumQueries(1):
+            response = self.client.get('/orders/api/orders/stats/', {'day_before': today.isoformat()})
+        self.assertEqual(set(response.data['totals']), {'APPROVED', 'SHIPPED'})
+        self.assertEqual(response.data['totals']['SHIPPED']['order_count'], 1)
+
+    @override_settings(ORDERS_API_CONFIG={'STATS_DEFAULT_DAYS': 2})
+    def test_stats_default_to_recent_days(self):
+        create_order('ORD-1', order_date=self.day)
+        create_order('ORD-2')
+        response = self.client.get('/orders/api/orders/stats/')
+        self.assertEqual(response.data['totals'], {'APPROVED': {'order_count': 1, 'total_amount': '100.00'}})
+        self.assertEqual([row['day'] for row in response.data['days']], [timezone.localdate().isoformat()])
+        response = self.client.get('/orders/api/orders/stats/', {'day_after': timezone.localdate(self.day).isoformat()})
+        self.assertEqual(response.data['totals']['APPROVED']['order_count'], 2)
+
+    def test_invalid_stats_range(self):
+        response = self.client.get('/orders/api/orders/stats/', {'day_after': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class OrderConditionalGetTests(TestCase):
+    """ETag / Last-Modified validators on order detail and tracking"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.order = create_order('ORD-1')
+
+    def test_unchanged_track_is_not_modified(self):
+        response = self.client.get('/orders/api/orders/ORD-1/track/')
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get('/orders/api/orders/ORD-1/track/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since(self):
+        response = self.client.get('/orders/api/orders/ORD-1/')
+        response = self.client.get('/orders/api/orders/ORD-1/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_status_change_invalidates(self):
+        etag = self.client.get('/orders/api/orders/ORD-1/track/')['ETag']
+        order_status_machine.transition(self.order, 'PACKED')
+        response = self.client.get('/orders/api/orders/ORD-1/track/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'PACKED')
+
+    def test_item_change_invalidates_detail(self):
+        etag = self.client.get('/orders/api/orders/ORD-1/')['ETag']
+        OrderItem.objects.create(
+            order=self.order, sku='SKU-1', product_name='Product', quantity=1,
+            unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+        )
+        response = self.client.get('/orders/api/orders/ORD-1/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['items']), 1)
+
+    def test_missing_order(self):
+        response = self.client.get('/orders/api/orders/ORD-MISSING/', HTTP_IF_NONE_MATCH='"abc"')
+        self.assertEqual(response.status_code, 404)
+
+
+class OrderSoapBatchTests(TestCase):
+    """Structured and batched SOAP OrderService operations"""
+    ns = {'tns': 'flipkart.seller.orders'}
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(5):
+            order = create_order(f'ORD-{i}', order_date=now - timedelta(days=i))
+            OrderItem.objects.create(
+                order=order, sku=f'SKU-{i}', product_name='Product', quantity=1,
+                unit_price=Decimal('10.00'), total_price=Decimal('10.00')
+            )
+
+    def call(self, operation, body=''):
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:tns="flipkart.seller.orders"><soapenv:Body>'
+            f'<tns:{operation}>{body}</tns:{operation}>'
+            '</soapenv:Body></soapenv:Envelope>'
+        )
+        response = self.client.post('/orders/soap/', envelope, content_type='text/xml')
+        return response.status_code, ET.fromstring(response.content)
+
+    def order_ids_xml(self, order_ids):
+        strings = ''.join(f'<tns:string>{order_id}</tns:string>' for order_id in order_ids)
+        return f'<tns:order_ids>{strings}</tns:order_ids>'
+
+    def test_get_orders(self):
+        with self.assertNumQueries(2):
+            status_code, root = self.call('get_orders', self.order_ids_xml(['ORD-3', 'ORD-MISSING', 'ORD-1']))
+        self.assertEqual(status_code, 200)
+        orders = root.findall('.//tns:Order', self.ns)
+        self.assertEqual([order.findtext('tns:order_id', namespaces=self.ns) for order in orders], ['ORD-3', 'ORD-1'])
+        self.assertEqual(orders[0].findtext('tns:items/tns:OrderItem/tns:sku', namespaces=self.ns), 'SKU-3')
+        self.assertEqual(orders[0].findtext('tns:total_amount', namespaces=self.ns), '100.00')
+
+    def test_track_orders(self):
+        status_code, root = self.call('track_orders', self.order_ids_xml(['ORD-2']))
+        self.assertEqual(status_code, 200)
+        self.assertEqual(root.findtext('.//tns:OrderStatus/tns:status', namespaces=self.ns), 'APPROVED')
+
+    def test_list_orders_paged(self):
+        seen = []
+        cursor = ''
+        while True:
+            body = '<tns:page_size>2</tns:page_size>'
+            if cursor:
+                body = f'<tns:cursor>{cursor}</tns:cursor>' + body
+            status_code, root = self.call('list_orders_paged', body)
+            self.assertEqual(status_code, 200)
+            seen.extend(element.text for element in root.findall('.//tns:Order/tns:order_id', self.ns))
+            cursor = root.findtext('.//tns:next_cursor', namespaces=self.ns)
+            if not cursor:
+                break
+        self.assertEqual(seen, [f'ORD-{i}' for i in range(5)])
+
+    def test_batch_dispatch_orders(self):
+        Order.objects.filter(order_id='ORD-1').update(status='CANCELLED')
+        status_code, root = self.call('batch_dispatch_orders', self.order_ids_xml(['ORD-0', 'ORD-1', 'ORD-MISSING']))
+        self.assertEqual(status_code, 200)
+        result = root.find('.//tns:batch_dispatch_ordersResult', self.ns)
+        self.assertEqual([element.text for element in result.findall('tns:updated/tns:string', self.ns)], ['ORD-0'])
+        skipped = {
+            element.findtext('tns:order_id', namespaces=self.ns): element.findtext('tns:reason', namespaces=self.ns)
+            for element in result.findall('tns:skipped/tns:SkippedOrder', self.ns)
+        }
+        self.assertEqual(set(skipped), {'ORD-1', 'ORD-MISSING'})
+        self.assertEqual(Order.objects.get(order_id='ORD-0').status, 'READY_TO_DISPATCH')
+
+    def test_batch_cancel_orders(self):
+        body = self.order_ids_xml(['ORD-2', 'ORD-3']) + '<tns:reason>Out of stock</tns:reason>'
+        status_code, root = self.call('batch_cancel_orders', body)
+        self.assertEqual(status_code, 200)
+        updated = root.findall('.//tns:batch_cancel_ordersResult/tns:updated/tns:string', self.ns)
+        self.assertEqual(sorted(element.text for element in updated), ['ORD-2', 'ORD-3'])
+        self.assertFalse(root.findall('.//tns:SkippedOrder', self.ns))
+        self.assertEqual(OrderCancellation.objects.filter(reason='Out of stock').count(), 2)
+
+    @override_settings(ORDERS_API_CONFIG={'MAX_PAGE_SIZE': 2})
+    def test_batch_order_ids_are_capped(self):
+        # Repeated IDs count once
+        status_code, root = self.call('batch_dispatch_orders', self.order_ids_xml(['ORD-0', 'ORD-0', 'ORD-1']))
+        self.assertEqual(status_code, 200)
+        updated = root.findall('.//tns:batch_dispatch_ordersResult/tns:updated/tns:string', self.ns)
+        self.assertEqual(sorted(element.text for element in updated), ['ORD-0', 'ORD-1'])
+        with self.assertLogs('spyne', level='ERROR'), self.assertLogs('django.request', level='ERROR'):
+            status_code, root = self.call('batch_cancel_orders', self.order_ids_xml(['ORD-2', 'ORD-3', 'ORD-4']))
+        self.assertEqual(status_code, 500)
+        self.assertIn('TooManyOrderIds', root.findtext('.//faultcode'))
+        self.assertEqual(Order.objects.filter(status='CANCELLED').count(), 0)
+
+    def test_invalid_cursor_is_a_client_fault(self):
+        with self.assertLogs('spyne', level='ERROR'), self.assertLogs('django.request', level='ERROR'):
+            status_code, root = self.call('list_orders_paged', '<tns:cursor>not-a-cursor</tns:cursor>')
+        self.assertEqual(status_code, 500)
+        self.assertIn('InvalidCursor', root.findtext('.//faultcode'))
+
+
+class OrderIdempotencyTests(TestCase):
+    """Retried mutating requests with an Idempotency-Key replay the first response"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        create_order('ORD-1')
+
+    def cancel(self, key, reason='Test'):
+        return self.client.post(
+            '/orders/api/orders/ORD-1/cancel/', {'reason': reason}, format='json',
+            HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_response_without_writing(self):
+        first = self.cancel('key-1')
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            retry = self.cancel('key-1')
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(json.loads(retry.content), first.data)
+        self.assertEqual(OrderCancellation.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self.cancel('key-1')
+        response = self.cancel('key-1', reason='Something else')
+        self.assertEqual(response.status_code, 422)
+
+    @override_settings(DATA_UPLOAD_MAX_MEMORY_SIZE=100)
+    def test_streamed_body_is_fingerprinted(self):
+        def ingest(order_ids):
+            body = '\n'.join(json.dumps({
+                'order_id': order_id, 'order_date': '2026-10-01T10:00:00Z', 'status': 'APPROVED',
+                'customer_name': 'Test Customer', 'shipping_address': '1 Test Street',
+                'total_amount': '20.00', 'payment_method': 'COD', 'items': [],
+            }) for order_id in order_ids)
+            return self.client.post(
+                '/orders/api/orders/ingest/', data=body.encode(), content_type='application/x-ndjson',
+                HTTP_IDEMPOTENCY_KEY='ingest-1'
+            )
+
+        first = ingest(['ORD-10', 'ORD-11'])
+        self.assertEqual(first.data['created'], 2)
+        retry = ingest(['ORD-10', 'ORD-11'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        # A different batch of the same length
+        response = ingest(['ORD-20', 'ORD-21'])
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Order.objects.filter(order_id__in=['ORD-20', 'ORD-21']).exists())
+
+    def test_requests_without_key_are_not_stored(self):
+        self.client.post('/orders/api/orders/ORD-1/cancel/', {'reason': 'Test'}, format='json')
+        response = self.client.post('/orders/api/orders/ORD-1/cancel/', {'reason': 'Test'}, format='json')
+        self.assertEqual(response.status_code, 409)
@@ -1,26 +1,113 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum, Window
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Order, OrderItem, OrderCancellation
-from .serializers import OrderSerializer, OrderItemSerializer, OrderCancellationSerializer
+from flipkart_seller_center.conditional import ConditionalGetMixin
+from flipkart_seller_center.idempotency import IdempotencyMixin
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Order, OrderItem, OrderCancellation, OrderDailyStatus, order_status_machine
+from .serializers import (
+    OrderSerializer, OrderItemSerializer, OrderCancellationSerializer,
+    OrderBatchSerializer, OrderBatchCancelSerializer, OrderExportSerializer,
+    OrderDailyStatusSerializer, OrderStatsSerializer
+)
+from .pagination import OrderCursorPagination
+from .parsers import NDJSONParser
+from .ingest import ingest_orders
+from .batch import batch_dispatch, batch_cancel
+from .export import export_rows, stream_csv, stream_ndjson
+from .search import get_search_backend
+
+CENTS = Decimal('0.01')
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Orders API
     
     Endpoints:
-    - GET /api/orders/ - List all orders
+    - GET /api/orders/ - List orders, newest first (cursor paginated)
+      Filters: ?status=, ?payment_method=, ?order_date_after=, ?order_date_before=
+    - GET /api/orders/?q=<text> - Search orders by customer name, email, phone or address
     - POST /api/orders/ - Create a new order
-    - GET /api/orders/{order_id}/ - Get order details
+    - POST /api/orders/ingest/ - Bulk create orders with items from an NDJSON body
+    - GET /api/orders/{order_id}/ - Get order details (ETag / Last-Modified)
     - PUT /api/orders/{order_id}/ - Update order
     - DELETE /api/orders/{order_id}/ - Delete order
     - POST /api/orders/{order_id}/cancel/ - Cancel an order
     - POST /api/orders/{order_id}/dispatch/ - Mark order as dispatched
-    - GET /api/orders/{order_id}/track/ - Track order
+    - GET /api/orders/{order_id}/track/ - Track order (ETag / Last-Modified)
+    - POST /api/orders/batch-dispatch/ - Mark many orders as dispatched
+    - POST /api/orders/batch-cancel/ - Cancel many orders
+    - GET /api/orders/export/ - Stream orders with items as CSV or NDJSON
+    - GET /api/orders/stats/ - Order counts and amounts per day and status
     """
-    queryset = Order.objects.all()
+    queryset = Order.objects.prefetch_related('items', 'cancellations')
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
+    filter_fields = ['status', 'payment_method']
+    date_range_fields = ['order_date']
+    # Item and cancellation changes touch the order's updated_at, see signals
+    conditional_validators = {'retrieve': ['updated_at'], 'track': ['updated_at']}
+    
+    def list(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return super().list(request, *args, **kwargs)
+        
+        backend = get_search_backend()
+        short = [term for term in query.split() if len(term) < backend.min_term_length]
+        if short:
+            return Response(
+                {'error': f'Search terms must be at least {backend.min_term_length} characters: {", ".join(short)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Search results come back best match first, so they are returned
+        # as a single ranked page rather than through the date cursor. The
+        # other filters apply to the matches, so fetch more until they fill
+        # the page or the matches run out.
+        limit = self.paginator.get_page_size(request)
+        max_candidates = settings.ORDERS_API_CONFIG.get('SEARCH_MAX_CANDIDATES', 5000)
+        filtered = self.filter_queryset(Order.objects.all())
+        fetch = limit
+        while True:
+            order_ids = backend.search(query, limit=fetch)
+            kept = filtered.only('pk').in_bulk(order_ids)
+            page_ids = [order_id for order_id in order_ids if order_id in kept][:limit]
+            if len(page_ids) == limit or len(order_ids) < fetch or fetch >= max_candidates:
+                break
+            fetch = min(fetch * 4, max_candidates)
+        
+        orders = self.get_queryset().in_bulk(page_ids)
+        serializer = self.get_serializer([orders[order_id] for order_id in page_ids], many=True)
+        return Response({'next': None, 'results': serializer.data})
+    
+    @action(detail=False, methods=['post'], parser_classes=[NDJSONParser])
+    def ingest(self, request):
+        """Bulk create orders, one JSON object with nested items per line"""
+        records = request.data
+        if isinstance(records, dict):
+            # Empty body
+            records = ()
+        
+        chunk_size = settings.ORDERS_API_CONFIG.get('INGEST_CHUNK_SIZE', 500)
+        results = ingest_orders(records, chunk_size=chunk_size)
+        created = sum(1 for result in results if result['status'] == 'created')
+        
+        return Response({
+            'received': len(results),
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        })
     
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
@@ -30,28 +117,32 @@ class OrderViewSet(viewsets.ModelViewSet):
         cancelled_by = request.data.get('cancelled_by', 'SELLER')
         refund_amount = request.data.get('refund_amount', order.total_amount)
         
-        cancellation = OrderCancellation.objects.create(
-            order=order,
-            cancellation_id=f"CANC-{order.order_id}",
-            reason=reason,
-            cancelled_by=cancelled_by,
-            refund_amount=refund_amount
-        )
-        
-        order.status = 'CANCELLED'
-        order.save()
+        try:
+            with transaction.atomic():
+                order_status_machine.transition(order, 'CANCELLED')
+                cancellation = OrderCancellation.objects.create(
+                    order=order,
+                    cancellation_id=f"CANC-{order.order_id}",
+                    reason=reason,
+                    cancelled_by=cancelled_by,
+                    refund_amount=refund_amount
+                )
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         
         return Response({
             'message': 'Order cancelled successfully',
             'cancellation_id': cancellation.cancellation_id
         })
     
-    @action(detail=True, methods=['post'])
-    def dispatch(self, request, pk=None):
+    @action(detail=True, methods=['post'], url_path='dispatch', url_name='dispatch')
+    def dispatch_order(self, request, pk=None):
         """Mark order as dispatched"""
         order = self.get_object()
-        order.status = 'READY_TO_DISPATCH'
-        order.save()
+        try:
+            order_status_machine.transition(order, 'READY_TO_DISPATCH')
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         
         return Response({
             'message': 'Order marked for dispatch',
@@ -59,9 +150,96 @@ class OrderViewSet(viewsets.ModelViewSet):
             'status': order.status
         })
     
+    @action(detail=False, methods=['post'], url_path='batch-dispatch')
+    def batch_dispatch(self, request):
+        """Mark a list of orders as dispatched"""
+        serializer = OrderBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = batch_dispatch(serializer.validated_data['order_ids'])
+        
+        return Response({
+            'message': f"{len(result['updated'])} orders marked for dispatch",
+            'updated': result['updated'],
+            'skipped': result['skipped']
+        })
+    
+    @action(detail=False, methods=['post'], url_path='batch-cancel')
+    def batch_cancel(self, request):
+        """Cancel a list of orders"""
+        serializer = OrderBatchCancelSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        result = batch_cancel(
+            serializer.validated_data['order_ids'],
+            reason=serializer.validated_data['reason'],
+            cancelled_by=serializer.validated_data['cancelled_by']
+        )
+        
+        return Response({
+            'message': f"{len(result['updated'])} orders cancelled",
+            'updated': result['updated'],
+            'skipped': result['skipped']
+        })
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream orders joined with their items, filtered like the order list"""
+        serializer = OrderExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        queryset = self.filter_queryset(Order.objects.all())
+        chunk_size = settings.ORDERS_API_CONFIG.get('EXPORT_CHUNK_SIZE', 2000)
+        rows = export_rows(queryset, chunk_size=chunk_size)
+        if params['export_format'] == 'ndjson':
+            response = StreamingHttpResponse(stream_ndjson(rows), content_type='application/x-ndjson')
+        else:
+            response = StreamingHttpResponse(stream_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="orders.{params["export_format"]}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Order counts and amounts per status, overall and per day, from the daily rollup"""
+        serializer = OrderStatsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        # Without a start, only the last STATS_DEFAULT_DAYS days up to day_before (or today)
+        day_before = params.get('day_before', timezone.localdate() + timedelta(days=1))
+        day_after = params.get(
+            'day_after', day_before - timedelta(days=settings.ORDERS_API_CONFIG.get('STATS_DEFAULT_DAYS', 30))
+        )
+        
+        # The per-status totals ride along on every day row as window sums,
+        # so the days and the totals come back in one query
+        by_status = {'partition_by': [F('status')]}
+        rows = list(OrderDailyStatus.objects.filter(
+            order_count__gt=0, day__gte=day_after, day__lt=day_before
+        ).annotate(
+            status_count=Window(Sum('order_count'), **by_status),
+            status_amount=Window(Sum('total_amount'), **by_status),
+        ).order_by('day', 'status'))
+        
+        totals = {}
+        for row in rows:
+            totals[row.status] = {
+                'order_count': row.status_count,
+                # SQLite hands back sums with the wrong number of decimal places
+                'total_amount': str(row.status_amount.quantize(CENTS)),
+            }
+        return Response({
+            'totals': totals,
+            'days': OrderDailyStatusSerializer(rows, many=True).data
+        })
+    
     @action(detail=True, methods=['get'])
     def track(self, request, pk=None):
         """Track order status"""
+        not_modified = self.check_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         order = self.get_object()
         return Response({
             'order_id': order.order_id,
@@ -71,13 +249,18 @@ class OrderViewSet(viewsets.ModelViewSet):
         })
 
 
-class OrderItemViewSet(viewsets.ModelViewSet):
-    """ViewSet for Order Items"""
+class OrderItemViewSet(IdempotencyMixin, viewsets.ModelViewSet):
+    """
+    ViewSet for Order Items
+    
+    Filters: ?sku=, ?order=
+    """
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
+    filter_fields = ['sku', 'order']
 
 
-class OrderCancellationViewSet(viewsets.ModelViewSet):
+class OrderCancellationViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """ViewSet for Order Cancellations"""
     queryset = OrderCancellation.objects.all()
     serializer_class = OrderCancellationSerializer
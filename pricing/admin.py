@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import PricingRule, Price, SpecialPrice
+from .models import PricingRule, Price, SpecialPrice, PriceHistory
 
 
 @admin.register(PricingRule)
@@ -23,3 +23,10 @@ class SpecialPriceAdmin(admin.ModelAdmin):
     list_filter = ['is_active', 'start_date', 'end_date']
     search_fields = ['promotion_name', 'product__sku', 'product__product_name']
     readonly_fields = ['created_at']
+
+
+@admin.register(PriceHistory)
+class PriceHistoryAdmin(admin.ModelAdmin):
+    list_display = ['sku', 'source', 'source_id', 'listing_price', 'selling_price', 'is_active', 'valid_from']
+    list_filter = ['source']
+    search_fields = ['sku']
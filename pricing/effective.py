@@ -0,0 +1,293 @@
+"""
+Effective selling price of a SKU at a point in time.
+
+Precedence, highest first:
+
+1. an active ``SpecialPrice`` whose window covers the time; when several
+   overlap, the lowest special price wins;
+2. an active ``PricingRule`` whose window covers the time, applied to
+   ``Price.selling_price``; when several overlap, the most recently created
+   one wins. FIXED sets the price to ``value``; DISCOUNT and MARKUP take
+   ``percentage`` percent off or on when it is set, and ``value`` otherwise;
+3. ``Price.selling_price``.
+
+Windows include their start and exclude their end. Resolved prices are
+rounded to paise and never negative; SKUs without a Price row are reported
+as missing.
+
+Active rules and promotions are held in an in-process ``PriceWindowIndex``:
+per SKU, windows sorted by start, so a SKU is resolved with a bisect and a
+short scan, and only selling prices are read from the database, one query
+per ``CHUNK_SIZE`` SKUs. Saves and deletes of rules and promotions update
+the index of the writing process once they commit (see
+``pricing.signals``) and bump a generation counter in the Django cache
+named by ``EFFECTIVE_PRICE_CONFIG['CACHE_ALIAS']``; other processes compare
+it once per batch and reload when it moved. Code that writes with
+``QuerySet.update`` calls ``invalidate``.
+"""
+import random
+import threading
+from bisect import bisect_right
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Price, PricingRule, SpecialPrice
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+}
+
+CHUNK_SIZE = 1000
+GENERATION_KEY = 'pricing:effective:generation'
+CENT = Decimal('0.01')
+
+SPECIAL_FIELDS = ['pk', 'product_id', 'start_date', 'end_date', 'special_price', 'promotion_name']
+RULE_FIELDS = [
+    'pk', 'product_id', 'start_date', 'end_date', 'created_at',
+    'rule_type', 'value', 'percentage', 'rule_name',
+]
+
+
+def apply_rule(base, rule_type, value, percentage=None):
+    """``base`` with a pricing rule applied, rounded to paise and never negative"""
+    if rule_type == 'FIXED':
+        price = value
+    else:
+        change = base * percentage / 100 if percentage is not None else value
+        price = base - change if rule_type == 'DISCOUNT' else base + change
+    return max(price, Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class PriceWindowIndex:
+    """In-process index of active special prices and pricing rules by SKU"""
+
+    def __init__(self, cache_alias):
+        self.cache_alias = cache_alias
+        # {sku: [(start, end, pk, ...values), ...]} sorted by start
+        self._windows = {SpecialPrice: {}, PricingRule: {}}
+        self._skus = {SpecialPrice: {}, PricingRule: {}}
+        self._generation = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(('loads', 'updates'), 0)
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def lookup(self, skus, at):
+        """``{sku: (special price window, pricing rule window)}`` covering ``at``, for SKUs that have one"""
+        self._refresh()
+        found = {}
+        with self._lock:
+            specials = self._windows[SpecialPrice]
+            rules = self._windows[PricingRule]
+            for sku in skus:
+                special = _best(specials.get(sku), at, _lowest_price)
+                rule = _best(rules.get(sku), at, _newest) if special is None else None
+                if special is not None or rule is not None:
+                    found[sku] = (special, rule)
+        return found
+
+    def update(self, model, pk, row=None):
+        """Replace the window of ``model`` row ``pk`` with ``row``, or drop it when ``row`` is None"""
+        generation = self._bump()
+        with self._lock:
+            if not self._loaded:
+                return
+            sku = self._skus[model].pop(pk, None)
+            if sku is not None:
+                windows = self._windows[model][sku]
+                windows[:] = [window for window in windows if window[2] != pk]
+                if not windows:
+                    del self._windows[model][sku]
+            if row is not None:
+                self._insert(model, row)
+            self._counters['updates'] += 1
+            # Another process wrote in between: its change is only in the database
+            if generation is None or self._generation is None or generation != self._generation + 1:
+                self._loaded = False
+            else:
+                self._generation = generation
+
+    def invalidate(self):
+        """Reload every process's index before its next lookup"""
+        self._bump()
+        with self._lock:
+            self._loaded = False
+
+    def stats(self):
+        with self._lock:
+            return dict(
+                self._counters,
+                special_prices=len(self._skus[SpecialPrice]),
+                pricing_rules=len(self._skus[PricingRule]),
+            )
+
+    def _refresh(self):
+        # Read before the rows, so a write that lands during a load leaves
+        # the stored generation behind and is picked up on the next lookup
+        generation = self.shared.get(GENERATION_KEY)
+        if generation is None:
+            self.shared.add(GENERATION_KEY, _new_generation(), None)
+            generation = self.shared.get(GENERATION_KEY)
+        with self._lock:
+            if self._loaded and generation == self._generation:
+                return
+        rows = {
+            SpecialPrice: list(SpecialPrice.objects.filter(is_active=True).values_list(*SPECIAL_FIELDS)),
+            PricingRule: list(PricingRule.objects.filter(is_active=True).values_list(*RULE_FIELDS)),
+        }
+        with self._lock:
+            self._windows = {SpecialPrice: {}, PricingRule: {}}
+            self._skus = {SpecialPrice: {}, PricingRule: {}}
+            for model, model_rows in rows.items():
+                for row in model_rows:
+                    self._insert(model, row, sort=False)
+                for windows in self._windows[model].values():
+                    windows.sort(key=_start)
+            self._generation = generation
+            self._loaded = True
+            self._counters['loads'] += 1
+
+    def _insert(self, model, row, sort=True):
+        pk, sku, *values = row
+        window = (values[0], values[1], pk, *values[2:])
+        windows = self._windows[model].setdefault(sku, [])
+        if sort:
+            windows.insert(bisect_right(windows, window[0], key=_start), window)
+        else:
+            windows.append(window)
+        self._skus[model][pk] = sku
+
+    def _bump(self):
+        try:
+            return self.shared.incr(GENERATION_KEY)
+        except ValueError:
+            # Missing or evicted; every process will see a new value and reload
+            self.shared.add(GENERATION_KEY, _new_generation(), None)
+            return None
+
+
+def _new_generation():
+    # Random, so a counter that was evicted never comes back with an old value
+    return random.getrandbits(48)
+
+
+def _start(window):
+    return window[0]
+
+
+def _lowest_price(window):
+    # Lowest special price; the later start, then the newer row, breaks ties
+    return (-window[3], window[0], window[2])
+
+
+def _newest(window):
+    return (window[3], window[2])
+
+
+def _best(windows, at, rank):
+    """The highest ranked window covering ``at``"""
+    if not windows:
+        return None
+    best = None
+    for window in windows[:bisect_right(windows, at, key=_start)]:
+        if window[1] > at and (best is None or rank(window) > rank(best)):
+            best = window
+    return best
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_config():
+    """``EFFECTIVE_PRICE_CONFIG`` with defaults filled in"""
+    return {**DEFAULTS, **getattr(settings, 'EFFECTIVE_PRICE_CONFIG', {})}
+
+
+def get_index():
+    """The process-wide PriceWindowIndex"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PriceWindowIndex(get_config()['CACHE_ALIAS'])
+    return _index
+
+
+def effective_prices(skus, at=None):
+    """
+    Resolve the effective price of ``skus`` at ``at`` (now by default).
+    Returns ``(prices, missing)``: one dict per SKU with a Price row, in
+    the order given, and the SKUs without one.
+    """
+    at = at or timezone.now()
+    skus = list(dict.fromkeys(skus))
+    base = {}
+    for start in range(0, len(skus), CHUNK_SIZE):
+        base.update(
+            (sku, (listing_price, selling_price))
+            for sku, listing_price, selling_price in Price.objects.filter(
+                product_id__in=skus[start:start + CHUNK_SIZE]
+            ).values_list('product_id', 'listing_price', 'selling_price')
+        )
+    windows = get_index().lookup([sku for sku in skus if sku in base], at)
+
+    prices = []
+    missing = []
+    for sku in skus:
+        if sku not in base:
+            missing.append(sku)
+            continue
+        listing_price, selling_price = base[sku]
+        special, rule = windows.get(sku, (None, None))
+        if special is not None:
+            price = max(special[3], Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)
+            source, source_id, source_name = 'SPECIAL_PRICE', special[2], special[4]
+        elif rule is not None:
+            _, _, pk, _, rule_type, value, percentage, name = rule
+            price = apply_rule(selling_price, rule_type, value, percentage)
+            source, source_id, source_name = 'PRICING_RULE', pk, name
+        else:
+            price, source, source_id, source_name = selling_price, 'PRICE', None, ''
+        prices.append({
+            'sku': sku,
+            'effective_price': price,
+            'selling_price': selling_price,
+            'listing_price': listing_price,
+            'source': source,
+            'source_id': source_id,
+            'source_name': source_name,
+        })
+    return prices, missing
+
+
+def record_saved(instance):
+    """Update the index with a saved rule or promotion once the write commits"""
+    model = type(instance)
+    pk = instance.pk
+
+    def update():
+        # Read back the stored row, so the index holds database values
+        fields = SPECIAL_FIELDS if model is SpecialPrice else RULE_FIELDS
+        get_index().update(model, pk, model.objects.filter(pk=pk, is_active=True).values_list(*fields).first())
+
+    transaction.on_commit(update)
+
+
+def record_deleted(instance):
+    """Drop a deleted rule or promotion from the index once the delete commits"""
+    model = type(instance)
+    pk = instance.pk
+    transaction.on_commit(lambda: get_index().update(model, pk))
+
+
+def invalidate():
+    """Reload the index everywhere, after writes that send no signals"""
+    transaction.on_commit(get_index().invalidate)
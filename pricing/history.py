@@ -0,0 +1,194 @@
+"""
+Price history.
+
+Every change to a product's ``Price`` and to its ``SpecialPrice`` rows is
+kept as a ``PriceHistory`` row holding the new values and the time they
+took effect (``valid_from``). Rows are change-only: a write that leaves the
+tracked values as they were (listing and selling price; special price,
+window and ``is_active``) adds nothing, and each row stays valid until the
+next row for the same source. A deleted price or promotion is closed by a
+row without a selling price.
+
+Saves and deletes are recorded by ``pricing.signals`` in the writing
+transaction, so a rolled back write leaves no history. A saved instance is
+compared with the values it was loaded with (see ``from_db`` on the
+models), so a save costs one prepared INSERT when it changed a tracked
+value and nothing otherwise; only instances that were not loaded from the
+database are compared with the history. Writers that send no signals
+record their own rows: the catalog import (compared in bulk),
+``repricing.reprice`` and the price scheduler.
+
+Both lookups walk the (sku, valid_from) index: ``price_at`` answers for one
+point in time, ``price_changes`` for a range.
+"""
+from django.db import connections, router
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import Price, PriceHistory, SpecialPrice
+
+CHUNK_SIZE = 1000
+
+PRICE = 'PRICE'
+SPECIAL_PRICE = 'SPECIAL_PRICE'
+
+# Fields of each source model a save is compared on
+SOURCE_FIELDS = {
+    Price: ('listing_price', 'selling_price'),
+    SpecialPrice: ('special_price', 'start_date', 'end_date', 'is_active'),
+}
+
+# Compared with a source's newest row to decide whether a write changed it
+TRACKED_FIELDS = ('listing_price', 'selling_price', 'start_date', 'end_date', 'is_active')
+COLUMNS = ('sku', 'source', 'source_id', *TRACKED_FIELDS, 'valid_from')
+
+
+def entry(instance, valid_from):
+    """Unsaved history row holding the current values of a Price or SpecialPrice"""
+    if isinstance(instance, Price):
+        return PriceHistory(
+            sku=instance.product_id, source=PRICE, listing_price=instance.listing_price,
+            selling_price=instance.selling_price, valid_from=valid_from,
+        )
+    return PriceHistory(
+        sku=instance.product_id, source=SPECIAL_PRICE, source_id=instance.pk,
+        selling_price=instance.special_price, start_date=instance.start_date, end_date=instance.end_date,
+        is_active=instance.is_active, valid_from=valid_from,
+    )
+
+
+def deleted_entry(instance, valid_from):
+    """Unsaved history row closing a deleted Price or SpecialPrice"""
+    if isinstance(instance, Price):
+        return PriceHistory(sku=instance.product_id, source=PRICE, valid_from=valid_from)
+    return PriceHistory(sku=instance.product_id, source=SPECIAL_PRICE, source_id=instance.pk, valid_from=valid_from)
+
+
+def record(entries, compare=True):
+    """
+    Insert ``entries``, the last one per source; with ``compare``, only
+    those whose values differ from their source's newest row. Returns the
+    number of rows written.
+    """
+    entries = list({_key(row): row for row in entries}.values())
+    if compare:
+        skus = sorted({row.sku for row in entries})
+        latest = {}
+        for start in range(0, len(skus), CHUNK_SIZE):
+            latest.update(_latest(skus[start:start + CHUNK_SIZE]))
+        entries = [
+            row for row in entries
+            if _key(row) not in latest or _values(latest[_key(row)]) != _values(row)
+        ]
+    if entries:
+        # The connection itself rather than the proxy, which costs a lookup per value
+        db = connections[router.db_for_write(PriceHistory)]
+        fields = [PriceHistory._meta.get_field(column) for column in COLUMNS]
+        values = [[field.get_db_prep_save(getattr(row, field.attname), db) for field in fields] for row in entries]
+        with db.cursor() as cursor:
+            cursor.executemany(_insert_sql(db), values)
+    return len(entries)
+
+
+def record_saved(instance, created=False):
+    """Record a saved Price or SpecialPrice, in the transaction that saved it"""
+    fields = SOURCE_FIELDS[type(instance)]
+    current = {field: instance._meta.get_field(field).to_python(getattr(instance, field)) for field in fields}
+    loaded = getattr(instance, '_loaded_values', None) or {}
+    if created:
+        compare = False
+    elif all(field in loaded for field in fields):
+        if all(loaded[field] == current[field] for field in fields):
+            return
+        compare = False
+    else:
+        # Not loaded from the database, so only its newest row can tell
+        compare = True
+    instance._loaded_values = {**loaded, **current}
+    # Price.last_updated is the time the row was written
+    record([entry(instance, getattr(instance, 'last_updated', None) or timezone.now())], compare=compare)
+
+
+def record_deleted(instance):
+    """Record a deleted Price or SpecialPrice, in the transaction that deleted it"""
+    record([deleted_entry(instance, timezone.now())])
+
+
+def price_at(sku, at):
+    """
+    The product's price row and the promotions in effect at ``at`` (active,
+    with ``at`` inside their window, lowest first), and the selling price
+    they add up to; ``None`` for what did not exist yet or had been deleted.
+    """
+    latest = _latest([sku], at)
+    price = latest.get((sku, PRICE, None))
+    if price is not None and price.selling_price is None:
+        price = None
+    promotions = sorted(
+        (
+            row for (_, source, _), row in latest.items()
+            if source == SPECIAL_PRICE and row.selling_price is not None
+            and row.is_active and row.start_date <= at < row.end_date
+        ),
+        key=lambda row: (row.selling_price, row.source_id),
+    )
+    if promotions:
+        selling_price = promotions[0].selling_price
+    else:
+        selling_price = price.selling_price if price is not None else None
+    return {'price': price, 'special_prices': promotions, 'selling_price': selling_price}
+
+
+def price_changes(sku, start, end):
+    """
+    History rows of the product between ``start`` and ``end``, oldest
+    first: the state of its price and promotions at ``start``, then every
+    change before ``end``. Each row carries ``valid_to``, when the next
+    change to the same source took effect, or ``None`` if it was still
+    valid at ``end``.
+    """
+    rows = [
+        row for row in _latest([sku], start).values()
+        # Deleted sources, and promotions over by then, have no bearing on the range
+        if row.selling_price is not None and (row.source == PRICE or row.end_date > start)
+    ]
+    rows += PriceHistory.objects.filter(sku=sku, valid_from__gt=start, valid_from__lt=end).order_by('valid_from', 'pk')
+    rows.sort(key=lambda row: (row.valid_from, row.pk))
+    next_change = {}
+    for row in reversed(rows):
+        row.valid_to = next_change.get(_key(row))
+        next_change[_key(row)] = row.valid_from
+    return rows
+
+
+def _insert_sql(db):
+    quote = db.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(COLUMNS))
+    return (
+        f"INSERT INTO {quote(PriceHistory._meta.db_table)} ({', '.join(quote(column) for column in COLUMNS)}) "
+        f"VALUES ({placeholders})"
+    )
+
+
+def _key(row):
+    return row.sku, row.source, row.source_id
+
+
+def _values(row):
+    return tuple(PriceHistory._meta.get_field(field).to_python(getattr(row, field)) for field in TRACKED_FIELDS)
+
+
+def _latest(skus, at=None):
+    """Newest row per source of ``skus``, as of ``at`` when given, keyed like ``_key``"""
+    rows = PriceHistory.objects.filter(sku__in=skus)
+    if at is not None:
+        rows = rows.filter(valid_from__lte=at)
+    rows = rows.annotate(
+        newest=Window(
+            RowNumber(),
+            partition_by=[F('sku'), F('source'), F('source_id')],
+            order_by=[F('valid_from').desc(), F('pk').desc()],
+        )
+    ).filter(newest=1).order_by()
+    return {_key(row): row for row in rows}
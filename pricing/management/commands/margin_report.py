@@ -0,0 +1,52 @@
+"""
+Management command to report per-unit margins across the catalog.
+"""
+import json
+
+from django.core.management.base import BaseCommand
+
+from pricing.margins import CHUNK_SIZE, FILTER_FIELDS, RANKINGS, WORST, margin_report
+
+
+class Command(BaseCommand):
+    help = 'Summarize per-unit margins of every price, with margin histograms and the worst SKUs'
+
+    def add_arguments(self, parser):
+        for field in FILTER_FIELDS:
+            parser.add_argument(f'--{field}', help=f'Only products of this {field}')
+        parser.add_argument('--worst', type=int, default=WORST, help=f'Worst SKUs to list (default: {WORST})')
+        parser.add_argument('--rank-by', choices=RANKINGS, default='margin', help='Ranking of the worst SKUs')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Price rows read per query')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+
+    def handle(self, *args, **options):
+        filters = {field: options[field] for field in FILTER_FIELDS if options[field]}
+        report = margin_report(
+            filters, worst=options['worst'], rank_by=options['rank_by'], chunk_size=options['chunk_size']
+        )
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{report['products']} products, {report['loss_making']} loss-making, "
+            f"{report['unpriced']} without a selling price"
+        )
+        self.stdout.write(
+            f"Total margin {report['total_margin']}, average {report['average_margin']}, "
+            f"{report['margin_percentage']}% of selling price"
+        )
+        for name, bins in report['histograms'].items():
+            self.stdout.write(f'\n{name}:')
+            widest = max(band['count'] for band in bins) or 1
+            for band in bins:
+                label = f"{'' if band['from'] is None else band['from']} .. {'' if band['to'] is None else band['to']}"
+                self.stdout.write(f"  {label:>14} {band['count']:>10} {'#' * round(40 * band['count'] / widest)}")
+        if report['worst']:
+            self.stdout.write(f"\nWorst {len(report['worst'])} by {options['rank_by']}:")
+            for row in report['worst']:
+                self.stdout.write(
+                    f"  {row['sku']}: margin {row['margin']} ({row['margin_percentage']}%) "
+                    f"at selling price {row['selling_price']}"
+                )
+        self.stdout.write(self.style.SUCCESS(f"Reported margins of {report['products']} products"))
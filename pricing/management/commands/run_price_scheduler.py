@@ -0,0 +1,38 @@
+"""
+Management command to switch special prices and pricing rules off as their
+windows end.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from pricing.schedule import PriceScheduler, get_config
+
+
+class Command(BaseCommand):
+    help = (
+        'Deactivate special prices and pricing rules when their window ends, '
+        'sleeping until the next end'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Apply what is due now and exit, e.g. from cron')
+
+    def handle(self, *args, **options):
+        scheduler = PriceScheduler(get_config())
+        counts = scheduler.start()
+        self.report(counts)
+        self.stdout.write(f'{scheduler.pending()} window ends scheduled')
+        try:
+            while not options['once']:
+                time.sleep(scheduler.seconds_until_next())
+                self.report(scheduler.tick())
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Deactivated {scheduler.counters['deactivated']}"))
+
+    def report(self, counts):
+        if counts['deactivated']:
+            self.stdout.write(f"{timezone.now():%Y-%m-%d %H:%M:%S}: {counts['deactivated']} deactivated")
@@ -0,0 +1,137 @@
+"""
+Catalog-wide margin analytics.
+
+Per-unit margin is ``selling_price - cost_price - commission - shipping_fee``,
+as ``Price.profit_margin`` computes it for one row. Here it is computed for
+every matching Price row at once: prices, costs, commission percentages and
+shipping fees are read ``chunk_size`` rows at a time with ``values_list``
+(cast to floats in the database, walking the primary key rather than
+using OFFSET), and each chunk is processed as NumPy arrays. Only running
+totals, histogram counts and the ``worst`` lowest-margin SKUs are kept
+between chunks, so memory use does not grow with the catalog.
+
+Floats are exact enough for a report; use ``Price.profit_margin`` where
+paise matter.
+"""
+import math
+
+import numpy as np
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from .models import Price
+
+CHUNK_SIZE = 100_000
+WORST = 50
+
+# Histogram bin edges; the outer bins are open-ended
+MARGIN_EDGES = [-math.inf, -500, -100, -50, 0, 50, 100, 250, 500, 1000, math.inf]
+MARGIN_PERCENTAGE_EDGES = [-math.inf, -50, -25, -10, 0, 5, 10, 15, 20, 25, 30, 40, 50, math.inf]
+
+RANKINGS = ('margin', 'margin_percentage')
+FILTER_FIELDS = ('brand', 'category', 'subcategory')
+
+
+def margin_report(filters=None, worst=WORST, rank_by='margin', chunk_size=CHUNK_SIZE):
+    """
+    Margin summary, histograms and the ``worst`` SKUs by ``rank_by`` for
+    Price rows whose product matches ``filters`` (``{'brand': ...}``).
+    """
+    if rank_by not in RANKINGS:
+        raise ValueError(f'rank_by must be one of {", ".join(RANKINGS)}')
+    queryset = Price.objects.filter(**{f'product__{field}': value for field, value in (filters or {}).items()})
+    rows = queryset.annotate(
+        **{f'{field}_value': Cast(F(field), FloatField())
+           for field in ('selling_price', 'cost_price', 'commission_percentage', 'shipping_fee')}
+    ).order_by('pk').values_list(
+        'pk', 'product_id', 'selling_price_value', 'cost_price_value',
+        'commission_percentage_value', 'shipping_fee_value',
+    )
+
+    totals = {'products': 0, 'loss_making': 0, 'unpriced': 0, 'selling_price': 0.0, 'margin': 0.0}
+    margin_counts = np.zeros(len(MARGIN_EDGES) - 1, dtype=np.int64)
+    percentage_counts = np.zeros(len(MARGIN_PERCENTAGE_EDGES) - 1, dtype=np.int64)
+    candidates = None
+    last_pk = 0
+    while True:
+        chunk = list(rows.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1][0]
+        _, skus, *columns = zip(*chunk)
+        skus = np.array(skus, dtype=object)
+        selling_price, cost_price, commission, shipping_fee = np.array(columns, dtype=np.float64)
+
+        margin = selling_price - cost_price - selling_price * commission / 100 - shipping_fee
+        # Exact margins have at most six decimals; drop float noise so a
+        # break-even price is not counted as loss-making
+        margin = np.round(margin, 6)
+        priced = selling_price > 0
+        percentage = np.full_like(margin, np.nan)
+        np.divide(margin * 100, selling_price, out=percentage, where=priced)
+
+        totals['products'] += len(chunk)
+        totals['loss_making'] += int(np.count_nonzero(margin < 0))
+        totals['unpriced'] += int(np.count_nonzero(~priced))
+        totals['selling_price'] += float(selling_price.sum())
+        totals['margin'] += float(margin.sum())
+        margin_counts += np.histogram(margin, MARGIN_EDGES)[0]
+        percentage_counts += np.histogram(percentage[priced], MARGIN_PERCENTAGE_EDGES)[0]
+
+        if worst:
+            chunk_candidates = (skus, selling_price, margin, percentage)
+            if candidates is not None:
+                chunk_candidates = tuple(np.concatenate(pair) for pair in zip(candidates, chunk_candidates))
+            candidates = _lowest(chunk_candidates, worst, rank_by)
+
+    worst_skus = []
+    if candidates is not None:
+        key = candidates[RANKINGS.index(rank_by) + 2]
+        for i in np.lexsort((candidates[0], np.nan_to_num(key, nan=np.inf))):
+            sku, selling_price, margin, percentage = (column[i] for column in candidates)
+            worst_skus.append({
+                'sku': sku,
+                'selling_price': round(float(selling_price), 2),
+                'margin': round(float(margin), 2),
+                'margin_percentage': None if math.isnan(percentage) else round(float(percentage), 2),
+                'loss_making': bool(margin < 0),
+            })
+
+    products = totals['products']
+    return {
+        'products': products,
+        'loss_making': totals['loss_making'],
+        'loss_making_share': round(totals['loss_making'] / products, 4) if products else None,
+        'unpriced': totals['unpriced'],
+        'total_margin': round(totals['margin'], 2),
+        'average_margin': round(totals['margin'] / products, 2) if products else None,
+        # Weighted by selling price, so it matches the margin on one unit of every SKU
+        'margin_percentage': (
+            round(totals['margin'] * 100 / totals['selling_price'], 2) if totals['selling_price'] else None
+        ),
+        'histograms': {
+            'margin': _bins(MARGIN_EDGES, margin_counts),
+            'margin_percentage': _bins(MARGIN_PERCENTAGE_EDGES, percentage_counts),
+        },
+        'worst': worst_skus,
+    }
+
+
+def _lowest(candidates, count, rank_by):
+    """The ``count`` candidates ranked lowest, in no particular order"""
+    key = np.nan_to_num(candidates[RANKINGS.index(rank_by) + 2], nan=np.inf)
+    if len(key) <= count:
+        return candidates
+    keep = np.argpartition(key, count - 1)[:count]
+    return tuple(column[keep] for column in candidates)
+
+
+def _bins(edges, counts):
+    return [
+        {
+            'from': None if math.isinf(low) else low,
+            'to': None if math.isinf(high) else high,
+            'count': int(count),
+        }
+        for low, high, count in zip(edges, edges[1:], counts)
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-18 16:15
+
+from django.db import migrations, models
+
+
+def seed_price_history(apps, schema_editor):
+    """One baseline row per existing price and promotion, valid from its last write"""
+    Price = apps.get_model('pricing', 'Price')
+    SpecialPrice = apps.get_model('pricing', 'SpecialPrice')
+    PriceHistory = apps.get_model('pricing', 'PriceHistory')
+    prices = [
+        PriceHistory(
+            sku=price.product_id, source='PRICE', listing_price=price.listing_price,
+            selling_price=price.selling_price, valid_from=price.last_updated,
+        )
+        for price in Price.objects.order_by('pk')
+    ]
+    PriceHistory.objects.bulk_create(prices, batch_size=1000)
+    special_prices = [
+        PriceHistory(
+            sku=special_price.product_id, source='SPECIAL_PRICE', source_id=special_price.pk,
+            selling_price=special_price.special_price, start_date=special_price.start_date,
+            end_date=special_price.end_date, is_active=special_price.is_active, valid_from=special_price.created_at,
+        )
+        for special_price in SpecialPrice.objects.order_by('pk')
+    ]
+    PriceHistory.objects.bulk_create(special_prices, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pricing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sku', models.CharField(max_length=100)),
+                ('source', models.CharField(choices=[('PRICE', 'Price'), ('SPECIAL_PRICE', 'Special Price')], max_length=20)),
+                ('source_id', models.BigIntegerField(blank=True, null=True)),
+                ('listing_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('selling_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('start_date', models.DateTimeField(blank=True, null=True)),
+                ('end_date', models.DateTimeField(blank=True, null=True)),
+                ('is_active', models.BooleanField(blank=True, null=True)),
+                ('valid_from', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'price history',
+                'ordering': ['sku', 'valid_from'],
+                'indexes': [models.Index(fields=['sku', 'valid_from'], name='price_history_sku_idx')],
+            },
+        ),
+        migrations.RunPython(seed_price_history, migrations.RunPython.noop),
+    ]
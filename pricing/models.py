@@ -42,6 +42,13 @@ class Price(models.Model):
     def __str__(self):
         return f"Pricing for {self.product.sku}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # So saves that leave the prices alone add nothing to the price history
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     @property
     def profit_margin(self):
         """Calculate profit margin"""
@@ -64,3 +71,39 @@ class SpecialPrice(models.Model):
         
     def __str__(self):
         return f"{self.promotion_name} for {self.product.sku}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # So saves that leave the promotion alone add nothing to the price history
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class PriceHistory(models.Model):
+    """Change-only record of a product's price or one of its special prices"""
+    SOURCE_CHOICES = [
+        ('PRICE', 'Price'),
+        ('SPECIAL_PRICE', 'Special Price'),
+    ]
+    
+    sku = models.CharField(max_length=100)  # Not a foreign key, so history outlives the product
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    source_id = models.BigIntegerField(null=True, blank=True)  # SpecialPrice id; null for the product's Price
+    listing_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    # The special price for promotions; null once the source is deleted
+    selling_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    start_date = models.DateTimeField(null=True, blank=True)
+    end_date = models.DateTimeField(null=True, blank=True)
+    is_active = models.BooleanField(null=True, blank=True)
+    valid_from = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['sku', 'valid_from']
+        verbose_name_plural = 'price history'
+        indexes = [
+            models.Index(fields=['sku', 'valid_from'], name='price_history_sku_idx'),
+        ]
+        
+    def __str__(self):
+        return f"{self.source} {self.sku} from {self.valid_from}: {self.selling_price}"
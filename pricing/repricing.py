@@ -0,0 +1,153 @@
+"""
+Set-based repricing.
+
+``reprice`` changes the selling price of every Price row matching a
+product filter with one UPDATE: the new price is an expression over
+``selling_price`` (a percentage, then an amount, then rounding down to a
+price point such as x.99 or x9), clamped between zero and the listing
+price, and ``discount_percentage`` is recomputed from the same expression
+in the same statement. Rows whose price would not change are not written;
+the new prices are added to the price history in the same transaction.
+
+``preview`` runs the same expressions in a SELECT instead, yielding the
+before and after values row by row for a dry run.
+"""
+import json
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Floor, Greatest, Least, Round
+from django.utils import timezone
+
+from inventory import cache
+
+from . import history
+from .models import Price, PriceHistory
+
+CHUNK_SIZE = 2000
+CENT = Decimal('0.01')
+
+# Lines are grouped into blocks of about this many characters so the
+# server writes a few large chunks instead of one per line
+BLOCK_SIZE = 64 * 1024
+
+PRICE = DecimalField(max_digits=10, decimal_places=2)
+PERCENTAGE = DecimalField(max_digits=5, decimal_places=2)
+
+PREVIEW_COLUMNS = [
+    'sku', 'selling_price', 'new_selling_price', 'discount_percentage', 'new_discount_percentage',
+]
+
+
+def discount_percentage(listing_price, selling_price):
+    """Discount of ``selling_price`` off ``listing_price``, in percent rounded to two places"""
+    if listing_price <= 0:
+        return Decimal('0.00')
+    discount = (Decimal(listing_price) - Decimal(selling_price)) * 100 / Decimal(listing_price)
+    return discount.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def price_queryset(brand=None, category=None, skus=None):
+    """Price rows of products matching every given filter: lists of brands, categories and SKUs"""
+    queryset = Price.objects.all()
+    if brand:
+        queryset = queryset.filter(product__brand__in=brand)
+    if category:
+        queryset = queryset.filter(product__category__in=category)
+    if skus:
+        queryset = queryset.filter(product_id__in=skus)
+    return queryset
+
+
+def new_price(percent=None, amount=None, price_point=None, price_point_step=Decimal('1')):
+    """
+    Expression for the adjusted selling price: ``percent`` percent more (or
+    less, when negative), then ``amount`` more, then rounded down to the
+    nearest price ending in ``price_point`` per ``price_point_step`` (0.99
+    per 1 gives x.99, 9 per 10 gives x9).
+    """
+    price = F('selling_price')
+    if percent is not None:
+        price = price * Value(1 + Decimal(percent) / 100, output_field=PRICE)
+    if amount is not None:
+        price = price + Value(Decimal(amount), output_field=PRICE)
+    if price_point is not None:
+        point = Value(Decimal(price_point), output_field=PRICE)
+        step = Value(Decimal(price_point_step), output_field=PRICE)
+        price = Floor((price - point) / step, output_field=PRICE) * step + point
+    price = Round(price, 2, output_field=PRICE)
+    return Least(Greatest(price, Value(Decimal('0.00'), output_field=PRICE)), F('listing_price'), output_field=PRICE)
+
+
+def new_discount(price):
+    """Expression for the discount of ``price`` off the listing price, as ``discount_percentage`` stores it"""
+    return Case(
+        When(listing_price__gt=0, then=Round(
+            (F('listing_price') - price) * Value(Decimal('100'), output_field=PRICE) / F('listing_price'),
+            2, output_field=PERCENTAGE,
+        )),
+        default=Value(Decimal('0.00'), output_field=PERCENTAGE),
+        output_field=PERCENTAGE,
+    )
+
+
+def reprice(queryset, **adjustment):
+    """Apply ``adjustment`` (see ``new_price``) to ``queryset`` in one UPDATE; returns the rows changed"""
+    price = new_price(**adjustment)
+    changed = queryset.exclude(selling_price=price)
+    now = timezone.now()
+    with transaction.atomic():
+        # For the product cache and the price history
+        rows = list(
+            changed.select_for_update(of=('self',)).annotate(new_selling_price=price)
+            .values_list('product_id', 'listing_price', 'new_selling_price')
+        )
+        updated = changed.update(selling_price=price, discount_percentage=new_discount(price), last_updated=now)
+        # Every row changed, so there is nothing to compare
+        history.record(
+            [
+                PriceHistory(
+                    sku=sku, source=history.PRICE, listing_price=listing_price,
+                    selling_price=selling_price.quantize(CENT), valid_from=now,
+                )
+                for sku, listing_price, selling_price in rows
+            ],
+            compare=False,
+        )
+        skus = [sku for sku, _, _ in rows]
+        transaction.on_commit(lambda: cache.invalidate(*skus))
+    return updated
+
+
+def preview(queryset, chunk_size=CHUNK_SIZE, **adjustment):
+    """Yield ``PREVIEW_COLUMNS`` tuples for the rows ``reprice`` would change, by SKU"""
+    price = new_price(**adjustment)
+    rows = (
+        queryset.exclude(selling_price=price)
+        .annotate(new_selling_price=price, new_discount_percentage=new_discount(price))
+        .order_by('product_id')
+        .values_list('product_id', 'selling_price', 'new_selling_price',
+                     'discount_percentage', 'new_discount_percentage')
+        .iterator(chunk_size=chunk_size)
+    )
+    # Computed columns can come back with more places than the stored ones
+    return (
+        (sku, selling_price, price_after.quantize(CENT), discount, discount_after.quantize(CENT))
+        for sku, selling_price, price_after, discount, discount_after in rows
+    )
+
+
+def stream_preview(rows):
+    """Yield NDJSON text, one line per previewed row"""
+    block, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(PREVIEW_COLUMNS, row)), cls=DjangoJSONEncoder) + '\n'
+        block.append(line)
+        size += len(line)
+        if size >= BLOCK_SIZE:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
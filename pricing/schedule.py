@@ -0,0 +1,224 @@
+"""
+Expiry schedule of special prices and pricing rules.
+
+``is_active`` is the operator's switch, and a row's window decides when an
+active row applies: the effective-price engine and the price history only
+count a promotion or rule between its ``start_date`` and ``end_date``, so
+nothing has to be switched on when a window starts. The
+``run_price_scheduler`` command switches rows off once their window has
+ended, so expired promotions and rules no longer show as active.
+``PriceScheduler`` loads the upcoming end boundaries once into a heap and
+sleeps until the next one is due; due boundaries are flipped with one
+guarded UPDATE per model (promotions are first locked and read with the
+same guard, to add them to the price history), so a row is only switched
+off once its window has ended:
+
+- a promotion paused by hand stays paused, and one activated by hand before
+  its window starts applies from its start;
+- one whose window is moved later before it ends stays on until the new end;
+- one switched back on after its end is switched off again at the next tick.
+
+Saves publish the changed row to a change feed in the Django cache named
+by ``PRICE_SCHEDULER_CONFIG['CACHE_ALIAS']`` once they commit (see
+``pricing.signals``): a sequence counter, and one key per change. The
+scheduler polls the counter every ``POLL_INTERVAL`` seconds and reads only
+the changed rows; when changes are missing (evicted, or written while the
+counter was reset) it reloads every boundary. The cache must be shared
+between the web processes and the scheduler; a full reload every
+``RELOAD_INTERVAL`` seconds covers writes it cannot see.
+"""
+import heapq
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from . import effective, history
+from .models import PricingRule, SpecialPrice
+
+DEFAULTS = {
+    'CACHE_ALIAS': 'default',
+    'POLL_INTERVAL': 1,
+    'CHANGE_TTL': 3600,
+    'RELOAD_INTERVAL': 3600,
+}
+
+MODELS = {model._meta.label: model for model in (SpecialPrice, PricingRule)}
+CHUNK_SIZE = 1000
+SEQUENCE_KEY = 'pricing:schedule:sequence'
+
+
+def get_config():
+    """``PRICE_SCHEDULER_CONFIG`` with defaults filled in"""
+    return {**DEFAULTS, **getattr(settings, 'PRICE_SCHEDULER_CONFIG', {})}
+
+
+def change_key(sequence):
+    return f'pricing:schedule:change:{sequence}'
+
+
+def record_change(instance):
+    """Publish a saved rule or promotion to the scheduler once the write commits"""
+    label = instance._meta.label
+    pk = instance.pk
+    transaction.on_commit(lambda: publish(label, pk))
+
+
+def publish(label, pk):
+    config = get_config()
+    shared = caches[config['CACHE_ALIAS']]
+    try:
+        sequence = shared.incr(SEQUENCE_KEY)
+    except ValueError:
+        # Missing or evicted: a new counter the scheduler cannot follow, so it reloads
+        shared.add(SEQUENCE_KEY, random.getrandbits(48), None)
+        return
+    shared.set(change_key(sequence), (label, pk), config['CHANGE_TTL'])
+
+
+class PriceScheduler:
+    """Heap of upcoming window ends, flipped off as they come due"""
+
+    def __init__(self, config=None):
+        self.config = {**DEFAULTS, **(config or {})}
+        self._heap = []  # (end, model label, pk)
+        self._ends = {}  # (model label, pk): end
+        self._sequence = None
+        self._loaded_at = None
+        self._last_tick = None
+        self.counters = dict.fromkeys(('loads', 'changes', 'deactivated'), 0)
+
+    @property
+    def shared(self):
+        return caches[self.config['CACHE_ALIAS']]
+
+    def start(self, now=None):
+        """
+        Load the schedule and switch off the rows whose window ended while
+        no scheduler ran. Returns the flip counts.
+        """
+        now = now or timezone.now()
+        self.load(now)
+        counts = {'deactivated': 0}
+        for model in MODELS.values():
+            counts['deactivated'] += _deactivate(model.objects.filter(is_active=True, end_date__lte=now), now)
+        self._flipped(counts, now)
+        return counts
+
+    def load(self, now=None, since=None):
+        """Read every window that had not ended by ``since`` (``now`` by default)"""
+        now = now or timezone.now()
+        since = since or now
+        # Read before the rows, so changes published during the load are replayed
+        self._sequence = self._current_sequence()
+        self._heap = []
+        self._ends = {}
+        for label, model in MODELS.items():
+            rows = model.objects.filter(end_date__gt=since).order_by().values_list('pk', 'end_date')
+            for pk, end in rows:
+                self._add(label, pk, end)
+        self._loaded_at = time.monotonic()
+        self.counters['loads'] += 1
+
+    def tick(self, now=None):
+        """Pick up published changes and flip the ends that are due; returns the flip counts"""
+        now = now or timezone.now()
+        if time.monotonic() - self._loaded_at >= self.config['RELOAD_INTERVAL']:
+            # From the last tick, so ends that came due since are kept
+            self.load(now, since=self._last_tick)
+        else:
+            self._apply_changes(now)
+
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            end, label, pk = heapq.heappop(self._heap)
+            # Superseded by a later change to the row's end
+            if self._ends.get((label, pk)) != end:
+                continue
+            del self._ends[(label, pk)]
+            due.setdefault(label, set()).add(pk)
+
+        counts = {'deactivated': 0}
+        for label, pks in due.items():
+            model = MODELS[label]
+            pks = sorted(pks)
+            for start in range(0, len(pks), CHUNK_SIZE):
+                rows = model.objects.filter(pk__in=pks[start:start + CHUNK_SIZE])
+                counts['deactivated'] += _deactivate(rows.filter(is_active=True, end_date__lte=now), now)
+        self._flipped(counts, now)
+        return counts
+
+    def seconds_until_next(self, now=None):
+        """Seconds to sleep before the next due end or change poll"""
+        now = now or timezone.now()
+        wait = self.config['POLL_INTERVAL']
+        if self._heap:
+            wait = min(wait, (self._heap[0][0] - now).total_seconds())
+        return max(wait, 0)
+
+    def pending(self):
+        """Ends still scheduled"""
+        return len(self._heap)
+
+    def _add(self, label, pk, end):
+        self._ends[(label, pk)] = end
+        heapq.heappush(self._heap, (end, label, pk))
+
+    def _apply_changes(self, now):
+        sequence = self._current_sequence()
+        if sequence == self._sequence:
+            return
+        if self._sequence is None or sequence < self._sequence:
+            return self.load(now, since=self._last_tick)
+        keys = [change_key(number) for number in range(self._sequence + 1, sequence + 1)]
+        changes = self.shared.get_many(keys)
+        if len(changes) < len(keys):
+            return self.load(now, since=self._last_tick)
+
+        written = set(changes.values())
+        for label, model in MODELS.items():
+            pks = sorted(pk for (changed_label, pk) in written if changed_label == label)
+            for start in range(0, len(pks), CHUNK_SIZE):
+                ends = dict(
+                    model.objects.filter(pk__in=pks[start:start + CHUNK_SIZE]).order_by().values_list('pk', 'end_date')
+                )
+                for pk in pks[start:start + CHUNK_SIZE]:
+                    self._ends.pop((label, pk), None)
+                    if pk in ends:
+                        self._add(label, pk, ends[pk])
+        self.counters['changes'] += len(written)
+        self._sequence = sequence
+
+    def _current_sequence(self):
+        sequence = self.shared.get(SEQUENCE_KEY)
+        if sequence is None:
+            self.shared.add(SEQUENCE_KEY, random.getrandbits(48), None)
+            sequence = self.shared.get(SEQUENCE_KEY)
+        return sequence
+
+    def _flipped(self, counts, now):
+        self._last_tick = now
+        self.counters['deactivated'] += counts['deactivated']
+        if counts['deactivated']:
+            effective.invalidate()
+
+
+def _deactivate(rows, now):
+    """Switch ``rows`` off; returns how many were switched"""
+    if rows.model is PricingRule:
+        # QuerySet.update skips auto_now
+        return rows.update(is_active=False, updated_at=now)
+    # Promotions go to the price history, so the flipped rows are read first
+    with transaction.atomic():
+        flipped = list(rows.select_for_update())
+        for start in range(0, len(flipped), CHUNK_SIZE):
+            SpecialPrice.objects.filter(
+                pk__in=[row.pk for row in flipped[start:start + CHUNK_SIZE]]
+            ).update(is_active=False)
+        for row in flipped:
+            row.is_active = False
+        history.record([history.entry(row, now) for row in flipped], compare=False)
+    return len(flipped)
@@ -1,5 +1,7 @@
+from decimal import Decimal
+
 from rest_framework import serializers
-from .models import PricingRule, Price, SpecialPrice
+from .models import PricingRule, Price, SpecialPrice, PriceHistory
 
 
 class PricingRuleSerializer(serializers.ModelSerializer):
@@ -34,3 +36,80 @@ class SpecialPriceSerializer(serializers.ModelSerializer):
             'id', 'product', 'special_price', 'start_date', 'end_date',
             'promotion_name', 'is_active', 'created_at'
         ]
+
+
+class PriceHistorySerializer(serializers.ModelSerializer):
+    """Serializer for Price History rows"""
+    valid_to = serializers.DateTimeField(read_only=True, allow_null=True, required=False)
+    
+    class Meta:
+        model = PriceHistory
+        fields = [
+            'source', 'source_id', 'listing_price', 'selling_price', 'start_date', 'end_date',
+            'is_active', 'valid_from', 'valid_to'
+        ]
+
+
+class EffectivePriceRequestSerializer(serializers.Serializer):
+    """Serializer for a batch of SKUs to resolve effective prices for"""
+    skus = serializers.ListField(child=serializers.CharField(max_length=100), allow_empty=False)
+    at = serializers.DateTimeField(required=False)
+    
+    def validate_skus(self, value):
+        if len(value) > 10000:
+            raise serializers.ValidationError('At most 10000 SKUs per request.')
+        return value
+
+
+class MarginReportSerializer(serializers.Serializer):
+    """Serializer for margin report query parameters"""
+    brand = serializers.CharField(required=False, max_length=100)
+    category = serializers.CharField(required=False, max_length=100)
+    subcategory = serializers.CharField(required=False, max_length=100)
+    worst = serializers.IntegerField(required=False, default=50, min_value=0, max_value=1000)
+    rank_by = serializers.ChoiceField(choices=['margin', 'margin_percentage'], required=False, default='margin')
+
+
+class BulkRepriceSerializer(serializers.Serializer):
+    """Serializer for a bulk repricing: a product filter and a price adjustment"""
+    brand = serializers.ListField(child=serializers.CharField(max_length=100), required=False, allow_empty=False)
+    category = serializers.ListField(child=serializers.CharField(max_length=100), required=False, allow_empty=False)
+    skus = serializers.ListField(child=serializers.CharField(max_length=100), required=False, allow_empty=False)
+    percent = serializers.DecimalField(max_digits=5, decimal_places=2, required=False, min_value=Decimal('-100'))
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    price_point = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, min_value=Decimal('0'))
+    price_point_step = serializers.DecimalField(
+        max_digits=10, decimal_places=2, required=False, default=Decimal('1'), min_value=Decimal('0.01')
+    )
+    dry_run = serializers.BooleanField(required=False, default=False)
+    
+    def validate_skus(self, value):
+        if len(value) > 10000:
+            raise serializers.ValidationError('At most 10000 SKUs per request.')
+        return value
+    
+    def validate(self, data):
+        if not any(field in data for field in ('brand', 'category', 'skus')):
+            raise serializers.ValidationError('Give at least one of brand, category or skus.')
+        if not any(field in data for field in ('percent', 'amount', 'price_point')):
+            raise serializers.ValidationError('Give at least one of percent, amount or price_point.')
+        if 'price_point' in data and data['price_point'] >= data['price_point_step']:
+            raise serializers.ValidationError({'price_point': 'Must be less than price_point_step.'})
+        return data
+
+
+class PriceHistoryQuerySerializer(serializers.Serializer):
+    """Serializer for price history query parameters: a point in time, or a range"""
+    sku = serializers.CharField(max_length=100)
+    at = serializers.DateTimeField(required=False)
+    start = serializers.DateTimeField(required=False)
+    end = serializers.DateTimeField(required=False)
+    
+    def validate(self, data):
+        if 'at' in data and ('start' in data or 'end' in data):
+            raise serializers.ValidationError('Give either at, or start and end.')
+        if 'at' not in data and 'start' not in data:
+            raise serializers.ValidationError('Give at, or start (and optionally end).')
+        if 'end' in data and 'start' in data and data['end'] <= data['start']:
+            raise serializers.ValidationError({'end': 'Must be after start.'})
+        return data
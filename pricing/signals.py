@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import effective, history, schedule
+from .models import Price, PricingRule, SpecialPrice
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_save, sender=SpecialPrice)
+def index_saved_window(sender, instance, raw=False, **kwargs):
+    """Refresh the effective-price index after a rule or promotion is saved"""
+    if raw:
+        effective.invalidate()
+        return
+    effective.record_saved(instance)
+
+
+@receiver(post_save, sender=PricingRule)
+@receiver(post_save, sender=SpecialPrice)
+def schedule_saved_window(sender, instance, raw=False, **kwargs):
+    """Tell the price scheduler about a rule or promotion's new window"""
+    if not raw:
+        schedule.record_change(instance)
+
+
+@receiver(post_delete, sender=PricingRule)
+@receiver(post_delete, sender=SpecialPrice)
+def unindex_deleted_window(sender, instance, **kwargs):
+    """Drop a deleted rule or promotion from the effective-price index"""
+    effective.record_deleted(instance)
+
+
+@receiver(post_save, sender=Price)
+@receiver(post_save, sender=SpecialPrice)
+def record_saved_price(sender, instance, created=False, **kwargs):
+    """Add a price or promotion's new values to the price history"""
+    history.record_saved(instance, created)
+
+
+@receiver(post_delete, sender=Price)
+@receiver(post_delete, sender=SpecialPrice)
+def record_deleted_price(sender, instance, **kwargs):
+    """Close a deleted price or promotion in the price history"""
+    history.record_deleted(instance)
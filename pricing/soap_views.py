@@ -3,6 +3,8 @@ from spyne.protocol.soap import Soap11
 from spyne.server.django import DjangoApplication
 from django.views.decorators.csrf import csrf_exempt
 from .models import Price, PricingRule, SpecialPrice
+from .repricing import discount_percentage
+from inventory import cache
 from inventory.models import Product
 
 
@@ -13,7 +15,7 @@ class PricingService(ServiceBase):
     def get_price(ctx, sku):
         """Get price details for a product"""
         try:
-            product = Product.objects.get(sku=sku)
+            product = cache.get_product(sku=sku)
             price = product.price
             return f"SKU: {sku}, Listing Price: {price.listing_price}, Selling Price: {price.selling_price}, Discount: {price.discount_percentage}%"
         except Product.DoesNotExist:
@@ -28,11 +30,7 @@ class PricingService(ServiceBase):
             product = Product.objects.get(sku=sku)
             price = product.price
             price.selling_price = new_price
-            
-            # Recalculate discount percentage
-            if price.listing_price > 0:
-                price.discount_percentage = ((price.listing_price - new_price) / price.listing_price) * 100
-            
+            price.discount_percentage = discount_percentage(price.listing_price, new_price)
             price.save()
             return f"Selling price updated for {sku}. New price: {new_price}, Discount: {price.discount_percentage}%"
         except Product.DoesNotExist:
@@ -44,7 +42,7 @@ class PricingService(ServiceBase):
     def get_profit_margin(ctx, sku):
         """Calculate profit margin for a product"""
         try:
-            product = Product.objects.get(sku=sku)
+            product = cache.get_product(sku=sku)
             price = product.price
             margin = price.profit_margin
             return f"SKU: {sku}, Profit Margin: {margin}"
@@ -57,7 +55,7 @@ class PricingService(ServiceBase):
     def list_special_prices(ctx, sku):
         """List all special prices for a product"""
         try:
-            product = Product.objects.get(sku=sku)
+            product = cache.get_product(sku=sku)
             special_prices = product.special_prices.filter(is_active=True)
             
             if special_prices.exists():
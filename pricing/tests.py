@@ -1,3 +1,490 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Product
+from .effective import apply_rule, effective_prices, get_index
+from . import history
+from .margins import margin_report
+from .repricing import preview, price_queryset, reprice
+from .schedule import PriceScheduler
+from .models import Price, PriceHistory, PricingRule, SpecialPrice
+
+
+def create_priced_product(sku, selling_price='800.00', **kwargs):
+    """Create a product with a Price row for tests"""
+    product = Product.objects.create(
+        sku=sku, fsn=f'FSN-{sku}', product_name=f'Product {sku}', brand='Test Brand',
+        category='Electronics', mrp=Decimal('1000.00'), hsn_code='HSN1000', tax_percentage=Decimal('18.00'),
+    )
+    Price.objects.create(
+        product=product, listing_price=Decimal('1000.00'), selling_price=Decimal(selling_price),
+        cost_price=Decimal('500.00'), commission_percentage=Decimal('10.00'), **kwargs
+    )
+    return product
+
+
+class EffectivePriceTests(TestCase):
+    """Effective prices combine Price, PricingRule and SpecialPrice by precedence"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.now = timezone.now()
+        self.product = create_priced_product('SKU-1')
+        create_priced_product('SKU-2')
+
+    def window(self, start_days=-1, end_days=1):
+        return {'start_date': self.now + timedelta(days=start_days), 'end_date': self.now + timedelta(days=end_days)}
+
+    def resolve(self, sku='SKU-1', at=None):
+        prices, _ = effective_prices([sku], at or self.now)
+        return prices[0]['effective_price'], prices[0]['source']
+
+    def test_apply_rule(self):
+        base = Decimal('800.00')
+        self.assertEqual(apply_rule(base, 'DISCOUNT', Decimal('50'), Decimal('10')), Decimal('720.00'))
+        self.assertEqual(apply_rule(base, 'DISCOUNT', Decimal('50')), Decimal('750.00'))
+        self.assertEqual(apply_rule(base, 'MARKUP', Decimal('0'), Decimal('12.5')), Decimal('900.00'))
+        self.assertEqual(apply_rule(base, 'FIXED', Decimal('699.00')), Decimal('699.00'))
+        self.assertEqual(apply_rule(base, 'DISCOUNT', Decimal('900')), Decimal('0.00'))
+
+    def test_precedence(self):
+        self.assertEqual(self.resolve(), (Decimal('800.00'), 'PRICE'))
+        PricingRule.objects.create(product=self.product, rule_name='Old', rule_type='FIXED',
+                                   value=Decimal('650'), **self.window())
+        PricingRule.objects.create(product=self.product, rule_name='New', rule_type='DISCOUNT',
+                                   value=Decimal('0'), percentage=Decimal('10'), **self.window())
+        get_index().invalidate()
+        self.assertEqual(self.resolve(), (Decimal('720.00'), 'PRICING_RULE'))
+
+        SpecialPrice.objects.create(product=self.product, special_price=Decimal('700'),
+                                    promotion_name='Sale', **self.window())
+        SpecialPrice.objects.create(product=self.product, special_price=Decimal('690'),
+                                    promotion_name='Flash', **self.window())
+        get_index().invalidate()
+        self.assertEqual(self.resolve(), (Decimal('690.00'), 'SPECIAL_PRICE'))
+        # Outside every window, and before the promotions started
+        self.assertEqual(self.resolve(at=self.now + timedelta(days=2)), (Decimal('800.00'), 'PRICE'))
+        self.assertEqual(self.resolve(at=self.now - timedelta(days=2)), (Decimal('800.00'), 'PRICE'))
+
+    def test_inactive_windows_are_ignored(self):
+        SpecialPrice.objects.create(product=self.product, special_price=Decimal('600'),
+                                    promotion_name='Paused', is_active=False, **self.window())
+        self.assertEqual(self.resolve(), (Decimal('800.00'), 'PRICE'))
+
+    def test_writes_refresh_the_index(self):
+        self.resolve()
+        loads = get_index().stats()['loads']
+        with self.captureOnCommitCallbacks(execute=True):
+            special = SpecialPrice.objects.create(product=self.product, special_price=Decimal('600'),
+                                                  promotion_name='Sale', **self.window())
+        self.assertEqual(self.resolve(), (Decimal('600.00'), 'SPECIAL_PRICE'))
+        with self.captureOnCommitCallbacks(execute=True):
+            special.is_active = False
+            special.save()
+        self.assertEqual(self.resolve(), (Decimal('800.00'), 'PRICE'))
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = PricingRule.objects.create(product=self.product, rule_name='Markup', rule_type='MARKUP',
+                                              value=Decimal('25'), **self.window())
+        self.assertEqual(self.resolve(), (Decimal('825.00'), 'PRICING_RULE'))
+        with self.captureOnCommitCallbacks(execute=True):
+            rule.delete()
+        self.assertEqual(self.resolve(), (Decimal('800.00'), 'PRICE'))
+        # Updated in place rather than reloaded
+        self.assertEqual(get_index().stats()['loads'], loads)
+
+    def test_other_processes_reload_on_a_new_generation(self):
+        self.resolve()
+        SpecialPrice.objects.create(product=self.product, special_price=Decimal('600'),
+                                    promotion_name='Sale', **self.window())
+        self.assertEqual(self.resolve(), (Decimal('800.00'), 'PRICE'))
+        cache.incr('pricing:effective:generation')
+        self.assertEqual(self.resolve(), (Decimal('600.00'), 'SPECIAL_PRICE'))
+
+    def test_batch_endpoint(self):
+        SpecialPrice.objects.create(product=self.product, special_price=Decimal('600'),
+                                    promotion_name='Sale', **self.window())
+        get_index().invalidate()
+        get_index().lookup([], self.now)
+        # Price rows in one query; the index is already loaded
+        with self.assertNumQueries(1):
+            response = self.client.post('/pricing/api/prices/effective/', {
+                'skus': ['SKU-1', 'SKU-2', 'SKU-9', 'SKU-1'],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['sku'], row['effective_price'], row['source']) for row in response.data['prices']], [
+            ('SKU-1', '600.00', 'SPECIAL_PRICE'), ('SKU-2', '800.00', 'PRICE'),
+        ])
+        self.assertEqual(response.data['prices'][0]['source_name'], 'Sale')
+        self.assertEqual(response.data['missing'], ['SKU-9'])
+
+        at = (self.now + timedelta(days=3)).isoformat()
+        response = self.client.post('/pricing/api/prices/effective/', {'skus': ['SKU-1'], 'at': at}, format='json')
+        self.assertEqual(response.data['prices'][0]['effective_price'], '800.00')
+        response = self.client.post('/pricing/api/prices/effective/', {'skus': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class MarginReportTests(TestCase):
+    """Catalog-wide margins match Price.profit_margin row by row"""
+
+    def setUp(self):
+        self.client = APIClient()
+        # Margins: 800 - 500 - 80 = 220, 520 - 500 - 52 = -32, 0 - 500 = -500
+        create_priced_product('SKU-1')
+        create_priced_product('SKU-2', selling_price='520.00')
+        create_priced_product('SKU-3', selling_price='0.00')
+        Product.objects.filter(sku='SKU-3').update(brand='Other Brand')
+
+    def test_report_matches_profit_margin(self):
+        # Chunks smaller than the catalog, and fewer worst SKUs than products
+        report = margin_report(worst=2, chunk_size=2)
+        self.assertEqual((report['products'], report['loss_making'], report['unpriced']), (3, 2, 1))
+        self.assertAlmostEqual(report['total_margin'], float(sum(price.profit_margin for price in Price.objects.all())))
+        self.assertEqual(report['margin_percentage'], round((220 - 32 - 500) * 100 / 1320, 2))
+        self.assertEqual(
+            [(row['sku'], row['margin']) for row in report['worst']], [('SKU-3', -500.0), ('SKU-2', -32.0)]
+        )
+        self.assertIsNone(report['worst'][0]['margin_percentage'])
+        self.assertTrue(report['worst'][1]['loss_making'])
+        self.assertEqual(sum(band['count'] for band in report['histograms']['margin']), 3)
+        # Products without a selling price have no margin percentage
+        self.assertEqual(sum(band['count'] for band in report['histograms']['margin_percentage']), 2)
+
+        by_percentage = margin_report(rank_by='margin_percentage')
+        self.assertEqual([row['sku'] for row in by_percentage['worst']], ['SKU-2', 'SKU-1', 'SKU-3'])
+
+    def test_endpoint_and_command(self):
+        response = self.client.get('/pricing/api/prices/margins/', {'brand': 'Test Brand', 'worst': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['products'], 2)
+        self.assertEqual([row['sku'] for row in response.data['worst']], ['SKU-2'])
+        response = self.client.get('/pricing/api/prices/margins/', {'rank_by': 'profit'})
+        self.assertEqual(response.status_code, 400)
+
+        out = StringIO()
+        call_command('margin_report', '--category', 'Electronics', '--json', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['loss_making'], 2)
+        out = StringIO()
+        call_command('margin_report', stdout=out)
+        self.assertIn('Reported margins of 3 products', out.getvalue())
+
+
+class PriceSchedulerTests(TestCase):
+    """Promotions and rules are switched off exactly when their window ends"""
+
+    def setUp(self):
+        cache.clear()
+        self.now = timezone.now()
+        self.product = create_priced_product('SKU-1')
+
+    def promotion(self, start_hours, end_hours, is_active=False, name='Sale'):
+        return SpecialPrice.objects.create(
+            product=self.product, special_price=Decimal('600'), promotion_name=name, is_active=is_active,
+            start_date=self.now + timedelta(hours=start_hours), end_date=self.now + timedelta(hours=end_hours),
+        )
+
+    def active(self, row):
+        row.refresh_from_db()
+        return row.is_active
+
+    def test_flips_at_window_end(self):
+        upcoming = self.promotion(1, 2, is_active=True)
+        rule = PricingRule.objects.create(
+            product=self.product, rule_name='Weekend', rule_type='FIXED', value=Decimal('700'),
+            start_date=self.now - timedelta(hours=1), end_date=self.now + timedelta(hours=1),
+        )
+        scheduler = PriceScheduler()
+        scheduler.start(self.now)
+        self.assertEqual(scheduler.pending(), 2)
+        # Left on before its start, and applied from it by its window
+        self.assertTrue(self.active(upcoming))
+        self.assertEqual(effective_prices(['SKU-1'], self.now)[0][0]['source'], 'PRICING_RULE')
+        self.assertEqual(effective_prices(['SKU-1'], self.now + timedelta(hours=1.5))[0][0]['source'], 'SPECIAL_PRICE')
+
+        # Nothing due and nothing published: no queries
+        with self.assertNumQueries(0):
+            self.assertEqual(scheduler.tick(self.now + timedelta(minutes=59)), {'deactivated': 0})
+        self.assertEqual(
+            scheduler.seconds_until_next(self.now + timedelta(minutes=59, seconds=59.5)), 0.5
+        )
+        self.assertEqual(scheduler.tick(self.now + timedelta(hours=1)), {'deactivated': 1})
+        self.assertFalse(self.active(rule))
+        self.assertTrue(self.active(upcoming))
+
+        scheduler.tick(self.now + timedelta(hours=2))
+        self.assertFalse(self.active(upcoming))
+        self.assertEqual(scheduler.pending(), 0)
+
+    def test_start_catches_up_and_respects_pauses(self):
+        expired = self.promotion(-3, -1, is_active=True, name='Expired')
+        paused = self.promotion(-1, 1, name='Paused')
+        upcoming_paused = self.promotion(1, 2, name='Upcoming')
+        scheduler = PriceScheduler()
+        self.assertEqual(scheduler.start(self.now), {'deactivated': 1})
+        self.assertFalse(self.active(expired))
+        scheduler.tick(self.now + timedelta(hours=1.5))
+        # Paused by hand: never switched on
+        self.assertFalse(self.active(paused))
+        self.assertFalse(self.active(upcoming_paused))
+
+    def test_activate_upcoming_promotion(self):
+        promotion = self.promotion(24, 72)
+        response = APIClient().post(f'/pricing/api/special-prices/{promotion.pk}/activate/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(self.active(promotion))
+        resolved = effective_prices(['SKU-1'], self.now + timedelta(hours=48))[0][0]
+        self.assertEqual((resolved['source'], resolved['effective_price']), ('SPECIAL_PRICE', Decimal('600.00')))
+
+    def test_published_writes_update_the_schedule(self):
+        scheduler = PriceScheduler()
+        scheduler.start(self.now)
+        with self.captureOnCommitCallbacks(execute=True):
+            promotion = self.promotion(1, 2, is_active=True)
+        # The changed row only
+        with self.assertNumQueries(1):
+            scheduler.tick(self.now)
+        self.assertEqual(scheduler.pending(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            promotion.end_date = self.now + timedelta(hours=2, minutes=30)
+            promotion.save()
+        scheduler.tick(self.now + timedelta(hours=2))
+        self.assertTrue(self.active(promotion))
+        scheduler.tick(self.now + timedelta(hours=2, minutes=30))
+        self.assertFalse(self.active(promotion))
+
+    def test_missing_changes_reload(self):
+        scheduler = PriceScheduler()
+        scheduler.start(self.now)
+        self.promotion(1, 2)
+        cache.incr('pricing:schedule:sequence')
+        scheduler.tick(self.now)
+        self.assertEqual(scheduler.counters['loads'], 2)
+        self.assertEqual(scheduler.pending(), 1)
+
+    def test_command_once(self):
+        expired = self.promotion(-3, -1, is_active=True)
+        out = StringIO()
+        call_command('run_price_scheduler', '--once', stdout=out)
+        self.assertIn('Deactivated 1', out.getvalue())
+        self.assertFalse(self.active(expired))
+
+
+class BulkRepriceTests(TestCase):
+    """Bulk repricing changes every matching row in one UPDATE"""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_priced_product('SKU-1', selling_price='522.50')
+        create_priced_product('SKU-2', selling_price='990.00')
+        create_priced_product('SKU-3', selling_price='600.00')
+        Product.objects.filter(sku='SKU-3').update(brand='Other Brand')
+
+    def prices(self):
+        return {
+            sku: (selling_price, discount)
+            for sku, selling_price, discount in Price.objects.order_by('product_id').values_list(
+                'product_id', 'selling_price', 'discount_percentage'
+            )
+        }
+
+    def test_reprice_in_one_update(self):
+        queryset = price_queryset(brand=['Test Brand'])
+        # Savepoints around selecting the changed rows, one UPDATE and the history INSERT
+        with self.assertNumQueries(5), self.captureOnCommitCallbacks(execute=True):
+            updated = reprice(queryset, percent=Decimal('5'), price_point=Decimal('0.99'))
+        self.assertEqual(updated, 2)
+        # 522.50 * 1.05 = 548.625, rounded down to 547.99; 990 * 1.05 is above the listing price
+        self.assertEqual(self.prices(), {
+            'SKU-1': (Decimal('547.99'), Decimal('45.20')),
+            'SKU-2': (Decimal('1000.00'), Decimal('0.00')),
+            'SKU-3': (Decimal('600.00'), Decimal('0.00')),
+        })
+        # Already at the listing price, so nothing left to write
+        self.assertEqual(reprice(price_queryset(skus=['SKU-2']), amount=Decimal('10')), 0)
+
+    def test_clamped_at_zero(self):
+        reprice(price_queryset(skus=['SKU-3']), amount=Decimal('-700'))
+        self.assertEqual(self.prices()['SKU-3'], (Decimal('0.00'), Decimal('100.00')))
+
+    def test_preview_matches_reprice(self):
+        queryset = price_queryset(category=['Electronics'])
+        rows = list(preview(queryset, chunk_size=1, amount=Decimal('-25'), price_point=Decimal('9'),
+                            price_point_step=Decimal('10')))
+        self.assertEqual(rows, [
+            ('SKU-1', Decimal('522.50'), Decimal('489.00'), Decimal('0.00'), Decimal('51.10')),
+            ('SKU-2', Decimal('990.00'), Decimal('959.00'), Decimal('0.00'), Decimal('4.10')),
+            ('SKU-3', Decimal('600.00'), Decimal('569.00'), Decimal('0.00'), Decimal('43.10')),
+        ])
+        # A preview writes nothing
+        self.assertEqual(self.prices()['SKU-1'][0], Decimal('522.50'))
+
+    def test_endpoint(self):
+        url = '/pricing/api/prices/bulk-reprice/'
+        response = self.client.post(url, {'skus': ['SKU-1', 'SKU-3'], 'percent': '-10', 'dry_run': True},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([(line['sku'], line['new_selling_price']) for line in lines],
+                         [('SKU-1', '470.25'), ('SKU-3', '540.00')])
+
+        response = self.client.post(url, {'skus': ['SKU-1', 'SKU-3'], 'percent': '-10'}, format='json')
+        self.assertEqual(response.data, {'updated': 2})
+        self.assertEqual(self.prices()['SKU-3'][0], Decimal('540.00'))
+
+        for data in ({'percent': '5'}, {'brand': ['Test Brand']},
+                     {'brand': ['Test Brand'], 'price_point': '1.00'}):
+            response = self.client.post(url, data, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_update_selling_price(self):
+        price = Price.objects.get(product_id='SKU-1')
+        response = self.client.post(f'/pricing/api/prices/{price.pk}/update_selling_price/',
+                                    {'selling_price': '750.00'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.prices()['SKU-1'], (Decimal('750.00'), Decimal('25.00')))
+
+
+class PriceHistoryTests(TestCase):
+    """Every price and promotion change is kept once, and can be looked up by time"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.now = timezone.now()
+
+    def at(self, hours):
+        return self.now + timedelta(hours=hours)
+
+    def rows(self, sku='SKU-1'):
+        return list(PriceHistory.objects.filter(sku=sku).values_list('source', 'selling_price', 'is_active'))
+
+    def test_writes_are_recorded_once(self):
+        product = create_priced_product('SKU-1')
+        price = Price.objects.get(product=product)
+        # Compared with the loaded values, without reading the history
+        with self.assertNumQueries(1):
+            price.cost_price = Decimal('450.00')
+            price.save()
+        self.assertEqual(self.rows(), [('PRICE', Decimal('800.00'), None)])
+
+        price.selling_price = '750.00'
+        price.save()
+        promotion = SpecialPrice.objects.create(
+            product=product, special_price=Decimal('600'), promotion_name='Sale',
+            start_date=self.at(-1), end_date=self.at(1),
+        )
+        promotion.delete()
+        self.assertEqual(self.rows(), [
+            ('PRICE', Decimal('800.00'), None), ('PRICE', Decimal('750.00'), None),
+            ('SPECIAL_PRICE', Decimal('600.00'), True), ('SPECIAL_PRICE', None, None),
+        ])
+
+        # Writers without signals
+        reprice(price_queryset(skus=['SKU-1']), amount=Decimal('-50'))
+        expiring = SpecialPrice.objects.create(
+            product=product, special_price=Decimal('500'), promotion_name='Flash',
+            start_date=self.at(-1), end_date=self.at(1),
+        )
+        scheduler = PriceScheduler()
+        scheduler.start(self.now)
+        scheduler.tick(self.at(1))
+        self.assertEqual(self.rows()[-3:], [
+            ('PRICE', Decimal('700.00'), None), ('SPECIAL_PRICE', Decimal('500.00'), True),
+            ('SPECIAL_PRICE', Decimal('500.00'), False),
+        ])
+        self.assertEqual(PriceHistory.objects.filter(source_id=expiring.pk).count(), 2)
+
+    def test_point_in_time_and_range(self):
+        product = create_priced_product('SKU-1')
+        promotion = SpecialPrice.objects.create(
+            product=product, special_price=Decimal('600'), promotion_name='Sale',
+            start_date=self.at(2), end_date=self.at(4),
+        )
+        # Replaced by rows at known times
+        PriceHistory.objects.all().delete()
+        history.record([history.entry(product.price, self.at(0)), history.entry(promotion, self.at(1))])
+        product.price.selling_price = Decimal('700.00')
+        promotion.special_price = Decimal('650.00')
+        history.record([history.entry(product.price, self.at(3)), history.entry(promotion, self.at(3))])
+        history.record([history.deleted_entry(promotion, self.at(3.5))])
+
+        self.assertEqual(
+            history.price_at('SKU-1', self.at(-1)), {'price': None, 'special_prices': [], 'selling_price': None}
+        )
+        self.assertEqual(history.price_at('SKU-1', self.at(1))['selling_price'], Decimal('800.00'))
+        self.assertEqual(history.price_at('SKU-1', self.at(2))['selling_price'], Decimal('600.00'))
+        state = history.price_at('SKU-1', self.at(3))
+        self.assertEqual(
+            (state['price'].selling_price, state['selling_price']), (Decimal('700.00'), Decimal('650.00'))
+        )
+        self.assertEqual(history.price_at('SKU-1', self.at(3.5))['selling_price'], Decimal('700.00'))
+
+        changes = history.price_changes('SKU-1', self.at(0.5), self.at(3.5))
+        self.assertEqual(
+            [(row.source, row.selling_price, row.valid_from, row.valid_to) for row in changes],
+            [
+                ('PRICE', Decimal('800.00'), self.at(0), self.at(3)),
+                ('SPECIAL_PRICE', Decimal('600.00'), self.at(1), self.at(3)),
+                ('PRICE', Decimal('700.00'), self.at(3), None),
+                ('SPECIAL_PRICE', Decimal('650.00'), self.at(3), None),
+            ]
+        )
+
+        response = self.client.get('/pricing/api/prices/history/', {'sku': 'SKU-1', 'at': self.at(2.5).isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['selling_price'], '600.00')
+        self.assertEqual(response.data['price']['selling_price'], '800.00')
+        self.assertEqual(len(response.data['special_prices']), 1)
+        response = self.client.get(
+            '/pricing/api/prices/history/',
+            {'sku': 'SKU-1', 'start': self.at(3.25).isoformat(), 'end': self.at(5).isoformat()},
+        )
+        self.assertEqual([row['selling_price'] for row in response.data['changes']], ['700.00', '650.00', None])
+        for params in ({'sku': 'SKU-1'}, {'sku': 'SKU-1', 'at': self.now.isoformat(), 'start': self.now.isoformat()}):
+            response = self.client.get('/pricing/api/prices/history/', params)
+            self.assertEqual(response.status_code, 400)
+
+
+class PriceHistoryMigrationTests(TransactionTestCase):
+    """The history migration seeds a baseline row for prices that predate it"""
+
+    def tearDown(self):
+        call_command('migrate', 'pricing', verbosity=0)
+
+    def test_existing_prices_are_seeded(self):
+        call_command('migrate', 'pricing', '0001_initial', verbosity=0)
+        # Historical models, which send no signals to a history table that is not there yet
+        apps = MigrationExecutor(connection).loader.project_state(('pricing', '0001_initial')).apps
+        product = apps.get_model('inventory', 'Product').objects.create(
+            sku='SKU-1', fsn='FSN-SKU-1', product_name='Product SKU-1', brand='Test Brand', category='Electronics',
+            mrp=Decimal('1000.00'), hsn_code='HSN1000', tax_percentage=Decimal('18.00'),
+        )
+        apps.get_model('pricing', 'Price').objects.create(
+            product_id=product.pk, listing_price=Decimal('1000.00'), selling_price=Decimal('800.00'),
+            cost_price=Decimal('500.00'), commission_percentage=Decimal('10.00'),
+        )
+        now = timezone.now()
+        apps.get_model('pricing', 'SpecialPrice').objects.create(
+            product_id=product.pk, special_price=Decimal('600.00'), promotion_name='Sale',
+            start_date=now - timedelta(hours=1), end_date=now + timedelta(days=1),
+        )
+
+        call_command('migrate', 'pricing', verbosity=0)
+        state = history.price_at('SKU-1', timezone.now())
+        self.assertEqual(state['price'].selling_price, Decimal('800.00'))
+        self.assertEqual([row.selling_price for row in state['special_prices']], [Decimal('600.00')])
+        self.assertEqual(state['selling_price'], Decimal('600.00'))
+        self.assertIsNone(history.price_at('SKU-1', now - timedelta(hours=1))['price'])
@@ -1,11 +1,23 @@
+from decimal import Decimal, InvalidOperation
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from flipkart_seller_center.conditional import ConditionalGetMixin
+from .effective import effective_prices
+from .history import price_at, price_changes
+from .margins import FILTER_FIELDS, margin_report
+from .repricing import discount_percentage, preview, price_queryset, reprice, stream_preview
 from .models import PricingRule, Price, SpecialPrice
-from .serializers import PricingRuleSerializer, PriceSerializer, SpecialPriceSerializer
+from .serializers import (
+    PricingRuleSerializer, PriceSerializer, SpecialPriceSerializer, EffectivePriceRequestSerializer,
+    MarginReportSerializer, BulkRepriceSerializer, PriceHistorySerializer, PriceHistoryQuerySerializer,
+)
 
 
-class PricingRuleViewSet(viewsets.ModelViewSet):
+class PricingRuleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Pricing Rules API
     
@@ -38,7 +50,7 @@ class PricingRuleViewSet(viewsets.ModelViewSet):
         return Response({'message': f'Pricing rule {rule.rule_name} deactivated'})
 
 
-class PriceViewSet(viewsets.ModelViewSet):
+class PriceViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Prices API
     
@@ -49,9 +61,14 @@ class PriceViewSet(viewsets.ModelViewSet):
     - PUT /api/prices/{id}/ - Update price
     - DELETE /api/prices/{id}/ - Delete price
     - POST /api/prices/{id}/update-selling-price/ - Update selling price
+    - POST /api/prices/effective/ - Effective prices of many SKUs, after rules and promotions
+    - GET /api/prices/margins/ - Margin summary, histograms and worst SKUs (filters: brand, category, subcategory)
+    - POST /api/prices/bulk-reprice/ - Adjust selling prices of many products at once, or preview the change
+    - GET /api/prices/history/ - A SKU's prices and promotions at a point in time (at) or over a range (start, end)
     """
     queryset = Price.objects.all()
     serializer_class = PriceSerializer
+    conditional_validators = {'retrieve': ['last_updated']}
     
     @action(detail=True, methods=['post'])
     def update_selling_price(self, request, pk=None):
@@ -60,16 +77,86 @@ class PriceViewSet(viewsets.ModelViewSet):
         new_price = request.data.get('selling_price')
         
         if new_price:
+            try:
+                new_price = Decimal(str(new_price))
+            except InvalidOperation:
+                return Response({'error': 'selling_price must be a number'}, status=status.HTTP_400_BAD_REQUEST)
             price.selling_price = new_price
-            # Recalculate discount percentage
-            if price.listing_price > 0:
-                price.discount_percentage = ((price.listing_price - float(new_price)) / price.listing_price) * 100
+            price.discount_percentage = discount_percentage(price.listing_price, new_price)
             price.save()
             
             serializer = self.get_serializer(price)
             return Response(serializer.data)
         
         return Response({'error': 'selling_price is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'])
+    def effective(self, request):
+        """Resolve effective selling prices of up to 10000 SKUs at once"""
+        serializer = EffectivePriceRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        at = serializer.validated_data.get('at') or timezone.now()
+        prices, missing = effective_prices(serializer.validated_data['skus'], at)
+        # Rendered directly: a serializer per row would cost more than resolving it
+        for price in prices:
+            for field in ('effective_price', 'selling_price', 'listing_price'):
+                price[field] = str(price[field])
+        return Response({'at': at, 'prices': prices, 'missing': missing})
+    
+    @action(detail=False, methods=['get'])
+    def margins(self, request):
+        """Per-unit margins across the catalog, computed in batch"""
+        serializer = MarginReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        filters = {field: params[field] for field in FILTER_FIELDS if field in params}
+        return Response(margin_report(filters, worst=params['worst'], rank_by=params['rank_by']))
+    
+    @action(detail=False, methods=['post'], url_path='bulk-reprice')
+    def bulk_reprice(self, request):
+        """Adjust selling prices matching a product filter with one UPDATE; dry runs stream the diff"""
+        serializer = BulkRepriceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        
+        queryset = price_queryset(params.get('brand'), params.get('category'), params.get('skus'))
+        adjustment = {
+            field: params[field] for field in ('percent', 'amount', 'price_point', 'price_point_step')
+            if field in params
+        }
+        if params['dry_run']:
+            return StreamingHttpResponse(
+                stream_preview(preview(queryset, **adjustment)), content_type='application/x-ndjson'
+            )
+        return Response({'updated': reprice(queryset, **adjustment)})
+    
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """Price and promotions of one SKU at a point in time, or every change over a range"""
+        serializer = PriceHistoryQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        sku = params['sku']
+        
+        if 'at' in params:
+            state = price_at(sku, params['at'])
+            selling_price, price = state['selling_price'], state['price']
+            return Response({
+                'sku': sku,
+                'at': params['at'],
+                'selling_price': None if selling_price is None else str(selling_price),
+                'price': None if price is None else PriceHistorySerializer(price).data,
+                'special_prices': PriceHistorySerializer(state['special_prices'], many=True).data,
+            })
+        
+        end = params.get('end') or timezone.now()
+        changes = price_changes(sku, params['start'], end)
+        return Response({
+            'sku': sku,
+            'start': params['start'],
+            'end': end,
+            'changes': PriceHistorySerializer(changes, many=True).data,
+        })
 
 
 class SpecialPriceViewSet(viewsets.ModelViewSet):
@@ -103,3 +190,4 @@ class SpecialPriceViewSet(viewsets.ModelViewSet):
         special_price.is_active = False
         special_price.save()
         return Response({'message': f'Special price {special_price.promotion_name} deactivated'})
+
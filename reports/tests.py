@@ -1,3 +1,42 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Report, ReportMetrics
+
+
+class ReportQueryBudgetTests(TestCase):
+    """Report endpoints must serialize nested metrics in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        for i in range(5):
+            report = Report.objects.create(
+                report_id=f'RPT-{i}', report_type='SALES', report_name=f'Report {i}',
+                report_format='CSV', start_date=date(2025, 1, 1), end_date=date(2025, 1, 31),
+                requested_by='tester'
+            )
+            if i:
+                ReportMetrics.objects.create(
+                    report=report, processing_time=Decimal('1.00'),
+                    data_range_start=now, data_range_end=now
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_report_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/reports/api/reports/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
 
-# Create your tests here.
+    def test_report_detail(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/reports/api/reports/RPT-1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.data['metrics'])
@@ -2,6 +2,7 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
+from flipkart_seller_center.conditional import ConditionalGetMixin
 from .models import Report, ScheduledReport, ReportMetrics
 from .serializers import ReportSerializer, ScheduledReportSerializer, ReportMetricsSerializer
 
@@ -19,7 +20,7 @@ class ReportViewSet(viewsets.ModelViewSet):
     - GET /api/reports/{report_id}/download/ - Download report
     - POST /api/reports/{report_id}/regenerate/ - Regenerate report
     """
-    queryset = Report.objects.all()
+    queryset = Report.objects.select_related('metrics')
     serializer_class = ReportSerializer
     
     @action(detail=True, methods=['get'])
@@ -63,7 +64,7 @@ class ReportViewSet(viewsets.ModelViewSet):
         })
 
 
-class ScheduledReportViewSet(viewsets.ModelViewSet):
+class ScheduledReportViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Scheduled Reports API
     
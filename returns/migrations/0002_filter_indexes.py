@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_filter_indexes'),
+        ('returns', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='return',
+            index=models.Index(fields=['status', '-return_date'], name='return_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='return',
+            index=models.Index(fields=['return_reason', '-return_date'], name='return_reason_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='return',
+            index=models.Index(fields=['-return_date'], name='return_date_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from orders.models import Order, OrderItem
+from flipkart_seller_center.state_machine import StateMachine
 
 
 class Return(models.Model):
@@ -25,6 +26,17 @@ class Return(models.Model):
         ('OTHER', 'Other'),
     ]
     
+    # Target status -> statuses it may be reached from
+    STATUS_TRANSITIONS = {
+        'APPROVED': ['INITIATED'],
+        'REJECTED': ['INITIATED'],
+        'PICKED_UP': ['APPROVED'],
+        'IN_TRANSIT': ['PICKED_UP'],
+        'RECEIVED': ['PICKED_UP', 'IN_TRANSIT'],
+        'REFUNDED': ['RECEIVED'],
+        'COMPLETED': ['APPROVED', 'PICKED_UP', 'IN_TRANSIT', 'RECEIVED', 'REFUNDED'],
+    }
+    
     return_id = models.CharField(max_length=100, unique=True, primary_key=True)
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='returns')
     order_item = models.ForeignKey(OrderItem, on_delete=models.CASCADE, related_name='returns')
@@ -39,11 +51,19 @@ class Return(models.Model):
     
     class Meta:
         ordering = ['-return_date']
+        indexes = [
+            models.Index(fields=['status', '-return_date'], name='return_status_date_idx'),
+            models.Index(fields=['return_reason', '-return_date'], name='return_reason_date_idx'),
+            models.Index(fields=['-return_date'], name='return_date_idx'),
+        ]
         
     def __str__(self):
         return f"Return {self.return_id} for Order {self.order.order_id}"
 
 
+return_status_machine = StateMachine(Return, Return.STATUS_TRANSITIONS)
+
+
 class Replacement(models.Model):
     """Model for Replacements"""
     REPLACEMENT_STATUS_CHOICES = [
@@ -2,7 +2,8 @@ from spyne import Application, rpc, ServiceBase, Unicode
 from spyne.protocol.soap import Soap11
 from spyne.server.django import DjangoApplication
 from django.views.decorators.csrf import csrf_exempt
-from .models import Return, Replacement, RefundTransaction
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Return, Replacement, RefundTransaction, return_status_machine
 from django.utils import timezone
 
 
@@ -32,22 +33,24 @@ class ReturnsService(ServiceBase):
         """Approve a return request"""
         try:
             return_request = Return.objects.get(return_id=return_id)
-            return_request.status = 'APPROVED'
-            return_request.save()
+            return_status_machine.transition(return_request, 'APPROVED')
             return f"Return {return_id} approved successfully"
         except Return.DoesNotExist:
             return f"Return {return_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(Unicode, _returns=Unicode)
     def reject_return(ctx, return_id):
         """Reject a return request"""
         try:
             return_request = Return.objects.get(return_id=return_id)
-            return_request.status = 'REJECTED'
-            return_request.save()
+            return_status_machine.transition(return_request, 'REJECTED')
             return f"Return {return_id} rejected"
         except Return.DoesNotExist:
             return f"Return {return_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(Unicode, _returns=Unicode)
     def get_replacement(ctx, replacement_id):
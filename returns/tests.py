@@ -1,3 +1,81 @@
+import xml.etree.ElementTree as ET
+from decimal import Decimal
+
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from flipkart_seller_center.state_machine import TransitionConflict, status_transitioned
+from orders.models import OrderItem
+from orders.tests import create_order
+from .models import Return, return_status_machine
+
+
+class ReturnTransitionTests(TestCase):
+    """Guarded status transitions on returns, over REST and SOAP"""
+
+    def setUp(self):
+        self.client = APIClient()
+        order = create_order('ORD-1')
+        item = OrderItem.objects.create(
+            order=order, sku='SKU-1', product_name='Product', quantity=1,
+            unit_price=Decimal('100.00'), total_price=Decimal('100.00')
+        )
+        self.return_request = Return.objects.create(
+            return_id='RET-1', order=order, order_item=item, return_reason='DEFECTIVE',
+            refund_amount=Decimal('100.00'), pickup_address='1 Test Street'
+        )
+        self.transitions = []
+        status_transitioned.connect(self.record_transition, sender=Return)
+        self.addCleanup(status_transitioned.disconnect, self.record_transition, sender=Return)
+
+    def record_transition(self, sender, pks, previous, target, **kwargs):
+        self.transitions.append((pks, previous, target))
+
+    def soap(self, operation, return_id):
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:tns="flipkart.seller.returns"><soapenv:Body>'
+            f'<tns:{operation}><tns:return_id>{return_id}</tns:return_id></tns:{operation}>'
+            '</soapenv:Body></soapenv:Envelope>'
+        )
+        response = self.client.post('/returns/soap/', envelope, content_type='text/xml')
+        self.assertEqual(response.status_code, 200)
+        return ET.fromstring(response.content).findtext(
+            f'.//{{flipkart.seller.returns}}{operation}Result'
+        )
+
+    def test_approve_then_complete(self):
+        response = self.client.post('/returns/api/returns/RET-1/approve/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'APPROVED')
+        response = self.client.post('/returns/api/returns/RET-1/complete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Return.objects.get().status, 'COMPLETED')
+        self.assertEqual(self.transitions, [
+            (['RET-1'], 'INITIATED', 'APPROVED'), (['RET-1'], 'APPROVED', 'COMPLETED'),
+        ])
+
+    def test_illegal_transition_conflicts(self):
+        self.client.post('/returns/api/returns/RET-1/reject/')
+        response = self.client.post('/returns/api/returns/RET-1/approve/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'REJECTED')
+        response = self.client.post('/returns/api/returns/RET-1/complete/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.transitions, [(['RET-1'], 'INITIATED', 'REJECTED')])
+
+    def test_stale_instance_loses(self):
+        stale = Return.objects.get(return_id='RET-1')
+        return_status_machine.transition(self.return_request, 'REJECTED')
+        with self.assertRaises(TransitionConflict) as raised:
+            return_status_machine.transition(stale, 'APPROVED')
+        self.assertEqual(raised.exception.current, 'REJECTED')
+        self.assertEqual(stale.status, 'INITIATED')
+        self.assertEqual(Return.objects.get().status, 'REJECTED')
+        self.assertEqual(len(self.transitions), 1)
 
-# Create your tests here.
+    def test_soap_approve_and_reject(self):
+        self.assertEqual(self.soap('approve_return', 'RET-1'), 'Return RET-1 approved successfully')
+        self.assertEqual(self.soap('reject_return', 'RET-1'), 'Return RET-1 cannot move from APPROVED to REJECTED')
+        self.assertEqual(Return.objects.get().status, 'APPROVED')
+        self.assertEqual(self.transitions, [(['RET-1'], 'INITIATED', 'APPROVED')])
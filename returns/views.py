@@ -2,16 +2,20 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
-from .models import Return, Replacement, RefundTransaction
+from flipkart_seller_center.conditional import ConditionalGetMixin
+from flipkart_seller_center.idempotency import IdempotencyMixin
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Return, Replacement, RefundTransaction, return_status_machine
 from .serializers import ReturnSerializer, ReplacementSerializer, RefundTransactionSerializer
 
 
-class ReturnViewSet(viewsets.ModelViewSet):
+class ReturnViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Returns API
     
     Endpoints:
     - GET /api/returns/ - List all returns
+      Filters: ?status=, ?return_reason=, ?order=, ?return_date_after=, ?return_date_before=
     - POST /api/returns/ - Create a return request
     - GET /api/returns/{return_id}/ - Get return details
     - PUT /api/returns/{return_id}/ - Update return
@@ -22,13 +26,17 @@ class ReturnViewSet(viewsets.ModelViewSet):
     """
     queryset = Return.objects.all()
     serializer_class = ReturnSerializer
+    filter_fields = ['status', 'return_reason', 'order']
+    date_range_fields = ['return_date']
     
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         """Approve a return request"""
         return_request = self.get_object()
-        return_request.status = 'APPROVED'
-        return_request.save()
+        try:
+            return_status_machine.transition(return_request, 'APPROVED')
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         return Response({
             'message': f'Return {return_request.return_id} approved',
             'status': return_request.status
@@ -38,8 +46,10 @@ class ReturnViewSet(viewsets.ModelViewSet):
     def reject(self, request, pk=None):
         """Reject a return request"""
         return_request = self.get_object()
-        return_request.status = 'REJECTED'
-        return_request.save()
+        try:
+            return_status_machine.transition(return_request, 'REJECTED')
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         return Response({
             'message': f'Return {return_request.return_id} rejected',
             'status': return_request.status
@@ -49,15 +59,17 @@ class ReturnViewSet(viewsets.ModelViewSet):
     def complete(self, request, pk=None):
         """Complete a return"""
         return_request = self.get_object()
-        return_request.status = 'COMPLETED'
-        return_request.save()
+        try:
+            return_status_machine.transition(return_request, 'COMPLETED')
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         return Response({
             'message': f'Return {return_request.return_id} completed',
             'status': return_request.status
         })
 
 
-class ReplacementViewSet(viewsets.ModelViewSet):
+class ReplacementViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Replacements API
     
@@ -73,8 +85,8 @@ class ReplacementViewSet(viewsets.ModelViewSet):
     queryset = Replacement.objects.all()
     serializer_class = ReplacementSerializer
     
-    @action(detail=True, methods=['post'])
-    def dispatch(self, request, pk=None):
+    @action(detail=True, methods=['post'], url_path='dispatch', url_name='dispatch')
+    def dispatch_replacement(self, request, pk=None):
         """Dispatch a replacement"""
         replacement = self.get_object()
         replacement.status = 'DISPATCHED'
@@ -97,7 +109,7 @@ class ReplacementViewSet(viewsets.ModelViewSet):
         })
 
 
-class RefundTransactionViewSet(viewsets.ModelViewSet):
+class RefundTransactionViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """
     ViewSet for Refund Transactions API
     
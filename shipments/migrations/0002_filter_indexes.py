@@ -0,0 +1,26 @@
+# Generated by Django 6.0 on 2026-10-18 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_filter_indexes'),
+        ('shipments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['status', '-shipment_date'], name='shipment_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['courier_partner', '-shipment_date'], name='shipment_courier_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shipment',
+            index=models.Index(fields=['-shipment_date'], name='shipment_date_idx'),
+        ),
+    ]
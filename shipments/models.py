@@ -1,5 +1,6 @@
 from django.db import models
 from orders.models import Order
+from flipkart_seller_center.state_machine import StateMachine
 
 
 class Shipment(models.Model):
@@ -16,6 +17,18 @@ class Shipment(models.Model):
         ('CANCELLED', 'Cancelled'),
     ]
     
+    # Target status -> statuses it may be reached from
+    STATUS_TRANSITIONS = {
+        'PACKED': ['CREATED'],
+        'READY_TO_SHIP': ['CREATED', 'PACKED'],
+        'SHIPPED': ['CREATED', 'PACKED', 'READY_TO_SHIP'],
+        'IN_TRANSIT': ['SHIPPED'],
+        'OUT_FOR_DELIVERY': ['SHIPPED', 'IN_TRANSIT'],
+        'DELIVERED': ['SHIPPED', 'IN_TRANSIT', 'OUT_FOR_DELIVERY'],
+        'RETURNED': ['SHIPPED', 'IN_TRANSIT', 'OUT_FOR_DELIVERY', 'DELIVERED'],
+        'CANCELLED': ['CREATED', 'PACKED', 'READY_TO_SHIP'],
+    }
+    
     shipment_id = models.CharField(max_length=100, unique=True, primary_key=True)
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='shipments')
     tracking_number = models.CharField(max_length=100, unique=True)
@@ -34,11 +47,19 @@ class Shipment(models.Model):
     
     class Meta:
         ordering = ['-shipment_date']
+        indexes = [
+            models.Index(fields=['status', '-shipment_date'], name='shipment_status_date_idx'),
+            models.Index(fields=['courier_partner', '-shipment_date'], name='shipment_courier_date_idx'),
+            models.Index(fields=['-shipment_date'], name='shipment_date_idx'),
+        ]
         
     def __str__(self):
         return f"Shipment {self.shipment_id} for Order {self.order.order_id}"
 
 
+shipment_status_machine = StateMachine(Shipment, Shipment.STATUS_TRANSITIONS)
+
+
 class ShipmentTracking(models.Model):
     """Model for Shipment Tracking Events"""
     shipment = models.ForeignKey(Shipment, on_delete=models.CASCADE, related_name='tracking_events')
@@ -2,7 +2,9 @@ from spyne import Application, rpc, ServiceBase, Unicode
 from spyne.protocol.soap import Soap11
 from spyne.server.django import DjangoApplication
 from django.views.decorators.csrf import csrf_exempt
-from .models import Shipment, ShipmentTracking, CourierPartner
+from django.db import transaction
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Shipment, ShipmentTracking, CourierPartner, shipment_status_machine
 from django.utils import timezone
 
 
@@ -38,41 +40,46 @@ class ShipmentsService(ServiceBase):
         """Dispatch a shipment"""
         try:
             shipment = Shipment.objects.get(shipment_id=shipment_id)
-            shipment.status = 'SHIPPED'
-            shipment.save()
-            
-            ShipmentTracking.objects.create(
-                shipment=shipment,
-                event_date=timezone.now(),
-                location='Seller Location',
-                event_description='Shipment dispatched',
-                status_code='DISPATCHED'
-            )
+            with transaction.atomic():
+                shipment_status_machine.transition(shipment, 'SHIPPED')
+                
+                ShipmentTracking.objects.create(
+                    shipment=shipment,
+                    event_date=timezone.now(),
+                    location='Seller Location',
+                    event_description='Shipment dispatched',
+                    status_code='DISPATCHED'
+                )
             
             return f"Shipment {shipment_id} dispatched successfully"
         except Shipment.DoesNotExist:
             return f"Shipment {shipment_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(Unicode, _returns=Unicode)
     def deliver_shipment(ctx, shipment_id):
         """Mark shipment as delivered"""
         try:
             shipment = Shipment.objects.get(shipment_id=shipment_id)
-            shipment.status = 'DELIVERED'
-            shipment.actual_delivery_date = timezone.now()
-            shipment.save()
-            
-            ShipmentTracking.objects.create(
-                shipment=shipment,
-                event_date=timezone.now(),
-                location='Delivery Location',
-                event_description='Shipment delivered',
-                status_code='DELIVERED'
-            )
+            with transaction.atomic():
+                shipment_status_machine.transition(
+                    shipment, 'DELIVERED', actual_delivery_date=timezone.now()
+                )
+                
+                ShipmentTracking.objects.create(
+                    shipment=shipment,
+                    event_date=timezone.now(),
+                    location='Delivery Location',
+                    event_description='Shipment delivered',
+                    status_code='DELIVERED'
+                )
             
             return f"Shipment {shipment_id} marked as delivered"
         except Shipment.DoesNotExist:
             return f"Shipment {shipment_id} not found"
+        except TransitionConflict as exc:
+            return str(exc)
     
     @rpc(_returns=Unicode)
     def list_courier_partners(ctx):
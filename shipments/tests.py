@@ -1,3 +1,217 @@
+import xml.etree.ElementTree as ET
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from flipkart_seller_center.state_machine import TransitionConflict, status_transitioned
+from orders.tests import create_order
+from .models import Shipment, ShipmentTracking, ShippingLabel, shipment_status_machine
+
+
+class ShipmentQueryBudgetTests(TestCase):
+    """Shipment endpoints must serialize nested relations in a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        order = create_order('ORD-1')
+        for i in range(5):
+            shipment = Shipment.objects.create(
+                shipment_id=f'SHIP-{i}', order=order, tracking_number=f'TRK-{i}',
+                courier_partner='Ekart', shipment_date=now,
+                expected_delivery_date=now + timedelta(days=3),
+                pickup_address='Warehouse', delivery_address='Customer',
+                weight=Decimal('1.00'), dimensions='10x10x10',
+                shipping_charges=Decimal('50.00')
+            )
+            for j in range(3):
+                ShipmentTracking.objects.create(
+                    shipment=shipment, event_date=now - timedelta(hours=j),
+                    location='Hub', event_description='Scanned', status_code='IN_TRANSIT'
+                )
+            # Leave one shipment without a label to cover the missing reverse one-to-one
+            if i:
+                ShippingLabel.objects.create(
+                    shipment=shipment, label_url='https://example.com/label.pdf', barcode=f'BC-{i}'
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_shipment_list(self):
+        # shipments joined with labels, tracking events
+        with self.assertNumQueries(2):
+            response = self.client.get('/shipments/api/shipments/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 5)
+
+    def test_shipment_detail(self):
+        # validators, shipment joined with label, tracking events
+        with self.assertNumQueries(3):
+            response = self.client.get('/shipments/api/shipments/SHIP-1/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tracking_events']), 3)
+
+    def test_shipment_track(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/shipments/api/shipments/SHIP-1/track/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tracking_events']), 3)
+
+    def test_shipment_tracking_list(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/shipments/api/shipment-tracking/')
+        self.assertEqual(response.status_code, 200)
+
+
+class ShipmentConditionalGetTests(TestCase):
+    """ETag / Last-Modified validators on shipment tracking"""
+
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        self.shipment = Shipment.objects.create(
+            shipment_id='SHIP-1', order=create_order('ORD-1'), tracking_number='TRK-1',
+            courier_partner='Ekart', shipment_date=now, expected_delivery_date=now + timedelta(days=3),
+            pickup_address='Warehouse', delivery_address='Customer',
+            weight=Decimal('1.00'), dimensions='10x10x10', shipping_charges=Decimal('50.00')
+        )
+
+    def add_event(self):
+        return ShipmentTracking.objects.create(
+            shipment=self.shipment, event_date=timezone.now(),
+            location='Hub', event_description='Scanned', status_code='IN_TRANSIT'
+        )
+
+    def test_unchanged_track_is_not_modified(self):
+        self.add_event()
+        response = self.client.get('/shipments/api/shipments/SHIP-1/track/')
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get('/shipments/api/shipments/SHIP-1/track/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_tracking_event_changes_etag(self):
+        event = self.add_event()
+        etag = self.client.get('/shipments/api/shipments/SHIP-1/track/')['ETag']
+        self.add_event()
+        response = self.client.get('/shipments/api/shipments/SHIP-1/track/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['tracking_events']), 2)
+
+        etag = response['ETag']
+        event.delete()
+        response = self.client.get('/shipments/api/shipments/SHIP-1/track/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_and_track_have_different_etags(self):
+        detail = self.client.get('/shipments/api/shipments/SHIP-1/')
+        track = self.client.get('/shipments/api/shipments/SHIP-1/track/')
+        self.assertNotEqual(detail['ETag'], track['ETag'])
+
+
+class ShipmentIdempotencyTests(TestCase):
+    """Retried dispatch calls must not add duplicate tracking events"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        now = timezone.now()
+        Shipment.objects.create(
+            shipment_id='SHIP-1', order=create_order('ORD-1'), tracking_number='TRK-1',
+            courier_partner='Ekart', shipment_date=now, expected_delivery_date=now + timedelta(days=3),
+            pickup_address='Warehouse', delivery_address='Customer',
+            weight=Decimal('1.00'), dimensions='10x10x10', shipping_charges=Decimal('50.00')
+        )
+
+    def test_retried_dispatch(self):
+        for _ in range(3):
+            response = self.client.post(
+                '/shipments/api/shipments/SHIP-1/dispatch/', {'location': 'Hub'}, format='json',
+                HTTP_IDEMPOTENCY_KEY='dispatch-SHIP-1'
+            )
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(ShipmentTracking.objects.filter(shipment_id='SHIP-1').count(), 1)
+
+
+class ShipmentTransitionTests(TestCase):
+    """Guarded status transitions on shipments, over REST and SOAP"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        now = timezone.now()
+        self.shipment = Shipment.objects.create(
+            shipment_id='SHIP-1', order=create_order('ORD-1'), tracking_number='TRK-1',
+            courier_partner='Ekart', shipment_date=now, expected_delivery_date=now + timedelta(days=3),
+            pickup_address='Warehouse', delivery_address='Customer',
+            weight=Decimal('1.00'), dimensions='10x10x10', shipping_charges=Decimal('50.00')
+        )
+        self.transitions = []
+        status_transitioned.connect(self.record_transition, sender=Shipment)
+        self.addCleanup(status_transitioned.disconnect, self.record_transition, sender=Shipment)
+
+    def record_transition(self, sender, pks, previous, target, **kwargs):
+        self.transitions.append((pks, previous, target))
+
+    def soap(self, operation, shipment_id):
+        envelope = (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:tns="flipkart.seller.shipments"><soapenv:Body>'
+            f'<tns:{operation}><tns:shipment_id>{shipment_id}</tns:shipment_id></tns:{operation}>'
+            '</soapenv:Body></soapenv:Envelope>'
+        )
+        response = self.client.post('/shipments/soap/', envelope, content_type='text/xml')
+        self.assertEqual(response.status_code, 200)
+        return ET.fromstring(response.content).findtext(
+            f'.//{{flipkart.seller.shipments}}{operation}Result'
+        )
+
+    def test_dispatch_then_deliver(self):
+        response = self.client.post('/shipments/api/shipments/SHIP-1/dispatch/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'SHIPPED')
+        response = self.client.post('/shipments/api/shipments/SHIP-1/deliver/')
+        self.assertEqual(response.status_code, 200)
+        shipment = Shipment.objects.get()
+        self.assertEqual(shipment.status, 'DELIVERED')
+        self.assertIsNotNone(shipment.actual_delivery_date)
+        self.assertEqual(self.transitions, [
+            (['SHIP-1'], 'CREATED', 'SHIPPED'), (['SHIP-1'], 'SHIPPED', 'DELIVERED'),
+        ])
+
+    def test_illegal_transition_conflicts(self):
+        response = self.client.post('/shipments/api/shipments/SHIP-1/deliver/')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'CREATED')
+        self.client.post('/shipments/api/shipments/SHIP-1/dispatch/')
+        response = self.client.post('/shipments/api/shipments/SHIP-1/dispatch/')
+        self.assertEqual(response.status_code, 409)
+        # The rolled back attempt leaves no tracking event behind
+        self.assertEqual(ShipmentTracking.objects.count(), 1)
+        self.assertEqual(self.transitions, [(['SHIP-1'], 'CREATED', 'SHIPPED')])
+
+    def test_stale_instance_loses(self):
+        stale = Shipment.objects.get(shipment_id='SHIP-1')
+        shipment_status_machine.transition(self.shipment, 'CANCELLED')
+        with self.assertRaises(TransitionConflict) as raised:
+            shipment_status_machine.transition(stale, 'SHIPPED')
+        self.assertEqual(raised.exception.current, 'CANCELLED')
+        self.assertEqual(stale.status, 'CREATED')
+        self.assertEqual(Shipment.objects.get().status, 'CANCELLED')
+        self.assertEqual(len(self.transitions), 1)
 
-# Create your tests here.
+    def test_soap_dispatch_and_deliver(self):
+        self.assertEqual(
+            self.soap('deliver_shipment', 'SHIP-1'), 'Shipment SHIP-1 cannot move from CREATED to DELIVERED'
+        )
+        self.assertEqual(self.soap('dispatch_shipment', 'SHIP-1'), 'Shipment SHIP-1 dispatched successfully')
+        self.assertEqual(self.soap('deliver_shipment', 'SHIP-1'), 'Shipment SHIP-1 marked as delivered')
+        self.assertEqual(Shipment.objects.get().status, 'DELIVERED')
+        self.assertEqual(self.transitions, [
+            (['SHIP-1'], 'CREATED', 'SHIPPED'), (['SHIP-1'], 'SHIPPED', 'DELIVERED'),
+        ])
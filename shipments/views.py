@@ -1,20 +1,25 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db import transaction
 from django.utils import timezone
-from .models import Shipment, ShipmentTracking, ShippingLabel, CourierPartner
+from flipkart_seller_center.conditional import ConditionalGetMixin
+from flipkart_seller_center.idempotency import IdempotencyMixin
+from flipkart_seller_center.state_machine import TransitionConflict
+from .models import Shipment, ShipmentTracking, ShippingLabel, CourierPartner, shipment_status_machine
 from .serializers import (
     ShipmentSerializer, ShipmentTrackingSerializer,
     ShippingLabelSerializer, CourierPartnerSerializer
 )
 
 
-class ShipmentViewSet(viewsets.ModelViewSet):
+class ShipmentViewSet(IdempotencyMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for Shipments API
     
     Endpoints:
     - GET /api/shipments/ - List all shipments
+      Filters: ?status=, ?courier_partner=, ?order=, ?shipment_date_after=, ?shipment_date_before=
     - POST /api/shipments/ - Create a shipment
     - GET /api/shipments/{shipment_id}/ - Get shipment details
     - PUT /api/shipments/{shipment_id}/ - Update shipment
@@ -23,12 +28,21 @@ class ShipmentViewSet(viewsets.ModelViewSet):
     - POST /api/shipments/{shipment_id}/dispatch/ - Dispatch shipment
     - POST /api/shipments/{shipment_id}/deliver/ - Mark as delivered
     """
-    queryset = Shipment.objects.all()
+    queryset = Shipment.objects.select_related('shipping_label').prefetch_related('tracking_events')
     serializer_class = ShipmentSerializer
+    filter_fields = ['status', 'courier_partner', 'order']
+    date_range_fields = ['shipment_date']
+    conditional_validators = {
+        'retrieve': ['updated_at', 'tracking_events__created_at', 'shipping_label__generated_date'],
+        'track': ['updated_at', 'tracking_events__created_at'],
+    }
     
     @action(detail=True, methods=['get'])
     def track(self, request, pk=None):
         """Track shipment"""
+        not_modified = self.check_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         shipment = self.get_object()
         tracking_events = shipment.tracking_events.all()
         serializer = ShipmentTrackingSerializer(tracking_events, many=True)
@@ -41,21 +55,24 @@ class ShipmentViewSet(viewsets.ModelViewSet):
             'tracking_events': serializer.data
         })
     
-    @action(detail=True, methods=['post'])
-    def dispatch(self, request, pk=None):
+    @action(detail=True, methods=['post'], url_path='dispatch', url_name='dispatch')
+    def dispatch_shipment(self, request, pk=None):
         """Dispatch a shipment"""
         shipment = self.get_object()
-        shipment.status = 'SHIPPED'
-        shipment.save()
-        
-        # Create tracking event
-        ShipmentTracking.objects.create(
-            shipment=shipment,
-            event_date=timezone.now(),
-            location=request.data.get('location', 'Seller Location'),
-            event_description='Shipment dispatched',
-            status_code='DISPATCHED'
-        )
+        try:
+            with transaction.atomic():
+                shipment_status_machine.transition(shipment, 'SHIPPED')
+                
+                # Create tracking event
+                ShipmentTracking.objects.create(
+                    shipment=shipment,
+                    event_date=timezone.now(),
+                    location=request.data.get('location', 'Seller Location'),
+                    event_description='Shipment dispatched',
+                    status_code='DISPATCHED'
+                )
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         
         return Response({
             'message': f'Shipment {shipment.shipment_id} dispatched',
@@ -66,18 +83,22 @@ class ShipmentViewSet(viewsets.ModelViewSet):
     def deliver(self, request, pk=None):
         """Mark shipment as delivered"""
         shipment = self.get_object()
-        shipment.status = 'DELIVERED'
-        shipment.actual_delivery_date = timezone.now()
-        shipment.save()
-        
-        # Create tracking event
-        ShipmentTracking.objects.create(
-            shipment=shipment,
-            event_date=timezone.now(),
-            location=request.data.get('location', 'Delivery Location'),
-            event_description='Shipment delivered',
-            status_code='DELIVERED'
-        )
+        try:
+            with transaction.atomic():
+                shipment_status_machine.transition(
+                    shipment, 'DELIVERED', actual_delivery_date=timezone.now()
+                )
+                
+                # Create tracking event
+                ShipmentTracking.objects.create(
+                    shipment=shipment,
+                    event_date=timezone.now(),
+                    location=request.data.get('location', 'Delivery Location'),
+                    event_description='Shipment delivered',
+                    status_code='DELIVERED'
+                )
+        except TransitionConflict as exc:
+            return Response({'error': str(exc), 'status': exc.current}, status=status.HTTP_409_CONFLICT)
         
         return Response({
             'message': f'Shipment {shipment.shipment_id} delivered',
@@ -85,13 +106,13 @@ class ShipmentViewSet(viewsets.ModelViewSet):
         })
 
 
-class ShipmentTrackingViewSet(viewsets.ModelViewSet):
+class ShipmentTrackingViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """ViewSet for Shipment Tracking Events"""
     queryset = ShipmentTracking.objects.all()
     serializer_class = ShipmentTrackingSerializer
 
 
-class ShippingLabelViewSet(viewsets.ModelViewSet):
+class ShippingLabelViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """
     ViewSet for Shipping Labels API
     
@@ -105,7 +126,7 @@ class ShippingLabelViewSet(viewsets.ModelViewSet):
     serializer_class = ShippingLabelSerializer
 
 
-class CourierPartnerViewSet(viewsets.ModelViewSet):
+class CourierPartnerViewSet(IdempotencyMixin, viewsets.ModelViewSet):
     """
     ViewSet for Courier Partners API
     